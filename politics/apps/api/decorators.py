@@ -3,9 +3,10 @@ from django.http import Http404, HttpResponse, HttpResponseNotFound
 from django.template import loader, RequestContext
 from functools import wraps
 import json
+from politics.utils.decorators import conditional
 
 
-def api(template, compress=True):
+def api(template, compress=True, last_modified=None):
     """A view decorator that renders a JSON template using the returned context.
 
     If the query string contains a ``callback`` parameter, it is JSONP and the
@@ -13,19 +14,22 @@ def api(template, compress=True):
 
     If the view raises an ``Http404``, returns an empty 404 Not Found response.
 
-    :param template: The template to render.
-    :type  template: ``str``
-    :param compress: Whether whitespace should be stripped from the JSON.
-    :type  compress: ``boolean``
+    If ``last_modified`` is given, conditional requests are supported (see
+    :func:`politics.utils.decorators.conditional`). As this decorator is
+    applied outside of :func:`politics.utils.decorators.pk_url`, the function
+    is passed the URL's arguments; it may raise ``Http404``.
+
+    :param      template: The template to render.
+    :type       template: ``str``
+    :param      compress: Whether whitespace should be stripped from the JSON.
+    :type       compress: ``boolean``
+    :param last_modified: Returns when the response last changed, given the
+                          URL's arguments.
+    :type  last_modified: ``function``
     """
     def inner(view):
-        @wraps(view)
-        def wrapper(request, *args, **kwargs):
-            try:
-                context = view(request, *args, **kwargs)
-            except Http404:
-                # We don't want to use the standard HTML 404 page.
-                return HttpResponseNotFound(mimetype="application/json")
+        def render(request, *args, **kwargs):
+            context = view(request, *args, **kwargs)
 
             # Pass pre-built requests through.
             if not isinstance(context, dict):
@@ -48,6 +52,17 @@ def api(template, compress=True):
 
             return HttpResponse(content, mimetype=mimetype)
 
+        if last_modified is not None:
+            render = conditional(last_modified)(render)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            try:
+                return render(request, *args, **kwargs)
+            except Http404:
+                # We don't want to use the standard HTML 404 page.
+                return HttpResponseNotFound(mimetype="application/json")
+
         return wrapper
 
-    return inner
\ No newline at end of file
+    return inner
@@ -1,10 +1,13 @@
 # coding=utf-8
 from ..decorators import api
+from django.shortcuts import get_object_or_404
 from politics.apps.core.models import Issue, View
 from politics.utils.decorators import pk_url
 
 
-@api("api/issues/show.json")
+@api("api/issues/show.json",
+     last_modified=lambda request, pk: get_object_or_404(Issue, pk=pk)
+             .get_last_modified())
 @pk_url(Issue)
 def show(request, issue):
     """Returns information about a single issue."""
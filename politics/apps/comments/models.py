@@ -4,6 +4,7 @@ from django.db import models
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from politics.apps.core.models.generic_manager import GenericManager
+from politics.utils.cache import register_versioned
 
 
 class Comment(models.Model):
@@ -93,3 +94,7 @@ def _notify_object_of_comment_creation(instance, created, **kwargs):
             instance.content_object.handle_comment_created(instance)
     except AttributeError:
         pass
+
+
+# Changing a comment changes what's known about the object it's on.
+register_versioned(Comment, follow=("content_object",))
@@ -66,7 +66,9 @@ def comments(request, instance):
     :type  instance: ``django.db.models.Model``
     """
     if request.method == "POST":
-        comment = Comment(author=request.user, content_object=instance)
+        # Assign the instance after construction so that it's cached.
+        comment = Comment(author=request.user)
+        comment.content_object = instance
         form = CommentForm(request.POST, instance=comment)
 
         if form.is_valid():
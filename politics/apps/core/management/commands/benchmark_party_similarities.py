@@ -0,0 +1,112 @@
+# coding=utf-8
+from django.core.management.base import BaseCommand
+import numpy
+from optparse import make_option
+from politics.apps.core.models import View
+from politics.apps.core.similarity import StanceMatrix
+import random
+import time
+
+
+def _generate_views(party_count, issue_count, known_fraction):
+    """Generates random party, issue, stance tuples.
+
+    :param    party_count: The number of parties.
+    :type     party_count: ``int``
+    :param    issue_count: The number of issues.
+    :type     issue_count: ``int``
+    :param known_fraction: The fraction of views whose stance is known.
+    :type  known_fraction: ``float``
+    :rtype: ``list`` of ``tuple``
+    """
+    stances = (View.OPPOSE, View.SUPPORT, View.UNCLEAR)
+    return [(party_pk, issue_pk, random.choice(stances))
+            for party_pk in xrange(party_count)
+            for issue_pk in xrange(issue_count)
+            if random.random() < known_fraction]
+
+
+def _set_based_similarities(views, party_pks):
+    """Compares parties' views one pair at a time, as we used to.
+
+    :param     views: Party, issue, stance tuples.
+    :type      views: ``list`` of ``tuple``
+    :param party_pks: The parties whose similarities are to be calculated.
+    :type  party_pks: *Iterable* of ``int``
+    """
+    view_sets = {}
+    for party_pk, issue_pk, stance in views:
+        view_sets.setdefault(party_pk, set()).add((issue_pk, stance))
+
+    issue_sets = dict((party_pk, set(view[0] for view in view_set))
+                      for party_pk, view_set in view_sets.iteritems())
+
+    for party_pk in party_pks:
+        party_views = view_sets.get(party_pk, set())
+        party_issues = issue_sets.get(party_pk, set())
+
+        for other_party_pk, other_party_views in view_sets.iteritems():
+            if other_party_pk == party_pk:
+                continue
+
+            maximum_similarity = len(party_issues & issue_sets[other_party_pk])
+            if maximum_similarity > 0:
+                len(party_views & other_party_views) / float(maximum_similarity)
+
+
+class Command(BaseCommand):
+    help = ("Compares the vectorised party similarity calculation with the "
+            "pairwise set-based one on random data.")
+
+    option_list = BaseCommand.option_list + (
+        make_option("--issues", default=200, type="int",
+                    help="The number of issues to generate."),
+        make_option("--known", default=0.5, type="float",
+                    help="The fraction of views whose stance is known."),
+        make_option("--parties", default="50,500,5000",
+                    help="Comma-separated party counts to benchmark."),
+        make_option("--sample", default=50, type="int",
+                    help="The maximum number of parties to time the set-based "
+                         "calculation for; the rest is extrapolated."),
+    )
+
+    def handle(self, *args, **options):
+        issue_count = options["issues"]
+        party_counts = [int(count) for count in options["parties"].split(",")]
+
+        self.stdout.write("%8s %14s %14s %9s\n" % ("Parties", "Set-based (s)",
+                                                   "Vectorised (s)", "Speedup"))
+
+        for party_count in party_counts:
+            views = _generate_views(party_count, issue_count, options["known"])
+            party_pks = range(party_count)
+
+            # Comparing every pair of 5,000 parties one at a time takes far too
+            # long, so time a sample of parties and extrapolate from that.
+            sample = party_pks[:options["sample"]]
+            start = time.time()
+            _set_based_similarities(views, sample)
+            set_based = (time.time() - start) * party_count / len(sample)
+
+            # Only time the calculation: building PartySimilarity objects for
+            # millions of pairs would swamp it and isn't what we're measuring.
+            start = time.time()
+            matrix = StanceMatrix(party_pks, views)
+            for block in xrange(0, party_count, 500):
+                rows = xrange(block, min(block + 500, party_count))
+                shared, matching = matrix.agreements(rows)
+                matching / numpy.maximum(shared, 1.0)
+            vectorised = time.time() - start
+
+            self.stdout.write("%8d %13.3f%s %14.3f %8.1fx\n" % (
+                party_count,
+                set_based,
+                "*" if len(sample) < party_count else " ",
+                vectorised,
+                set_based / max(vectorised, 1e-6)
+            ))
+
+        self.stdout.write("\n* Extrapolated from %d parties. Neither time "
+                          "includes database queries: the set-based version "
+                          "also made one query per party.\n"
+                          % options["sample"])
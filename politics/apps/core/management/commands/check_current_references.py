@@ -0,0 +1,56 @@
+# coding=utf-8
+from datetime import datetime, time
+from django.core.management.base import NoArgsCommand
+from optparse import make_option
+from politics.apps.core.models import View
+
+
+def _get_current_reference(view):
+    """Finds a view's current reference by sorting its references in Python.
+
+    This is how the current reference was found before it was stored on the
+    view; it's kept as the reference implementation for the SQL version.
+
+    :param view: The view.
+    :type  view: :class:`View`
+    :rtype: :class:`Reference` or ``None``
+    """
+    def _get_published_on(reference):
+        if not reference.published_on:
+            return reference.created_at
+        else:
+            return datetime.combine(reference.published_on, time())
+
+    references = view.reference_set.filter(score__gte=0.5).order_by("pk")
+    references = sorted(references, key=_get_published_on, reverse=True)
+    return references[0] if len(references) > 0 else None
+
+
+class Command(NoArgsCommand):
+    help = ("Checks that every view's stored current reference matches the "
+            "one found by sorting its references in Python.")
+
+    option_list = NoArgsCommand.option_list + (
+        make_option("--fix", action="store_true", default=False,
+                    help="Refresh the stance of views that don't match."),
+    )
+
+    def handle_noargs(self, **options):
+        mismatches = 0
+
+        for view in View.objects.select_related("current_reference"):
+            expected = _get_current_reference(view)
+            expected_pk = getattr(expected, "pk", None)
+            sql_pk = getattr(view.find_current_reference(), "pk", None)
+
+            if view.current_reference_id == expected_pk == sql_pk:
+                continue
+
+            mismatches += 1
+            self.stdout.write("View %d: stored %s, SQL %s, expected %s\n" % (
+                    view.pk, view.current_reference_id, sql_pk, expected_pk))
+
+            if options["fix"]:
+                view.refresh_stance()
+
+        self.stdout.write("%d mismatched view(s).\n" % mismatches)
@@ -0,0 +1,22 @@
+# coding=utf-8
+from django.core.management.base import NoArgsCommand
+from politics.apps.core.tasks import (calculate_issue_notability,
+                                      calculate_party_similarities)
+from politics.utils.tasks import get_coalescing_stats
+
+
+class Command(NoArgsCommand):
+    help = ("Prints the number of coalesced tasks that have been enqueued and "
+            "deduplicated since the cache was last flushed.")
+
+    def handle_noargs(self, **options):
+        tasks = (calculate_issue_notability, calculate_party_similarities)
+
+        self.stdout.write("%-55s %9s %12s\n" % ("Task", "Enqueued",
+                                                "Deduplicated"))
+
+        for task in tasks:
+            stats = get_coalescing_stats(task)
+            self.stdout.write("%-55s %9d %12d\n" % (task.name,
+                                                    stats["enqueued"],
+                                                    stats["deduplicated"]))
@@ -0,0 +1,21 @@
+# coding=utf-8
+from django.core.management.base import NoArgsCommand
+from politics.utils.cache import get_cache_stats
+
+
+class Command(NoArgsCommand):
+    help = ("Prints the number of cached fragments that have been found in or "
+            "missing from the cache since it was last flushed.")
+
+    def handle_noargs(self, **options):
+        fragments = ("issue_summary", "party_summary")
+
+        self.stdout.write("%-20s %9s %9s %9s\n" % ("Fragment", "Hits",
+                                                   "Misses", "Hit Rate"))
+
+        for name in fragments:
+            stats = get_cache_stats(name)
+            total = stats["hits"] + stats["misses"]
+            self.stdout.write("%-20s %9d %9d %8.1f%%\n" % (
+                    name, stats["hits"], stats["misses"],
+                    stats["hits"] * 100.0 / max(1, total)))
@@ -0,0 +1,13 @@
+# coding=utf-8
+from django.core.management.base import NoArgsCommand
+from politics.apps.core.models import QueuedIndexUpdate
+
+
+class Command(NoArgsCommand):
+    help = ("Prints the number of objects waiting to be indexed and how long "
+            "the oldest has been waiting.")
+
+    def handle_noargs(self, **options):
+        stats = QueuedIndexUpdate.objects.get_stats()
+        self.stdout.write("Depth: %d\n" % stats["depth"])
+        self.stdout.write("Lag:   %ds\n" % stats["lag"])
@@ -22,14 +22,18 @@ class ViewManager(object):
         :rtype: ``politics.apps.core.models.View``
         """
         try:
-            return View.objects.get(issue=issue, party=party)
+            view = View.objects.get(issue=issue, party=party)
         except View.DoesNotExist:
             view = View(issue=issue, party=party)
 
             if saved:
                 view.save()
+        else:
+            # Avoid loading them again (e.g. when the view's saved).
+            view.issue = issue
+            view.party = party
 
-            return view
+        return view
 
     def get_views_for_issue(self, issue):
         """Retrieves all parties' views on an issue.
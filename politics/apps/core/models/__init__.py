@@ -3,8 +3,13 @@ from .archive_manager import ArchiveManager
 from .election import Election
 from .issue import Issue
 from .party import Party
+from .party_agreement import PartyAgreement
 from .party_similarity import PartySimilarity
 from .view import View
+from .queued_index_update import QueuedIndexUpdate
 from .reference import Reference
+from .stance_histogram import StanceHistogram
 from .tag import Tag
+from .tag_cooccurrence import TagCooccurrence
+from .trending_state import TrendingState
 from .user_profile import UserProfile
\ No newline at end of file
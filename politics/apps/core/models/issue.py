@@ -1,7 +1,10 @@
 # coding=utf-8
 from autoslug.fields import AutoSlugField
+from datetime import datetime
 from django.db import models
-from politics.utils.models import MarkdownField
+from django.db.models import Count
+from politics.utils.cache import get_cached, register_versioned
+from politics.utils.models import get_latest, MarkdownField
 import reversion
 
 
@@ -11,29 +14,45 @@ class Issue(models.Model):
     For example, the Australian Labor Party has a view on the carbon tax: they
     support it. The Liberal Party of Australia, on the other hand, opposes it.
 
-    :ivar       created_at: When the issue was created.
-    :type       created_at: ``datetime.datetime``
-    :ivar      description: A description of the issue in Markdown format.
-    :type      description: ``str``
-    :ivar description_html: The issue's description converted to HTML.
-    :type description_html: ``str``
-    :ivar             name: The name of the issue.
-    :type             name: ``str``
-    :ivar             slug: A slug version of the issue's name.
-    :type             slug: ``str``
-    :ivar             tags: The tags assigned to this issue.
-    :type             tags: :class:`Tag`
-    :ivar       updated_at: When the issue was last updated.
-    :type       updated_at: ``datetime.datetime``
+    :ivar             created_at: When the issue was created.
+    :type             created_at: ``datetime.datetime``
+    :ivar            description: A description of the issue in Markdown
+                                  format.
+    :type            description: ``str``
+    :ivar       description_html: The issue's description converted to HTML.
+    :type       description_html: ``str``
+    :ivar known_root_party_count: The number of root parties whose stance on
+                                  the issue is known (see
+                                  :meth:`StanceHistogramManager.adjust`).
+    :type known_root_party_count: ``int``
+    :ivar                   name: The name of the issue.
+    :type                   name: ``str``
+    :ivar                   slug: A slug version of the issue's name.
+    :type                   slug: ``str``
+    :ivar                   tags: The tags assigned to this issue.
+    :type                   tags: :class:`Tag`
+    :ivar        tags_updated_at: When tags were last assigned to or removed
+                                  from the issue, if they have been. This
+                                  doesn't change ``updated_at``.
+    :type        tags_updated_at: ``datetime.datetime`` or ``None``
+    :ivar         trending_score: How much recent activity there has been on
+                                  the issue, relative to other issues (see
+                                  :mod:`politics.apps.core.trending`).
+    :type         trending_score: ``float``
+    :ivar             updated_at: When the issue was last updated.
+    :type             updated_at: ``datetime.datetime``
     """
 
     created_at = models.DateTimeField(auto_now_add=True)
     description = MarkdownField(blank=True, disable=["images"], on_change=True)
     description_html = models.TextField(blank=True)
+    known_root_party_count = models.IntegerField(default=0)
     name = models.CharField(max_length=128)
     slug = AutoSlugField(always_update=True, max_length=128,
                          populate_from="name")
     tags = models.ManyToManyField("Tag")
+    tags_updated_at = models.DateTimeField(blank=True, null=True)
+    trending_score = models.FloatField(db_index=True, default=0)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
@@ -46,14 +65,19 @@ class Issue(models.Model):
     def common_tags(issues):
         """Extract tags from a set of issues, ordering them by frequency.
 
+        The tags are counted by the database with a single query.
+
         :param issues: The issues from which tags will be extracted.
         :type  issues: *iterable* of :class:`Issue`s
         :returns: A list of unique tags referenced by elements of ``issues``,
                   in descending order of how many times they were referenced.
         :rtype: ``list`` of :class:`Tag`s
         """
-        tags = sum((list(issue.tags.all()) for issue in issues), [])
-        return sorted(set(tags), key=tags.count, reverse=True)
+        from . import Tag
+
+        tags = Tag.objects.filter(issue__in=list(issues))
+        tags = tags.annotate(issue_count=Count("issue"))
+        return list(tags.order_by("-issue_count", "name"))
 
     def delete(self, *args, **kwargs):
         # Explicitly remove all tags to ensure that the many-to-many relation
@@ -61,18 +85,79 @@ class Issue(models.Model):
         self.tags.remove(*list(self.tags.all()))
         return super(Issue, self).delete(*args, **kwargs)
 
+    def get_last_modified(self):
+        """Returns when the issue or anything shown alongside it last changed.
+
+        This only queries timestamps, so it's much cheaper than rendering the
+        issue's page; it's used to answer conditional requests.
+
+        :rtype: ``datetime.datetime``
+        """
+        from . import Party, Reference
+
+        return get_latest(
+            self.updated_at,
+            self.tags_updated_at,
+            (Party.objects.filter(tree_level=0), "updated_at"),
+            (self.view_set, "updated_at"),
+            (Reference.objects.filter(view__issue=self), "created_at")
+        )
+
     @property
     def percentage_views_known(self):
-        """Returns the percentage of views that are known for this issue."""
-        from . import Party, View
+        """Returns the percentage of views that are known for this issue.
 
-        root_parties = Party.objects.filter(tree_level=0)
-        known_views = (self.view_set.filter(party__in=root_parties)
-                .exclude(stance=View.UNKNOWN))
+        The number of root parties is cached until a party changes, so this
+        doesn't usually cost any queries.
+        """
+        from . import Party
 
-        return known_views.count() * 100.0 / max(1, root_parties.count())
+        root_party_count = get_cached("root_party_count",
+                Party.objects.filter(tree_level=0).count, Party)
+        return self.known_root_party_count * 100.0 / max(1, root_party_count)
+
+    @staticmethod
+    def update_tags_changed(instance, action, reverse, pk_set, **kwargs):
+        """Record when issues' tags change.
+
+        The tags are shown alongside the issues, so this keeps the issues'
+        ``Last-Modified`` headers (see :meth:`get_last_modified`) correct.
+
+        :param instance: The issue (or tag, if ``reverse``) whose tags (or
+                         issues) changed.
+        :type  instance: :class:`Issue` or :class:`Tag`
+        :param   action: The kind of change.
+        :type    action: ``str``
+        :param  reverse: Whether the change was made from the tag's side.
+        :type   reverse: ``bool``
+        :param   pk_set: The primary keys of the tags (or issues) that were
+                         assigned or removed.
+        :type    pk_set: ``set`` of ``int``
+        """
+        if action not in ("post_add", "post_remove", "pre_clear"):
+            return
+
+        if not reverse:
+            issue_pks = [instance.pk]
+        elif action == "pre_clear":
+            issue_pks = list(instance.issue_set.values_list("pk", flat=True))
+        else:
+            issue_pks = pk_set
+
+        tags_updated_at = datetime.now()
+        Issue.objects.filter(pk__in=issue_pks).update(
+                tags_updated_at=tags_updated_at)
+        if not reverse:
+            instance.tags_updated_at = tags_updated_at
 
 
 # As tags are deleted when they become unused, we must store them alongside
 # issues; otherwise, the tags might not be available when we revert an issue.
-reversion.register(Issue, follow=["tags"])
\ No newline at end of file
+reversion.register(Issue, follow=["tags"])
+
+# Keep track of versions for cache keys, including when tags are assigned.
+register_versioned(Issue)
+
+# Keep track of when issues' tags change.
+models.signals.m2m_changed.connect(Issue.update_tags_changed,
+                                   sender=Issue.tags.through)
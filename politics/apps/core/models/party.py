@@ -1,27 +1,36 @@
 # coding=utf-8
 from autoslug.fields import AutoSlugField
 from django.db import models
+from django.db.models import Q
 from mptt.models import MPTTModel, TreeForeignKey
+from politics.utils.cache import get_cached, register_versioned
+from politics.utils.models import get_latest
 
 
 class Party(MPTTModel):
     """A political party.
 
-    :ivar  created_at: When the party model was created.
-    :type  created_at: ``datetime.datetime``
-    :ivar        name: The name of the party.
-    :type        name: ``str``
-    :ivar      parent: The parent party of which this is a subsidiary.
-    :type      parent: :class:`Party` or ``None``
-    :ivar     picture: The party's picture.
-    :type     picture: ``django.db.models.FileField``
-    :ivar        slug: A slug version of the party's name.
-    :type        slug: ``str``
-    :ivar website_url: The URL of the party's website (optional).
-    :type website_url: ``str`` or ``None``
+    :ivar       created_at: When the party model was created.
+    :type       created_at: ``datetime.datetime``
+    :ivar known_view_count: The number of the party's views whose stance is
+                            known (see :meth:`StanceHistogramManager.adjust`).
+    :type known_view_count: ``int``
+    :ivar             name: The name of the party.
+    :type             name: ``str``
+    :ivar           parent: The parent party of which this is a subsidiary.
+    :type           parent: :class:`Party` or ``None``
+    :ivar          picture: The party's picture.
+    :type          picture: ``django.db.models.FileField``
+    :ivar             slug: A slug version of the party's name.
+    :type             slug: ``str``
+    :ivar       updated_at: When the party was last updated.
+    :type       updated_at: ``datetime.datetime``
+    :ivar      website_url: The URL of the party's website (optional).
+    :type      website_url: ``str`` or ``None``
     """
 
     created_at = models.DateTimeField(auto_now_add=True)
+    known_view_count = models.IntegerField(default=0)
     name = models.CharField(max_length=64)
     parent = TreeForeignKey("self", blank=True, null=True,
             related_name="children")
@@ -29,6 +38,7 @@ class Party(MPTTModel):
             upload_to="party_pictures")
     slug = AutoSlugField(always_update=True, max_length=64,
             populate_from="name")
+    updated_at = models.DateTimeField(auto_now=True)
     website_url = models.URLField(blank=True)
 
     class Meta:
@@ -43,6 +53,24 @@ class Party(MPTTModel):
     def __unicode__(self):
         return self.name
 
+    def get_last_modified(self):
+        """Returns when the party or anything shown alongside it last changed.
+
+        This only queries timestamps, so it's much cheaper than rendering the
+        party's page; it's used to answer conditional requests.
+
+        :rtype: ``datetime.datetime``
+        """
+        from . import PartySimilarity, Reference
+
+        return get_latest(
+            (Party.objects.filter(Q(pk=self.pk) | Q(parent=self)),
+             "updated_at"),
+            (self.view_set, "updated_at"),
+            (Reference.objects.filter(view__party=self), "created_at"),
+            (PartySimilarity.objects.filter(first_party=self), "created_at")
+        )
+
     def get_picture(self):
         """
         :returns: The party's picture or the default if it doesn't have one.
@@ -54,12 +82,17 @@ class Party(MPTTModel):
     def percentage_views_known(self):
         """Calculates the percentage of the party's views that are known.
 
+        The number of issues is cached until an issue changes, so this doesn't
+        usually cost any queries.
+
         :returns: The percentage of the party's views that are known.
         :rtype: ``float``
         """
-        from . import Issue, View
+        from . import Issue
+
+        issue_count = get_cached("issue_count", Issue.objects.count, Issue)
+        return self.known_view_count * 100.0 / max(1, issue_count)
 
-        issues = Issue.objects.all()
-        known_views = self.view_set.exclude(stance=View.UNKNOWN)
 
-        return known_views.count() * 100.0 / max(1, issues.count())
\ No newline at end of file
+# Changing a party changes its parent's branches.
+register_versioned(Party, follow=("parent",))
@@ -0,0 +1,161 @@
+# coding=utf-8
+from collections import defaultdict
+from django.db import models
+from django.db.models import F, Q
+from politics.utils.models import bulk_insert, bulk_insert_missing
+
+
+class PartyAgreementManager(models.Manager):
+    """The default :class:`PartyAgreement` manager."""
+
+    def _filter_pairs(self, party_pk, other_party_pks):
+        """Returns the agreements between a party and a number of others."""
+        lower = [pk for pk in other_party_pks if pk < party_pk]
+        higher = [pk for pk in other_party_pks if pk > party_pk]
+
+        return self.get_query_set().filter(
+                Q(first_party__in=lower, second_party=party_pk) |
+                Q(first_party=party_pk, second_party__in=higher))
+
+    def apply_stance_change(self, view, old_stance):
+        """Adjust the counters of a party whose stance on an issue changed.
+
+        Only the counters of pairs involving the view's party can change, and
+        only by one, so this costs a constant number of queries regardless of
+        how many issues or parties there are.
+
+        :param       view: The view whose stance changed (already saved).
+        :type        view: :class:`View`
+        :param old_stance: The view's previous stance.
+        :type  old_stance: ``str``
+        """
+        from politics.apps.core.models import View
+
+        party = view.party
+        other_views = View.objects.filter(issue=view.issue_id)
+        other_views = other_views.exclude(party=party.pk)
+        other_views = other_views.exclude(stance=View.UNKNOWN)
+
+        # We don't keep track of sub-parties' agreement with each other.
+        if party.tree_level > 0:
+            other_views = other_views.filter(party__tree_level=0)
+
+        # Group the other parties by how the counters change; there are only
+        # ever a couple of groups, so we can update each with a single query.
+        shared = (int(view.stance != View.UNKNOWN) -
+                  int(old_stance != View.UNKNOWN))
+        deltas = defaultdict(list)
+
+        other_views = other_views.values_list("party", "stance")
+        for other_party_pk, stance in other_views:
+            matching = int(stance == view.stance) - int(stance == old_stance)
+            if shared != 0 or matching != 0:
+                deltas[shared, matching].append(other_party_pk)
+
+        other_party_pks = sum(deltas.values(), [])
+        if len(other_party_pks) == 0:
+            return
+
+        # Create the agreements that don't exist yet. Another request may be
+        # creating some of them too, in which case theirs are used.
+        existing = self._filter_pairs(party.pk, other_party_pks)
+        existing = set(existing.values_list("first_party", "second_party"))
+        pairs = set((min(party.pk, pk), max(party.pk, pk))
+                    for pk in other_party_pks)
+        bulk_insert_missing(PartyAgreement(first_party_id=first_pk,
+                                           second_party_id=second_pk)
+                            for first_pk, second_pk in pairs - existing)
+
+        for (shared, matching), party_pks in deltas.iteritems():
+            self._filter_pairs(party.pk, party_pks).update(
+                    matching_count=F("matching_count") + matching,
+                    shared_count=F("shared_count") + shared)
+
+    def get_for_party(self, party_pk):
+        """Returns a party's agreement with each party it shares issues with.
+
+        :param party_pk: The party's primary key.
+        :type  party_pk: ``int``
+        :returns: Other party pk, shared issue count, matching stance count
+                  tuples for each party with at least one shared issue.
+        :rtype: ``list`` of ``tuple``
+        """
+        agreements = self.get_query_set().filter(shared_count__gt=0)
+        agreements = agreements.filter(Q(first_party=party_pk) |
+                                       Q(second_party=party_pk))
+
+        return [(first_pk if first_pk != party_pk else second_pk, shared,
+                 matching) for first_pk, second_pk, shared, matching in
+                agreements.values_list("first_party", "second_party",
+                                       "shared_count", "matching_count")]
+
+    def rebuild(self, matrix, root_party_pks):
+        """Recalculate every agreement from scratch.
+
+        :param         matrix: The stances of every party.
+        :type          matrix: ``politics.apps.core.similarity.StanceMatrix``
+        :param root_party_pks: The primary keys of the root parties.
+        :type  root_party_pks: *Iterable* of ``int``
+        """
+        agreements = {}
+        for first_pk, second_pk, shared, matching in matrix.iter_agreements(
+                matrix.party_pks, root_party_pks):
+            key = (min(first_pk, second_pk), max(first_pk, second_pk))
+            agreements[key] = (shared, matching)
+
+        self.get_query_set().all().delete()
+        bulk_insert(PartyAgreement(first_party_id=first_pk,
+                                   second_party_id=second_pk,
+                                   matching_count=matching,
+                                   shared_count=shared)
+                    for (first_pk, second_pk), (shared, matching)
+                    in agreements.iteritems())
+
+
+class PartyAgreement(models.Model):
+    """Running counts of the issues on which two parties agree.
+
+    These counters let us calculate the similarity of two parties without
+    comparing all of their views. When a party's stance on an issue changes,
+    only the counters of pairs involving that party need to be adjusted (see
+    :meth:`PartyAgreementManager.apply_stance_change`).
+
+    Only one object is stored for each pair: ``first_party`` is always the
+    party with the lower primary key. We don't keep track of agreement between
+    pairs of sub-parties as their similarity is never calculated.
+
+    :ivar    first_party: The party with the lower primary key.
+    :type    first_party: :class:`Party`
+    :ivar matching_count: The number of issues on which both parties' stances
+                          are known and equal.
+    :type matching_count: ``int``
+    :ivar   second_party: The party with the higher primary key.
+    :type   second_party: :class:`Party`
+    :ivar   shared_count: The number of issues on which both parties' stances
+                          are known.
+    :type   shared_count: ``int``
+    """
+
+    first_party = models.ForeignKey("Party", related_name="+")
+    matching_count = models.IntegerField(default=0)
+    second_party = models.ForeignKey("Party", related_name="+")
+    shared_count = models.IntegerField(default=0)
+
+    # Override the default manager.
+    objects = PartyAgreementManager()
+
+    class Meta:
+        app_label = "core"
+        unique_together = ("first_party", "second_party")
+
+    @property
+    def similarity(self):
+        """The fraction of shared issues on which the parties agree.
+
+        :returns: The similarity or ``None`` if the parties share no issues.
+        :rtype: ``float`` or ``None``
+        """
+        if self.shared_count == 0:
+            return None
+
+        return self.matching_count / float(self.shared_count)
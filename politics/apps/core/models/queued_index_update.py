@@ -0,0 +1,69 @@
+# coding=utf-8
+from datetime import datetime
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.db.models import Min
+from politics.utils.models import bulk_insert
+
+
+class QueuedIndexUpdateManager(models.Manager):
+    """The default :class:`QueuedIndexUpdate` manager."""
+
+    def enqueue(self, model, pks):
+        """Mark objects as needing to be updated in the search index.
+
+        :param model: The objects' model.
+        :type  model: ``django.db.models.Model`` subclass
+        :param   pks: The objects' primary keys.
+        :type    pks: *Iterable* of ``int``
+        """
+        content_type = ContentType.objects.get_for_model(model)
+        bulk_insert(QueuedIndexUpdate(content_type=content_type, object_id=pk)
+                    for pk in set(pks))
+
+    def get_stats(self):
+        """Returns the size and age of the queue.
+
+        :returns: A dictionary with ``depth`` (the number of queued updates)
+                  and ``lag`` (the age of the oldest update in seconds, or 0
+                  if the queue is empty) keys.
+        :rtype: ``dict``
+        """
+        stats = self.get_query_set().aggregate(depth=models.Count("pk"),
+                                               oldest=Min("queued_at"))
+
+        lag = 0
+        if stats["oldest"] is not None:
+            lag = (datetime.now() - stats["oldest"]).total_seconds()
+
+        return {"depth": stats["depth"], "lag": max(0, int(lag))}
+
+
+class QueuedIndexUpdate(models.Model):
+    """An object that has changed since it was last indexed.
+
+    Updating the search index from the request that changed an object would
+    make every save wait for the search backend, so changed objects are queued
+    and indexed in batches by a periodic task. Inserting a row is cheap and is
+    rolled back along with the change.
+
+    An object may be queued more than once before the queue is processed; it's
+    only indexed once. Objects that no longer exist are removed from the index.
+
+    :ivar content_type: The object's content type.
+    :type content_type: ``django.contrib.contenttypes.models.ContentType``
+    :ivar    object_id: The object's primary key.
+    :type    object_id: ``int``
+    :ivar    queued_at: When the object was queued.
+    :type    queued_at: ``datetime.datetime``
+    """
+
+    content_type = models.ForeignKey(ContentType, related_name="+")
+    object_id = models.PositiveIntegerField()
+    queued_at = models.DateTimeField(default=datetime.now)
+
+    # Override the default manager.
+    objects = QueuedIndexUpdateManager()
+
+    class Meta:
+        app_label = "core"
@@ -4,6 +4,7 @@ from django.db import models
 from politics.apps.votes.fields import ScoreField
 from politics.apps.core.models import View
 from politics.apps.votes.models import Vote
+from politics.utils.cache import register_versioned
 from politics.utils.models import MarkdownField
 
 
@@ -16,32 +17,38 @@ class Reference(models.Model):
     Each reference has a ``score`` which is an indication of its quality or how
     well it "backs up" the view. This is calculated from the votes it receives.
 
-    :ivar      author: The user that submitted the reference.
-    :type      author: ``django.contrib.auth.models.User``
-    :ivar  created_at: When the reference was created.
-    :type  created_at: ``datetime.datetime``
-    :ivar published_on: When the information itself was published (e.g. when a
-                        news article was posted online or printed in the paper).
-    :type published_on: ``datetime.date`` or ``None``
-    :ivar       score: A cached version of the reference's score. This is
-                       updated automagically when its vote set changes.
-    :type       score: ``int``
-    :ivar      stance: The stance that this reference concerns.
-    :type      stance: ``str``
-    :ivar        text: An excerpt from the reference in Markdown format (e.g. a
-                       quote that clarifies the party's stance). Blank if the
-                       reference cannot be adequately summarised in such a way.
-    :type        text: ``str``
-    :ivar   text_html: The reference's text converted to HTML.
-    :type   text_html: ``str``
-    :ivar       title: The title of the reference.
-    :type       title: ``str``
-    :ivar         url: The URL of the reference. May be FTP or HTTP(S).
-    :type         url: ``str``
-    :ivar        view: The issue/party pair that this reference concerns.
-    :type        view: :class:`View`
-    :ivar       votes: Votes that have been cast on the reference.
-    :type       votes: ``QuerySet`` of :class:`Vote`s
+    :ivar          author: The user that submitted the reference.
+    :type          author: ``django.contrib.auth.models.User``
+    :ivar      created_at: When the reference was created.
+    :type      created_at: ``datetime.datetime``
+    :ivar down_vote_count: The number of current down votes on the reference.
+    :type down_vote_count: ``int``
+    :ivar    published_on: When the information itself was published (e.g.
+                           when a news article was posted online or printed in
+                           the paper).
+    :type    published_on: ``datetime.date`` or ``None``
+    :ivar           score: A cached version of the reference's score. This is
+                           updated automagically when its vote set changes.
+    :type           score: ``int``
+    :ivar          stance: The stance that this reference concerns.
+    :type          stance: ``str``
+    :ivar            text: An excerpt from the reference in Markdown format
+                           (e.g. a quote that clarifies the party's stance).
+                           Blank if the reference cannot be adequately
+                           summarised in such a way.
+    :type            text: ``str``
+    :ivar       text_html: The reference's text converted to HTML.
+    :type       text_html: ``str``
+    :ivar           title: The title of the reference.
+    :type           title: ``str``
+    :ivar   up_vote_count: The number of current up votes on the reference.
+    :type   up_vote_count: ``int``
+    :ivar             url: The URL of the reference. May be FTP or HTTP(S).
+    :type             url: ``str``
+    :ivar            view: The issue/party pair that this reference concerns.
+    :type            view: :class:`View`
+    :ivar           votes: Votes that have been cast on the reference.
+    :type           votes: ``QuerySet`` of :class:`Vote`s
     """
 
     # Stances that a `Reference` may support.
@@ -53,12 +60,14 @@ class Reference(models.Model):
 
     author = models.ForeignKey("auth.User")
     created_at = models.DateTimeField(auto_now_add=True)
+    down_vote_count = models.IntegerField(default=0)
     published_on = models.DateField(blank=True, null=True)
-    score = ScoreField()
+    score = ScoreField(down_field="down_vote_count", up_field="up_vote_count")
     stance = models.CharField(choices=STANCE_CHOICES, max_length=7)
     text = MarkdownField(blank=True, disable=["images"])
     text_html = models.TextField(blank=True)
     title = models.CharField(max_length=64)
+    up_vote_count = models.IntegerField(default=0)
 
     # TODO: Support references that aren't webpages.
     # TODO: Should we be validating URLs (ensuring they're online)?
@@ -122,6 +131,13 @@ class Reference(models.Model):
         send_comment_notification_emails.delay(comment.pk, subject,
                 "core/references/mail/reply.txt", authors)
 
+    def handle_score_changed(self):
+        """Update the :class:`View`'s stance.
+
+        Called when votes cast on the reference change its score.
+        """
+        self.view.refresh_stance()
+
     @staticmethod
     def update_view(instance, **kwargs):
         """Update the :class:`View`'s stance.
@@ -147,4 +163,7 @@ models.signals.post_save.connect(Reference.create_author_vote, sender=Reference)
 
 # Update views when their references change.
 models.signals.post_delete.connect(Reference.update_view, sender=Reference)
-models.signals.post_save.connect(Reference.update_view, sender=Reference)
\ No newline at end of file
+models.signals.post_save.connect(Reference.update_view, sender=Reference)
+
+# Changing a reference changes what's known about its view.
+register_versioned(Reference, follow=("view",))
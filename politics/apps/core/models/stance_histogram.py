@@ -0,0 +1,261 @@
+# coding=utf-8
+from django.db import connection, IntegrityError, models, transaction
+from django.db.models import Count, F
+from politics.apps.core.models import Issue, Party, View
+
+
+class StanceHistogramManager(models.Manager):
+    """The default :class:`StanceHistogram` manager."""
+
+    def apply_stance_change(self, view, old_stance):
+        """Adjust the counts of an issue on which a party's stance changed.
+
+        :param       view: The view whose stance changed (already saved).
+        :type        view: :class:`View`
+        :param old_stance: The view's previous stance.
+        :type  old_stance: ``str``
+        """
+        self.adjust(view, old_stance, -1)
+        self.adjust(view, view.stance, 1)
+
+    def adjust(self, view, stance, delta):
+        """Add to the count of views on a view's issue with a stance.
+
+        If the issue doesn't have a histogram yet, nothing happens: it's built
+        from scratch when it's first requested. The known view counters of the
+        view's issue and party are adjusted too.
+
+        :param   view: The view.
+        :type    view: :class:`View`
+        :param stance: The stance whose count is to be adjusted.
+        :type  stance: ``str``
+        :param  delta: The amount to add to the count.
+        :type   delta: ``int``
+        """
+        field = StanceHistogram.get_count_field(stance)
+
+        if stance != View.UNKNOWN:
+            Party.objects.filter(pk=view.party_id).update(
+                    known_view_count=F("known_view_count") + delta)
+
+            if view.party.tree_level == 0:
+                Issue.objects.filter(pk=view.issue_id).update(
+                        known_root_party_count=F("known_root_party_count") +
+                        delta)
+
+        self.get_query_set().filter(issue=view.issue_id).update(
+                **{field: F(field) + delta})
+
+    def get_for_issue(self, issue):
+        """Returns an issue's histogram, building it if necessary.
+
+        :param issue: The issue or its primary key.
+        :type  issue: :class:`Issue` or ``int``
+        :rtype: :class:`StanceHistogram`
+        """
+        try:
+            return self.get_query_set().get(issue=issue)
+        except StanceHistogram.DoesNotExist:
+            return self.rebuild(issue)
+
+    def rebuild(self, issue):
+        """Count the stances on an issue from scratch.
+
+        :param issue: The issue or its primary key.
+        :type  issue: :class:`Issue` or ``int``
+        :rtype: :class:`StanceHistogram`
+        """
+        issue_pk = getattr(issue, "pk", issue)
+        views = View.objects.filter(issue=issue_pk)
+
+        histogram = StanceHistogram(issue_id=issue_pk)
+        for stance, count in views.values_list("stance").annotate(
+                count=Count("pk")):
+            setattr(histogram, StanceHistogram.get_count_field(stance), count)
+
+        # Another request may be rebuilding the histogram at the same time, in
+        # which case saving it violates the issue's uniqueness; use theirs.
+        savepoint = transaction.savepoint()
+        try:
+            self.get_query_set().filter(issue=issue_pk).delete()
+            histogram.save()
+        except IntegrityError:
+            transaction.savepoint_rollback(savepoint)
+            return self.get_query_set().get(issue=issue_pk)
+
+        transaction.savepoint_commit(savepoint)
+        return histogram
+
+
+class StanceHistogram(models.Model):
+    """The number of parties that take each stance on an issue.
+
+    Counting the stances of an issue's views is a common operation, so the
+    counts are stored and updated whenever a view is created or deleted or its
+    stance changes. Histograms that are missing (e.g. because a party was
+    deleted along with its views) are rebuilt on demand.
+
+    The number of root parties whose stance is known is stored on the issue
+    (see ``Issue.known_root_party_count``), but it's kept up to date here.
+
+    :ivar         issue: The issue.
+    :type         issue: :class:`Issue`
+    :ivar  oppose_count: The number of views that oppose the issue.
+    :type  oppose_count: ``int``
+    :ivar support_count: The number of views that support the issue.
+    :type support_count: ``int``
+    :ivar unclear_count: The number of views whose stance is unclear.
+    :type unclear_count: ``int``
+    :ivar unknown_count: The number of saved views whose stance is unknown.
+                         Parties without a view on the issue aren't counted.
+    :type unknown_count: ``int``
+    """
+
+    issue = models.OneToOneField("Issue", related_name="stance_histogram")
+    oppose_count = models.IntegerField(default=0)
+    support_count = models.IntegerField(default=0)
+    unclear_count = models.IntegerField(default=0)
+    unknown_count = models.IntegerField(default=0)
+
+    # Override the default manager.
+    objects = StanceHistogramManager()
+
+    class Meta:
+        app_label = "core"
+
+    @staticmethod
+    def get_count_field(stance):
+        """Returns the name of the field that counts views with a stance."""
+        return "%s_count" % stance
+
+    def get_count(self, stance):
+        """Returns the number of views on the issue with a stance.
+
+        :param stance: The stance.
+        :type  stance: ``str``
+        :rtype: ``int``
+        """
+        return getattr(self, self.get_count_field(stance))
+
+    def get_known_counts(self):
+        """Returns the number of views with each known stance.
+
+        :returns: A dictionary mapping stances to counts. Stances that no
+                  party takes are omitted.
+        :rtype: ``dict``
+        """
+        stances = (View.OPPOSE, View.SUPPORT, View.UNCLEAR)
+        return dict((stance, self.get_count(stance)) for stance in stances
+                    if self.get_count(stance) > 0)
+
+    @staticmethod
+    def invalidate(**kwargs):
+        """Delete every histogram so that they're rebuilt when next requested.
+
+        Called when a party is deleted, as its views are deleted without being
+        uncounted (see :meth:`update_view_deleted`). The issues'
+        ``known_root_party_count`` counters are recounted too.
+        """
+        if kwargs.get("raw"):
+            return
+
+        StanceHistogram.objects.all().delete()
+        StanceHistogram.recount_known_root_parties()
+
+    @staticmethod
+    def recount_known_root_parties():
+        """Recount every issue's ``known_root_party_count``."""
+        # Django can't express an update from a subquery, so we write it
+        # ourselves; it's a single query regardless of how many issues exist.
+        quote_name = connection.ops.quote_name
+        issue_meta = Issue._meta
+        party_meta = Party._meta
+        view_meta = View._meta
+        sql = ("UPDATE %(issue)s SET %(count)s = (SELECT COUNT(*) "
+               "FROM %(view)s INNER JOIN %(party)s "
+               "ON %(view)s.%(view_party)s = %(party)s.%(party_pk)s "
+               "WHERE %(view)s.%(view_issue)s = %(issue)s.%(issue_pk)s "
+               "AND %(party)s.%(tree_level)s = 0 "
+               "AND %(view)s.%(stance)s != %%s)") % {
+            "count": quote_name(issue_meta.get_field(
+                    "known_root_party_count").column),
+            "issue": quote_name(issue_meta.db_table),
+            "issue_pk": quote_name(issue_meta.pk.column),
+            "party": quote_name(party_meta.db_table),
+            "party_pk": quote_name(party_meta.pk.column),
+            "stance": quote_name(view_meta.get_field("stance").column),
+            "tree_level": quote_name(party_meta.get_field("tree_level").column),
+            "view": quote_name(view_meta.db_table),
+            "view_issue": quote_name(view_meta.get_field("issue").column),
+            "view_party": quote_name(view_meta.get_field("party").column)
+        }
+
+        connection.cursor().execute(sql, (View.UNKNOWN,))
+        transaction.set_dirty()
+
+    @staticmethod
+    def update_party_loaded(instance, **kwargs):
+        """Remember the parent a party was loaded with.
+
+        MPTT's own copy is updated before the party's saved, so it can't be
+        used to tell whether the party moved.
+
+        :param instance: The party that was loaded.
+        :type  instance: :class:`Party`
+        """
+        instance._saved_parent_id = instance.parent_id
+
+    @staticmethod
+    def update_party_saved(instance, created, **kwargs):
+        """Recount the issues' known root parties if a party moved in the tree.
+
+        New parties don't have any views yet, and a party's level only
+        changes if its parent does (or an ancestor's, which is saved itself).
+
+        :param instance: The party that was saved.
+        :type  instance: :class:`Party`
+        """
+        if not created and not kwargs.get("raw") and \
+                instance.parent_id != instance._saved_parent_id:
+            StanceHistogram.recount_known_root_parties()
+
+        instance._saved_parent_id = instance.parent_id
+
+    @staticmethod
+    def update_view_created(instance, created, **kwargs):
+        """Count a new view.
+
+        :param instance: The view that was saved.
+        :type  instance: :class:`View`
+        """
+        # Don't bother if we're loading from a fixture.
+        if created and not kwargs.get("raw"):
+            StanceHistogram.objects.adjust(instance, instance.stance, 1)
+
+    @staticmethod
+    def update_view_deleted(instance, **kwargs):
+        """Stop counting a deleted view.
+
+        :param instance: The view that was deleted.
+        :type  instance: :class:`View`
+        """
+        # When a party is deleted its views are deleted before it is, but
+        # invalidate() will take care of their counts.
+        try:
+            StanceHistogram.objects.adjust(instance, instance.stance, -1)
+        except Party.DoesNotExist:
+            pass
+
+
+# Keep the counts up to date as views are created and deleted.
+models.signals.post_delete.connect(StanceHistogram.update_view_deleted,
+                                   sender=View)
+models.signals.post_save.connect(StanceHistogram.update_view_created,
+                                 sender=View)
+
+# Deleting parties and moving them in the tree affects the counts.
+models.signals.post_delete.connect(StanceHistogram.invalidate, sender=Party)
+models.signals.post_save.connect(StanceHistogram.update_party_saved,
+                                 sender=Party)
+models.signals.post_init.connect(StanceHistogram.update_party_loaded,
+                                 sender=Party)
@@ -1,9 +1,37 @@
 # coding=utf-8
 from autoslug.fields import AutoSlugField
 from django.db import models
+from django.db.models import Max
+from politics.utils.cache import get_cached, register_versioned
 import reversion
 
 
+class TagManager(models.Manager):
+    """The default :class:`Tag` manager."""
+
+    def get_active(self, count=15):
+        """Returns the tags of the most recently updated issues.
+
+        The tags are found with a single query and the result is cached until
+        an issue or tag changes (including when tags are assigned to issues).
+
+        :param count: The maximum number of tags to return.
+        :type  count: ``int``
+        :returns: Tags in descending order of when one of their issues was
+                  last updated.
+        :rtype: ``list`` of :class:`Tag`
+        """
+        from politics.apps.core.models import Issue
+
+        def _get_active():
+            tags = self.get_query_set().annotate(
+                    issue_updated_at=Max("issue__updated_at"))
+            tags = tags.filter(issue_updated_at__isnull=False)
+            return list(tags.order_by("-issue_updated_at", "name")[:count])
+
+        return get_cached("active_tags", _get_active, Issue, Tag, count)
+
+
 class Tag(models.Model):
     """A marker to group logically related issues.
 
@@ -20,6 +48,9 @@ class Tag(models.Model):
     slug = AutoSlugField(always_update=True, max_length=64,
                          populate_from="name")
 
+    # Override the default manager.
+    objects = TagManager()
+
     class Meta:
         app_label = "core"
 
@@ -31,3 +62,6 @@ class Tag(models.Model):
 # they are versioned. We do it here to avoid creating a VersionAdmin subclass
 # in admin.py—its history doesn't need to be shown in the admin interface.
 reversion.register(Tag)
+
+# Keep track of versions for cache keys (see politics.utils.cache).
+register_versioned(Tag)
@@ -0,0 +1,146 @@
+# coding=utf-8
+from django.db import models
+from django.db.models import F, Q
+from politics.apps.core.models import Issue
+from politics.utils.models import bulk_insert_missing
+
+
+class TagCooccurrenceManager(models.Manager):
+    """The default :class:`TagCooccurrence` manager."""
+
+    def adjust(self, tag_pks, other_tag_pks, delta):
+        """Add to the counts of pairs of tags that changed on an issue.
+
+        Every pair involving one of ``tag_pks`` (the tags that were assigned to
+        or removed from an issue) and another of the issue's tags is adjusted
+        with a single query.
+
+        :param       tag_pks: The primary keys of the tags that changed.
+        :type        tag_pks: *Iterable* of ``int``
+        :param other_tag_pks: The primary keys of the issue's other tags.
+        :type  other_tag_pks: *Iterable* of ``int``
+        :param         delta: The amount to add to the counts.
+        :type          delta: ``int``
+        """
+        tag_pks = set(tag_pks)
+        other_tag_pks = set(other_tag_pks) - tag_pks
+        all_tag_pks = tag_pks | other_tag_pks
+
+        pairs = set((first_pk, second_pk) for first_pk in tag_pks
+                    for second_pk in all_tag_pks if first_pk != second_pk)
+        pairs |= set((second_pk, first_pk) for first_pk, second_pk in pairs)
+        if len(pairs) == 0:
+            return
+
+        cooccurrences = self.get_query_set().filter(
+                Q(tag__in=tag_pks, other_tag__in=all_tag_pks) |
+                Q(tag__in=other_tag_pks, other_tag__in=tag_pks))
+
+        # Create the pairs that don't exist yet. Another request may be
+        # creating some of them too, in which case theirs are used.
+        if delta > 0:
+            existing = set(cooccurrences.values_list("tag", "other_tag"))
+            bulk_insert_missing(TagCooccurrence(tag_id=tag_pk,
+                                                other_tag_id=other_pk)
+                                for tag_pk, other_pk in pairs - existing)
+
+        cooccurrences.update(count=F("count") + delta)
+
+        # Tags that no longer share any issues aren't related.
+        if delta < 0:
+            cooccurrences.filter(count__lte=0).delete()
+
+    def get_related(self, tag, count=None):
+        """Returns the tags that are most often assigned alongside a tag.
+
+        :param   tag: The tag.
+        :type    tag: :class:`Tag`
+        :param count: The maximum number of tags to return (all if ``None``).
+        :type  count: ``int`` or ``None``
+        :returns: Tags in descending order of the number of issues they share
+                  with ``tag``.
+        :rtype: ``list`` of :class:`Tag`
+        """
+        cooccurrences = self.get_query_set().filter(tag=tag)
+        cooccurrences = cooccurrences.select_related("other_tag")
+        cooccurrences = cooccurrences.order_by("-count", "other_tag__name")
+
+        if count is not None:
+            cooccurrences = cooccurrences[:count]
+
+        return [cooccurrence.other_tag for cooccurrence in cooccurrences]
+
+
+class TagCooccurrence(models.Model):
+    """The number of issues to which two tags are both assigned.
+
+    These counts let us find the tags related to a tag with a single query
+    rather than by counting the tags of every issue that has the tag. They're
+    adjusted whenever tags are assigned to or removed from issues.
+
+    Two objects are stored for each pair of tags (one for each direction) so
+    that the related tags of a tag can be looked up by ``tag`` alone.
+
+    :ivar     count: The number of issues to which both tags are assigned.
+    :type     count: ``int``
+    :ivar other_tag: The other tag.
+    :type other_tag: :class:`Tag`
+    :ivar       tag: The tag.
+    :type       tag: :class:`Tag`
+    """
+
+    count = models.IntegerField(default=0)
+    other_tag = models.ForeignKey("Tag", related_name="+")
+    tag = models.ForeignKey("Tag", related_name="+")
+
+    # Override the default manager.
+    objects = TagCooccurrenceManager()
+
+    class Meta:
+        app_label = "core"
+        unique_together = ("tag", "other_tag")
+
+    @staticmethod
+    def update_tags_changed(instance, action, reverse, pk_set, **kwargs):
+        """Adjust the counts when tags are assigned to or removed from issues.
+
+        :param instance: The issue (or tag, if ``reverse``) whose tags (or
+                         issues) changed.
+        :type  instance: :class:`Issue` or :class:`Tag`
+        :param   action: The kind of change.
+        :type    action: ``str``
+        :param  reverse: Whether the change was made from the tag's side.
+        :type   reverse: ``bool``
+        :param   pk_set: The primary keys of the tags (or issues) that were
+                         assigned or removed.
+        :type    pk_set: ``set`` of ``int``
+        """
+        if action not in ("post_add", "post_remove", "pre_clear"):
+            return
+
+        through = Issue.tags.through
+        get_tag_pks = lambda issue_pk: set(through.objects.filter(
+                issue=issue_pk).values_list("tag", flat=True))
+
+        # Find the tags that changed on each issue.
+        if not reverse:
+            changes = [(instance.pk, pk_set)]
+        elif action == "pre_clear":
+            changes = [(issue_pk, set([instance.pk])) for issue_pk
+                       in through.objects.filter(tag=instance.pk)
+                       .values_list("issue", flat=True)]
+        else:
+            changes = [(issue_pk, set([instance.pk])) for issue_pk in pk_set]
+
+        for issue_pk, tag_pks in changes:
+            if action == "pre_clear" and not reverse:
+                tag_pks = get_tag_pks(issue_pk)
+
+            delta = 1 if action == "post_add" else -1
+            TagCooccurrence.objects.adjust(tag_pks, get_tag_pks(issue_pk),
+                                           delta)
+
+
+# Keep the counts up to date as tags are assigned to and removed from issues.
+models.signals.m2m_changed.connect(TagCooccurrence.update_tags_changed,
+                                   sender=Issue.tags.through)
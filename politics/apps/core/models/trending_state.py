@@ -0,0 +1,49 @@
+# coding=utf-8
+from datetime import datetime
+from django.db import models
+
+
+class TrendingStateManager(models.Manager):
+    """The default :class:`TrendingState` manager."""
+
+    def get_current(self):
+        """Returns the state, creating it if it doesn't exist yet.
+
+        :rtype: :class:`TrendingState`
+        """
+        return self.get_or_create(pk=1)[0]
+
+
+class TrendingState(models.Model):
+    """How far the issues' trending scores have been refreshed.
+
+    There's only one, which is updated in the same transaction as the scores
+    (see :func:`politics.apps.core.trending.refresh_trending_scores`). Activity
+    is found by primary key rather than by time, so activity that's stored
+    after a refresh that it's older than (e.g. flushed page views) is still
+    counted by the next one. Activity is only counted once it's
+    ``COMMIT_DELAY`` old; activity whose transaction takes longer than that to
+    commit is missed if activity with a higher primary key has been counted.
+
+    :ivar        epoch: When activity is counted at its full weight; activity
+                        after it is counted at more (see
+                        :mod:`politics.apps.core.trending`).
+    :type        epoch: ``datetime.datetime``
+    :ivar page_view_pk: The primary key of the last page view counted.
+    :type page_view_pk: ``int``
+    :ivar reference_pk: The primary key of the last reference counted.
+    :type reference_pk: ``int``
+    :ivar      vote_pk: The primary key of the last vote counted.
+    :type      vote_pk: ``int``
+    """
+
+    epoch = models.DateTimeField(default=datetime.now)
+    page_view_pk = models.PositiveIntegerField(default=0)
+    reference_pk = models.PositiveIntegerField(default=0)
+    vote_pk = models.PositiveIntegerField(default=0)
+
+    # Override the default manager.
+    objects = TrendingStateManager()
+
+    class Meta:
+        app_label = "core"
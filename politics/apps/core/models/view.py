@@ -1,7 +1,9 @@
 # coding=utf-8
-from datetime import date, datetime, time
+from datetime import date, datetime
 from django.core.urlresolvers import reverse
 from django.db import models
+from politics.utils.cache import register_versioned
+from politics.utils.tasks import delay_coalesced
 import reversion
 
 
@@ -40,6 +42,12 @@ class View(models.Model):
       UNKNOWN_CHOICE,
     )
 
+    # The reference that is currently determining the view's stance. This is
+    # found by ``refresh_stance()`` and stored so that we don't have to query
+    # and sort the view's references whenever we display it.
+    current_reference = models.ForeignKey("Reference", blank=True, null=True,
+                                          on_delete=models.SET_NULL,
+                                          related_name="+")
     issue = models.ForeignKey("Issue")
 
     # How notable/interesting this view is; higer values are more notable. This
@@ -69,21 +77,41 @@ class View(models.Model):
             "party_slug": self.party.slug
         })
 
-    def get_current_reference(self):
-        """Fetch the view's currently "winning" reference.
+    def find_current_reference(self):
+        """Find the view's currently "winning" reference in the database.
 
-        That is, the reference that is currently determining its stance.
+        That is, the most recently published reference with a score of at least
+        0.5. References without a publication date are ordered by the time
+        they were created and ties are broken by primary key, so the database
+        does the work with an ``ORDER BY ... LIMIT 1`` query.
+
+        :rtype: :class:`Reference` or ``None``
         """
-        def _get_published_on(reference):
-            if not reference.published_on:
-                return reference.created_at
-            else:
-                return datetime.combine(reference.published_on, time())
+        from politics.apps.core.models import Reference
+
+        meta = Reference._meta
+        published_on = "COALESCE(%s.%s, %s.%s)" % (
+            meta.db_table, meta.get_field("published_on").column,
+            meta.db_table, meta.get_field("created_at").column
+        )
 
         references = self.reference_set.filter(score__gte=0.5)
-        references = sorted(references, key=_get_published_on, reverse=True)
+        references = references.extra(select={"date": published_on},
+                                      order_by=("-date", "pk"))
+
+        references = references[:1]
         return references[0] if len(references) > 0 else None
 
+    def get_current_reference(self):
+        """Fetch the view's currently "winning" reference.
+
+        That is, the reference that is currently determining its stance. This
+        is stored on the view by :meth:`refresh_stance`.
+
+        :rtype: :class:`Reference` or ``None``
+        """
+        return self.current_reference
+
     def refresh_stance(self):
         """Recalculate the view's ``stance``.
 
@@ -95,9 +123,10 @@ class View(models.Model):
         (their scores reflect the votes cast). If the stance changes, the
         :class:`Issue` is saved to touch its ``updated_at`` timestamp.
         """
-        from politics.apps.core.models import Issue
-        from politics.apps.core.tasks import (calculate_party_similarities,
-                                              calculate_view_notability)
+        from politics.apps.core.models import (Issue, PartyAgreement,
+                                               StanceHistogram)
+        from politics.apps.core.tasks import (calculate_issue_notability,
+                                              calculate_party_similarities)
 
         # In cascading deletes, the view's issue may not exist anymore.
         try:
@@ -105,9 +134,19 @@ class View(models.Model):
         except Issue.DoesNotExist:
             return
 
-        stance = getattr(self.get_current_reference(), "stance", self.UNKNOWN)
+        reference = self.find_current_reference()
+        if getattr(reference, "pk", None) != self.current_reference_id:
+            self.current_reference = reference
+
+            # Don't touch updated_at or create a version: only the stance is
+            # interesting and that's handled below.
+            View.objects.filter(pk=self.pk).update(current_reference=reference)
+
+        stance = getattr(reference, "stance", self.UNKNOWN)
 
         if stance != self.stance:
+            old_stance = self.stance
+
             # Create a version so we have a history of the party's views.
             with reversion.create_revision():
                 self.stance = stance
@@ -117,14 +156,18 @@ class View(models.Model):
             # a party's stance changes, the issue appears in the active stream.
             # The issue is guaranteed to exist because we checked above.
             self.issue.save()
+            StanceHistogram.objects.apply_stance_change(self, old_stance)
 
-            # The party's stance changed, so recalculate its similarities.
-            calculate_party_similarities.delay(self.party.pk)
+            # Only the agreement between this party and the others changed, so
+            # adjust those counters and recalculate the party's similarities.
+            # A burst of votes can change the stance several times in a row,
+            # so these tasks are coalesced: each is only queued once.
+            PartyAgreement.objects.apply_stance_change(self, old_stance)
+            delay_coalesced(calculate_party_similarities, self.party_id)
 
             # A view's notability is calculated, in part, from other parties'
             # stances on the issue; recalculate all notabilities for the issue.
-            for view in self.issue.view_set.all():
-                calculate_view_notability.delay(view.pk)
+            delay_coalesced(calculate_issue_notability, self.issue_id)
 
     def save(self, *args, **kwargs):
         """
@@ -134,4 +177,8 @@ class View(models.Model):
         if kwargs.pop("touch_updated_at", True):
             self.updated_at = datetime.now()
 
-        super(View, self).save(*args, **kwargs)
\ No newline at end of file
+        super(View, self).save(*args, **kwargs)
+
+
+# Changing a view changes what's known about its issue and party.
+register_versioned(View, follow=("issue", "party"))
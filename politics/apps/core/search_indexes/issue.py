@@ -1,13 +1,61 @@
 # coding=utf-8
-from ..models import Issue
+from ..models import Issue, QueuedIndexUpdate
+from .queued import QueuedSearchIndex
+from django.db.models import signals
 from haystack import site
 from haystack.indexes import *
 
 
-class IssueIndex(RealTimeSearchIndex):
+class IssueIndex(QueuedSearchIndex):
     """The :class:`Issue` search index."""
 
     text = CharField(document=True, use_template=True)
 
+    # The primary keys of the issue's tags, so that searches can be faceted by
+    # tag to find the tags related to the results without loading them.
+    tags = MultiValueField(faceted=True)
+
+    def _setup_save(self, model):
+        super(IssueIndex, self)._setup_save(model)
+        signals.m2m_changed.connect(self.enqueue_tags_changed,
+                                    sender=Issue.tags.through)
+
+    def _teardown_save(self, model):
+        super(IssueIndex, self)._teardown_save(model)
+        signals.m2m_changed.disconnect(self.enqueue_tags_changed,
+                                       sender=Issue.tags.through)
+
+    def enqueue_tags_changed(self, instance, action, reverse, pk_set,
+                             **kwargs):
+        """Queue issues whose tags changed.
+
+        Tags are indexed with the issue, but assigning them doesn't save it.
+
+        :param instance: The issue (or tag, if ``reverse``) whose tags (or
+                         issues) changed.
+        :type  instance: :class:`Issue` or :class:`Tag`
+        :param   action: The kind of change.
+        :type    action: ``str``
+        :param  reverse: Whether the change was made from the tag's side.
+        :type   reverse: ``bool``
+        :param   pk_set: The primary keys of the tags (or issues) that were
+                         assigned or removed.
+        :type    pk_set: ``set`` of ``int``
+        """
+        if action not in ("post_add", "post_remove", "pre_clear"):
+            return
+
+        if not reverse:
+            issue_pks = [instance.pk]
+        elif action == "pre_clear":
+            issue_pks = instance.issue_set.values_list("pk", flat=True)
+        else:
+            issue_pks = pk_set
+
+        QueuedIndexUpdate.objects.enqueue(Issue, issue_pks)
+
+    def prepare_tags(self, obj):
+        return [tag.pk for tag in obj.tags.all()]
+
 
 site.register(Issue, IssueIndex)
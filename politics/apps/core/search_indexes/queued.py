@@ -0,0 +1,35 @@
+# coding=utf-8
+from ..models import QueuedIndexUpdate
+from django.db.models import signals
+from haystack.indexes import SearchIndex
+
+
+class QueuedSearchIndex(SearchIndex):
+    """A search index that's kept fresh by queueing changed objects.
+
+    ``RealTimeSearchIndex`` updates the search backend whenever an object is
+    saved or deleted, so every save waits for the search backend. This index
+    records the object's primary key in :class:`QueuedIndexUpdate` instead;
+    the queue is sent to the backend in batches by
+    :func:`politics.apps.core.tasks.update_search_index`.
+    """
+
+    def _setup_save(self, model):
+        signals.post_save.connect(self.enqueue_object, sender=model)
+
+    def _setup_delete(self, model):
+        signals.post_delete.connect(self.enqueue_object, sender=model)
+
+    def _teardown_save(self, model):
+        signals.post_save.disconnect(self.enqueue_object, sender=model)
+
+    def _teardown_delete(self, model):
+        signals.post_delete.disconnect(self.enqueue_object, sender=model)
+
+    def enqueue_object(self, instance, **kwargs):
+        """Queue an object that was saved or deleted.
+
+        :param instance: The object.
+        :type  instance: ``django.db.models.Model``
+        """
+        QueuedIndexUpdate.objects.enqueue(type(instance), [instance.pk])
@@ -1,10 +1,11 @@
 # coding=utf-8
 from ..models import Tag
+from .queued import QueuedSearchIndex
 from haystack import site
 from haystack.indexes import *
 
 
-class TagIndex(RealTimeSearchIndex):
+class TagIndex(QueuedSearchIndex):
     """The :class:`Tag` search index."""
 
     text = CharField(document=True, use_template=True)
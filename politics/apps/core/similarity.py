@@ -0,0 +1,143 @@
+# coding=utf-8
+import numpy
+from politics.apps.core.models import View
+
+
+class StanceMatrix(object):
+    """A compact party × issue matrix of known stances.
+
+    Each cell holds a small integer code for the party's stance on the issue
+    (0 if it's unknown). Loading every stance into a single array lets us
+    compare every pair of parties with a couple of matrix multiplications
+    instead of comparing Python sets one pair at a time.
+
+    .. code-block:: python
+
+        >>> matrix = StanceMatrix([1, 2], [(1, 1, "support"), (2, 1, "oppose")])
+        >>> shared, matching = matrix.agreements()
+        >>> shared
+        array([[1, 1],
+               [1, 1]])
+        >>> matching
+        array([[1, 0],
+               [0, 1]])
+
+    :ivar party_pks: The primary keys of the matrix's parties (its rows).
+    :type party_pks: ``list`` of ``int``
+    :ivar   stances: The stance codes, one row per party.
+    :type   stances: ``numpy.ndarray``
+    """
+
+    # The codes used to represent known stances; 0 represents unknown.
+    STANCE_CODES = {View.OPPOSE: 1, View.SUPPORT: 2, View.UNCLEAR: 3}
+
+    def __init__(self, party_pks, views):
+        """
+        :param party_pks: The primary keys of the parties to include.
+        :type  party_pks: *Iterable* of ``int``
+        :param     views: Party, issue, stance tuples. Unknown stances and the
+                          views of parties not in ``party_pks`` are ignored.
+        :type      views: *Iterable* of ``tuple``
+        """
+        self.party_pks = list(party_pks)
+        self._party_indices = dict((pk, i) for i, pk
+                                   in enumerate(self.party_pks))
+
+        views = [(self._party_indices[party_pk], issue_pk, stance)
+                 for party_pk, issue_pk, stance in views
+                 if party_pk in self._party_indices
+                 and stance in self.STANCE_CODES]
+
+        issue_pks = sorted(set(view[1] for view in views))
+        issue_indices = dict((pk, i) for i, pk in enumerate(issue_pks))
+
+        self.stances = numpy.zeros((len(self.party_pks), len(issue_pks)),
+                                   dtype=numpy.int8)
+
+        for party_index, issue_pk, stance in views:
+            self.stances[party_index, issue_indices[issue_pk]] = \
+                    self.STANCE_CODES[stance]
+
+    @classmethod
+    def from_database(cls, party_pks):
+        """Loads the known stances of the given parties in a single query.
+
+        :param party_pks: The primary keys of the parties to include.
+        :type  party_pks: *Iterable* of ``int``
+        :rtype: :class:`StanceMatrix`
+        """
+        party_pks = list(party_pks)
+        views = View.objects.filter(party__in=party_pks)
+        views = views.exclude(stance=View.UNKNOWN)
+        return cls(party_pks, views.values_list("party", "issue", "stance"))
+
+    def index(self, party_pk):
+        """Returns the row index of a party in the matrix."""
+        return self._party_indices[party_pk]
+
+    def agreements(self, rows=None, columns=None):
+        """Counts the issues each pair of parties share and agree on.
+
+        :param    rows: Row indices of the parties to compare (all if ``None``).
+        :type     rows: *Iterable* of ``int`` or ``None``
+        :param columns: Row indices of the parties to compare them to (all if
+                        ``None``).
+        :type  columns: *Iterable* of ``int`` or ``None``
+        :returns: Two ``len(rows)`` × ``len(columns)`` integer arrays: the
+                  number of issues on which both parties' stances are known
+                  and the number of issues on which their stances are equal.
+        :rtype: ``tuple`` of ``numpy.ndarray``
+        """
+        first = self.stances if rows is None else self.stances[list(rows)]
+        second = self.stances
+        if columns is not None:
+            second = self.stances[list(columns)]
+
+        # float32 products hit the BLAS routines and are exact for counts
+        # below 2^24, which is comfortably more issues than we'll ever have.
+        def _known(stances):
+            return (stances > 0).astype(numpy.float32)
+
+        # One-hot encode the stances side-by-side so that a single product
+        # counts the matches for every stance at once.
+        def _one_hot(stances):
+            codes = sorted(self.STANCE_CODES.values())
+            return numpy.hstack([stances == code for code in codes]) \
+                    .astype(numpy.float32)
+
+        shared = numpy.dot(_known(first), _known(second).T)
+        matching = numpy.dot(_one_hot(first), _one_hot(second).T)
+        return shared.round().astype(int), matching.round().astype(int)
+
+    def iter_agreements(self, first_party_pks, second_party_pks,
+                        block_size=500):
+        """Yields the agreement counts of pairs of parties that share issues.
+
+        The comparison is made in blocks of ``block_size`` rows so that memory
+        use stays bounded, even when there are thousands of parties. A party is
+        never compared with itself.
+
+        :param  first_party_pks: The primary keys of the first parties.
+        :type   first_party_pks: *Iterable* of ``int``
+        :param second_party_pks: The primary keys of the second parties.
+        :type  second_party_pks: *Iterable* of ``int``
+        :param       block_size: The number of rows to compare at a time.
+        :type        block_size: ``int``
+        :returns: First party pk, second party pk, shared issue count, matching
+                  stance count tuples for each pair with at least one shared
+                  issue.
+        :rtype: *Iterable* of ``tuple``
+        """
+        first_party_pks = list(first_party_pks)
+        second_party_pks = list(second_party_pks)
+        columns = [self.index(pk) for pk in second_party_pks]
+
+        for start in xrange(0, len(first_party_pks), block_size):
+            block = first_party_pks[start:start + block_size]
+            shared, matching = self.agreements(
+                    [self.index(pk) for pk in block], columns)
+
+            for i, j in zip(*numpy.nonzero(shared)):
+                if block[i] != second_party_pks[j]:
+                    yield (block[i], second_party_pks[j], int(shared[i, j]),
+                           int(matching[i, j]))
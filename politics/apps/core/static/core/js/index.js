@@ -50,6 +50,83 @@
     });
   };
 
+  /**
+   * Returns a string representing the interval between two dates (e.g. "2
+   * days"), in the same way as politics.utils.timestring.interval_string.
+   */
+  AP.intervalString = function(a, b) {
+    if (a > b) {
+      var c = a;
+      a = b;
+      b = c;
+    }
+
+    var pluralize = function(number, unit) {
+      return number + " " + unit + (number == 1 ? "" : "s");
+    };
+
+    // Constant time intervals in ascending order of duration (in seconds).
+    var intervals = [[1, "second"], [60, "minute"], [3600, "hour"],
+                     [86400, "day"], [604800, "week"]];
+    var difference = (b - a) / 1000;
+
+    for (var i = 1; i < intervals.length; i++) {
+      if (difference < intervals[i][0]) {
+        var interval = intervals[i - 1];
+        return pluralize(Math.floor(difference / interval[0]), interval[1]);
+      }
+    }
+
+    // Whether b is earlier in the year than a (or in the month, from 1).
+    var fields = function(date) {
+      return [date.getMonth(), date.getDate(), date.getHours(),
+              date.getMinutes(), date.getSeconds()];
+    };
+    var isShort = function(from) {
+      var aFields = fields(a), bFields = fields(b);
+      for (var i = from; i < aFields.length; i++) {
+        if (aFields[i] != bFields[i]) {
+          return bFields[i] < aFields[i] ? 1 : 0;
+        }
+      }
+
+      return 0;
+    };
+
+    var years = b.getFullYear() - a.getFullYear();
+    if (years - isShort(0) > 0) {
+      return pluralize(years - isShort(0), "year");
+    }
+
+    var months = 12 * years + b.getMonth() - a.getMonth() - isShort(1);
+    if (months > 0) {
+      return pluralize(months, "month");
+    }
+
+    return pluralize(Math.floor(difference / 604800), "week");
+  };
+
+  /**
+   * Replaces the dates in time.ago elements with how long ago they were.
+   *
+   * They're rendered by the time_ago template tag; the intervals are worked
+   * out here because the pages that contain them are cached.
+   */
+  AP.showTimesAgo = function() {
+    var now = new Date();
+    $("time.ago").each(function() {
+      // The datetime attribute is in UTC (e.g. "2012-06-01T09:30:00Z").
+      var bits = $(this).attr("datetime").match(/\d+/g);
+      var then = new Date(Date.UTC(bits[0], bits[1] - 1, bits[2], bits[3],
+                                   bits[4], bits[5]));
+      $(this).text(AP.intervalString(then, now) + " ago");
+    });
+  };
+
+  $(function() {
+    AP.showTimesAgo();
+  });
+
   // Include a CSRF token in all AJAX requests.
   $(document).ajaxSend(function(e, request, settings) {
     var methods = /^(GET|HEAD|OPTIONS|TRACE)$/;
@@ -1,70 +1,157 @@
 # coding=utf-8
 from celery.schedules import crontab
 from celery.task import periodic_task
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.core.mail import mail_admins
-from django.db import transaction
-from django.db.models import Count
+from django.db import connection, transaction
+from django.db.models import Count, Max, Q
 from django.utils.log import AdminEmailHandler
 from djcelery_transactions import task
+from haystack import site
+from haystack.exceptions import NotRegistered
 import logging
-from politics.apps.core.models import Party, PartySimilarity, Tag, View
+from politics.apps.core.models import (Party, PartyAgreement, PartySimilarity,
+                                      QueuedIndexUpdate, StanceHistogram, Tag,
+                                      View)
+from politics.apps.core.similarity import StanceMatrix
+from politics.apps.core.trending import (REFRESH_INTERVAL,
+                                         refresh_trending_scores)
+from politics.utils.cache import bump_version, refresh_cached_count
+from politics.utils.models import bulk_insert
+from politics.utils.search import bm25_backend
+from politics.utils.tasks import coalesced
+
+
+# The search index is updated this often, so changes are searchable within
+# about this long (plus the time taken to index them).
+SEARCH_INDEX_INTERVAL = timedelta(minutes=1)
+
+# The maximum number of queued objects sent to the search backend at once.
+SEARCH_INDEX_BATCH_SIZE = 200
+
+# How long a crashed update can prevent other updates.
+SEARCH_INDEX_LOCK_TIMEOUT = 60 * 5
+
+
+def _save_party_similarities(matrix, first_party_pks, second_party_pks):
+    """Replace the similarities of some parties with freshly calculated ones.
+
+    The parties' existing :class:`PartySimilarity` objects are archived and the
+    new objects are inserted in bulk, so this costs a constant number of queries
+    regardless of how many parties there are.
+
+    :param           matrix: The stances of the parties.
+    :type            matrix: :class:`StanceMatrix`
+    :param  first_party_pks: The primary keys of the parties whose similarities
+                             are to be calculated.
+    :type   first_party_pks: *Iterable* of ``int``
+    :param second_party_pks: The primary keys of the parties that they're to be
+                             compared with.
+    :type  second_party_pks: *Iterable* of ``int``
+    """
+    agreements = matrix.iter_agreements(first_party_pks, second_party_pks)
+
+    # Archive existing PartySimilarity objects.
+    similarities = PartySimilarity.objects.filter(
+            first_party__in=first_party_pks)
+    similarities.update(is_archived=True)
+
+    # If there's no overlap in their issues, similarity is undefined (and the
+    # pair isn't yielded); otherwise, the similarity is the fraction of shared
+    # issues on which they take the same stance.
+    bulk_insert(PartySimilarity(first_party_id=first_party_pk,
+                                second_party_id=second_party_pk,
+                                similarity=matching / float(shared))
+                for first_party_pk, second_party_pk, shared, matching
+                in agreements)
+    bump_version(PartySimilarity)
 
 
 @task(ignore_result=True)
+@coalesced
 @transaction.commit_on_success
 def calculate_party_similarities(party_pk):
     """Calculate a party's similarity with every other party.
 
-    A new :class:`PartySimilarity` object is created for each result.
+    The similarities are calculated from the party's :class:`PartyAgreement`
+    counters. A new :class:`PartySimilarity` object is created for each result
+    and, if the party is a root party, for each other party's similarity to it.
+
+    Queue this task with :func:`politics.utils.tasks.delay_coalesced`.
 
     :param party_pk: The party's primary key.
     :type  party_pk: ``int``
     """
-    # Returns a party's (known) views as a set of issue/stance tuples.
-    def _get_party_view_set(party):
-        views = View.objects.filter(party=party).exclude(stance=View.UNKNOWN)
-        return set(views.values_list("issue", "stance"))
+    # Only compare with root parties. Otherwise every party would be ~100%
+    # similar to its sub-parties and this whole feature would be pointless!
+    root_party_pks = set(Party.objects.filter(tree_level=0)
+            .values_list("pk", flat=True))
 
-    party = Party.objects.get(pk=party_pk)
-    party_views = _get_party_view_set(party)
-    party_issues = set(view[0] for view in party_views)
+    agreements = PartyAgreement.objects.get_for_party(party_pk)
+    pairs = []
 
-    # Archive existing PartySimilarity objects.
-    PartySimilarity.objects.filter(first_party=party).update(is_archived=True)
+    for other_party_pk, shared, matching in agreements:
+        similarity = matching / float(shared)
 
-    # Only consider root parties. Otherwise every party would be ~100% similar
-    # to its sub-parties and this whole feature would be pointless!
-    other_parties = Party.objects.exclude(pk=party_pk).exclude(tree_level__gt=0)
-    for other_party in other_parties:
-        other_party_views = _get_party_view_set(other_party)
-        other_party_issues = set(view[0] for view in other_party_views)
+        if other_party_pk in root_party_pks:
+            pairs.append((party_pk, other_party_pk, similarity))
 
-        # Extract common views and determine the maximum possible similarity:
-        # we can only compare views where we have information on both parties.
-        common_views = party_views & other_party_views
-        maximum_similarity = len(party_issues & other_party_issues)
+        if party_pk in root_party_pks:
+            pairs.append((other_party_pk, party_pk, similarity))
 
-        # If there's no overlap in their issues, similarity is undefined;
-        # otherwise, create a PartySimilarity object to store the result.
-        if maximum_similarity > 0:
-            similarity = len(common_views) / float(maximum_similarity)
-            PartySimilarity(first_party=party, second_party=other_party,
-                            similarity=similarity).save()
+    # Archive existing PartySimilarity objects.
+    similarities = Q(first_party=party_pk)
+    if party_pk in root_party_pks:
+        similarities |= Q(second_party=party_pk)
 
+    PartySimilarity.objects.filter(similarities).update(is_archived=True)
+    bulk_insert(PartySimilarity(first_party_id=first_party_pk,
+                                second_party_id=second_party_pk,
+                                similarity=similarity)
+                for first_party_pk, second_party_pk, similarity in pairs)
+    bump_version(PartySimilarity)
 
-@task(ignore_result=True)
+
+@periodic_task(ignore_result=True, run_every=crontab(hour=1, minute=0))
 @transaction.commit_on_success
-def calculate_view_notability(view_pk):
-    """Calculate a view's notability.
+def calculate_all_party_similarities():
+    """Calculate every party's similarity with every other party.
+
+    All of the similarities are calculated in a single vectorised pass, so this
+    is much cheaper than calling :func:`calculate_party_similarities` for every
+    party. The :class:`PartyAgreement` counters are rebuilt at the same time.
+
+    Run at 1am every day to correct counters that have drifted (e.g. because a
+    party moved in the tree or views were deleted along with an issue).
+    """
+    party_pks = list(Party.objects.values_list("pk", flat=True))
+    root_party_pks = list(Party.objects.filter(tree_level=0)
+            .values_list("pk", flat=True))
+
+    matrix = StanceMatrix.from_database(party_pks)
+    PartyAgreement.objects.rebuild(matrix, root_party_pks)
+    _save_party_similarities(matrix, party_pks, root_party_pks)
+
+
+def _calculate_notabilities(histogram):
+    """Calculate the notability of each stance on an issue.
 
     .. note::
 
-        If the party's stance is unknown, the view's notability will be 0.
+        Views whose party's stance is unknown have a notability of 0, so the
+        unknown stance isn't included in the result.
 
-    :param view_pk: The view's primary key.
-    :type  view_pk: ``int``
+    :param histogram: The number of views on the issue with each known stance.
+    :type  histogram: ``dict``
+    :returns: A dictionary mapping each stance in ``histogram`` to the
+              notability of views with that stance.
+    :rtype: ``dict``
     """
-    def _calculate_stance_rarity(view):
+    def _calculate_stance_rarity(stance):
         """Calculate the rarity of a party's stance on an issue.
 
         This identifies cases where we have little/no information about other
@@ -72,10 +159,10 @@ def calculate_view_notability(view_pk):
 
         :returns: 1 if the stance is rare, 0 if it's not.
         """
-        is_rare = view.issue.view_set.exclude(stance=View.UNKNOWN).count() == 1
+        is_rare = sum(histogram.values()) == 1
         return 0.6 if is_rare else 0
 
-    def _calculate_stance_uniqueness(view):
+    def _calculate_stance_uniqueness(stance):
         """Calculate the uniqueness of a party's stance on an issue.
 
         This identifies stances that differ from the prevailing stance of other
@@ -84,29 +171,59 @@ def calculate_view_notability(view_pk):
         :returns: A value in the range 0-1 describing the stance's uniqueness;
                   a larger value indicates that the stance is "more unique."
         """
-        views = view.issue.view_set.exclude(stance=View.UNKNOWN)
-        views = views.values("stance").annotate(count=Count("stance"))
-
-        equal_count = views.filter(stance=view.stance)[0]["count"]
-        prevailing_count = views.order_by("-count")[0]["count"]
-        return 1 - equal_count / float(prevailing_count)
+        prevailing_count = max(histogram.values())
+        return 1 - histogram[stance] / float(prevailing_count)
 
-    view = View.objects.get(pk=view_pk)
-    if view.stance == View.UNKNOWN:
-        view.notability = 0
-        view.save(touch_updated_at=False)
-        return
-
-    # These functions take a View and return a score for some metric of
+    # These functions take a stance and return a score for some metric of
     # notability. These scores are combined to arrive at the total notability.
     score_calculators = [
         _calculate_stance_rarity,
         _calculate_stance_uniqueness
     ]
 
-    scores = [calculator(view) for calculator in score_calculators]
-    view.notability = max(scores)
-    view.save(touch_updated_at=False)
+    return dict((stance, max(calculator(stance)
+                             for calculator in score_calculators))
+                for stance in histogram)
+
+
+@task(ignore_result=True)
+@coalesced
+@transaction.commit_on_success
+def calculate_issue_notability(issue_pk):
+    """Calculate the notability of every view on an issue.
+
+    A view's notability depends only on its stance and the number of views on
+    the issue with each stance, so the issue's :class:`StanceHistogram` is all
+    we need and every view is updated with a single ``UPDATE`` statement.
+
+    Queue this task with :func:`politics.utils.tasks.delay_coalesced`.
+
+    :param issue_pk: The issue's primary key.
+    :type  issue_pk: ``int``
+    """
+    histogram = StanceHistogram.objects.get_for_issue(issue_pk)
+    notabilities = _calculate_notabilities(histogram.get_known_counts())
+
+    if len(notabilities) == 0:
+        View.objects.filter(issue=issue_pk).update(notability=0)
+    else:
+        # Django can't express a conditional update, so we write it ourselves.
+        quote_name = connection.ops.quote_name
+        meta = View._meta
+        sql = "UPDATE %s SET %s = CASE %s %s ELSE 0 END WHERE %s = %%s" % (
+            quote_name(meta.db_table),
+            quote_name(meta.get_field("notability").column),
+            quote_name(meta.get_field("stance").column),
+            " ".join(["WHEN %s THEN %s"] * len(notabilities)),
+            quote_name(meta.get_field("issue").column)
+        )
+
+        parameters = sum(notabilities.iteritems(), ()) + (issue_pk,)
+        connection.cursor().execute(sql, parameters)
+        transaction.set_dirty()
+
+    # The views weren't saved, so pages showing them wouldn't be purged.
+    bump_version(View)
 
 
 @periodic_task(ignore_result=True, run_every=crontab(hour=0, minute=0))
@@ -120,6 +237,163 @@ def delete_unused_tags():
     tags.filter(issue_count=0).delete()
 
 
+@periodic_task(ignore_result=True, run_every=REFRESH_INTERVAL)
+@transaction.commit_on_success
+def refresh_issue_trending_scores():
+    """Adds recent activity to the trending scores of issues.
+
+    Run every ten minutes.
+    """
+    refresh_trending_scores()
+
+
+def _get_search_backends(index):
+    """Returns the search backends that objects are indexed by.
+
+    While Solr is used, the embedded BM25 index is kept up to date too (if
+    it's saved to ``settings.HAYSTACK_BM25_PATH``) so that it can be searched
+    instead if Solr is unavailable.
+
+    Haystack's backends only log failures by default (unless
+    ``HAYSTACK_SILENTLY_FAIL`` is ``False``), which would dequeue objects that
+    weren't indexed, so these backends raise them instead.
+
+    :param index: A search index.
+    :type  index: ``haystack.indexes.SearchIndex``
+    :rtype: ``list`` of ``haystack.backends.BaseSearchBackend``
+    """
+    backends = [index.backend]
+    if getattr(settings, "HAYSTACK_BM25_PATH", None) is not None and \
+            not isinstance(index.backend, bm25_backend.SearchBackend):
+        backends.append(bm25_backend.SearchBackend(site=site))
+
+    for backend in backends:
+        backend.silently_fail = False
+
+    return backends
+
+
+def _index_objects(index, model, pks):
+    """Update objects in the search index, removing those that don't exist.
+
+    :param index: The model's search index.
+    :type  index: ``haystack.indexes.SearchIndex``
+    :param model: The objects' model.
+    :type  model: ``django.db.models.base.ModelBase``
+    :param   pks: The objects' primary keys.
+    :type    pks: ``set`` of ``int``
+    """
+    instances = list(index.index_queryset().filter(pk__in=pks))
+    removed_pks = sorted(pks - set(instance.pk for instance in instances))
+
+    for backend in _get_search_backends(index):
+        # Only commit once, after the last change to the index.
+        for pk in removed_pks:
+            commit = len(instances) == 0 and pk == removed_pks[-1]
+            backend.remove("%s.%s.%s" % (model._meta.app_label,
+                                         model._meta.module_name, pk),
+                           commit=commit)
+
+        if len(instances) > 0:
+            backend.update(index, instances)
+
+
+@transaction.commit_on_success
+def _index_queued_updates(updates):
+    """Send a batch of queued objects to the search backend and dequeue them.
+
+    The objects are loaded and indexed with one query and one request per
+    model. Queued objects that no longer exist are removed from the index, and
+    objects whose models aren't indexed anymore are dropped. If the search
+    backend fails, the transaction is rolled back so the objects stay queued
+    and are indexed by the next update.
+
+    The updates are dequeued, as are earlier updates of the same objects (they
+    might have been queued more than once). Later updates are left queued, as
+    they may have been committed after the objects were loaded.
+
+    :param updates: Primary key, content type ID, object ID tuples of queued
+                    updates, in order of primary key.
+    :type  updates: ``list`` of ``tuple``
+    """
+    object_pks = defaultdict(set)
+    for pk, content_type_pk, object_pk in updates:
+        object_pks[content_type_pk].add(object_pk)
+
+    last_pk = updates[-1][0]
+    for content_type_pk, pks in object_pks.iteritems():
+        model = ContentType.objects.get_for_id(content_type_pk).model_class()
+
+        # The model may have been deleted or stopped being indexed.
+        index = None
+        if model is not None:
+            try:
+                index = site.get_index(model)
+            except NotRegistered:
+                pass
+
+        if index is None:
+            logging.getLogger(__name__).warning("Dropped %d queued search "
+                    "index updates of content type %d, which isn't indexed.",
+                    len(pks), content_type_pk)
+        else:
+            _index_objects(index, model, pks)
+
+        QueuedIndexUpdate.objects.filter(content_type=content_type_pk,
+                                         object_id__in=pks,
+                                         pk__lte=last_pk).delete()
+
+
+@periodic_task(ignore_result=True, run_every=SEARCH_INDEX_INTERVAL)
+def update_search_index():
+    """Send the objects queued by search indexes to the search backend.
+
+    Every object that was queued when the update started is indexed, in
+    batches of ``SEARCH_INDEX_BATCH_SIZE``, before it finishes. Only one update
+    runs at a time; if another is running, this returns immediately.
+
+    Run every minute. The size and age of the queue are reported by the
+    ``search_queue_stats`` command.
+    """
+    lock_key = "update_search_index:lock"
+    if not cache.add(lock_key, True, SEARCH_INDEX_LOCK_TIMEOUT):
+        return
+
+    try:
+        last_pk = QueuedIndexUpdate.objects.aggregate(Max("pk"))["pk__max"]
+        if last_pk is None:
+            return
+
+        queue = QueuedIndexUpdate.objects.filter(pk__lte=last_pk)
+        queue = queue.order_by("pk").values_list("pk", "content_type",
+                                                 "object_id")
+
+        while True:
+            updates = list(queue[:SEARCH_INDEX_BATCH_SIZE])
+            if len(updates) == 0:
+                break
+
+            _index_queued_updates(updates)
+    finally:
+        cache.delete(lock_key)
+
+
+@task(ignore_result=True)
+def refresh_count(name, queryset, *dependencies):
+    """Count a queryset and cache the result.
+
+    Queued by :func:`politics.utils.cache.get_cached_count` when a cached
+    count is out of date, so that requests don't have to wait for it.
+
+    :param         name: The name of the count.
+    :type          name: ``str``
+    :param     queryset: The objects to count.
+    :type      queryset: ``django.db.models.query.QuerySet``
+    :param dependencies: What the count depends on.
+    """
+    refresh_cached_count(name, queryset, *dependencies)
+
+
 @task(ignore_result=True)
 def email_log_record(record):
     """Emails a log record to the site admins.
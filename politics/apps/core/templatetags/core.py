@@ -1,10 +1,16 @@
 # coding=utf-8
+from datetime import datetime, time
 from django import template
 from django.contrib.sites.models import Site
 from django.core.urlresolvers import reverse
 from django.template import Node, TemplateSyntaxError
-from politics.apps.core.models import View
+from django.template.defaultfilters import date as format_date
+from django.template.loader import render_to_string
+from politics.apps.core.models import Party, View
+from politics.apps.view_counts.templatetags.view_counts import view_count
 from politics.utils import group_n as base_group_n
+from politics.utils.cache import get_cached
+from time import mktime
 
 
 register = template.Library()
@@ -182,20 +188,37 @@ def interval_string(value, reference=None):
     return timestring.interval_string(value, reference)
 
 
-@register.inclusion_tag("core/issues/_summary.html")
+@register.simple_tag
 def issue_summary(issue, parties=None):
     """Renders a summary of an issue suitable for display in a list of issues.
 
-    :param issue: The issue.
-    :type  issue: :class:`Issue`
+    The rendered summary is cached until the issue, one of its views, a party
+    or its view count changes (see :func:`politics.utils.cache.get_cached`).
+    So that a cached summary can be rendered without querying the database,
+    the issue's view count must have been retrieved in advance by
+    ``ViewCount.objects.prefetch``.
+
+    :param   issue: The issue.
+    :type    issue: :class:`Issue`
+    :param parties: Only show the views of these parties (all if ``None``).
+    :type  parties: *Iterable* of :class:`Party`
     """
-    views = View.objects.exclude(stance=View.UNKNOWN).filter(issue=issue)
-    views = views.order_by("party__name").select_related("party")
+    def _render():
+        views = View.objects.exclude(stance=View.UNKNOWN).filter(issue=issue)
+        views = views.order_by("party__name").select_related("party")
+
+        if parties:
+            views = views.filter(party__in=parties)
+
+        return render_to_string("core/issues/_summary.html",
+                                {"issue": issue, "views": views})
 
-    if parties:
-        views = views.filter(party__in=parties)
+    if not hasattr(issue, "_view_count"):
+        raise ValueError("The issue's view count hasn't been prefetched.")
 
-    return {"issue": issue, "views": views}
+    party_pks = sorted(party.pk for party in parties or ())
+    return get_cached("issue_summary", _render, issue, Party,
+                      view_count(issue), *party_pks)
 
 
 @register.filter
@@ -215,6 +238,27 @@ def json(value):
     return json.dumps(value)
 
 
+@register.inclusion_tag("core/_keyset_page_links.html", takes_context=True)
+def keyset_page_links(context, page):
+    """Renders links to the previous and next pages of paginated content.
+
+    This is the :func:`page_links` equivalent for pages from a
+    :class:`politics.utils.paginator.KeysetPaginator`; as they have no numbers,
+    only the neighbouring pages are linked to.
+
+    :param context: The context in which the tag was used.
+    :type  context: ``dict``
+    :param    page: The current page.
+    :type     page: ``politics.utils.paginator.KeysetPage``
+
+    .. note::
+
+        The current request must be available in the context as "request"; this
+        will happen if ``django.core.context_processors.request`` is enabled.
+    """
+    return {"page": page, "request": context["request"]}
+
+
 @register.simple_tag(takes_context=True)
 def login_link(context, text):
     """Returns a link to the login view.
@@ -275,14 +319,21 @@ def page_links(context, page, near=2):
     }
 
 
-@register.inclusion_tag("core/parties/_summary.html")
+@register.simple_tag
 def party_summary(party):
     """Renders a summary of a party suitable for display in a list of parties.
 
+    The rendered summary is cached until the party, one of its views or its
+    branches change (see :func:`politics.utils.cache.get_cached`). Creating
+    or deleting issues changes the percentage of views that are known, so it
+    is part of the key too.
+
     :param party: The party.
     :type  party: :class:`Party`
     """
-    return {"party": party}
+    return get_cached("party_summary", lambda: render_to_string(
+            "core/parties/_summary.html", {"party": party}), party,
+            party.percentage_views_known)
 
 
 @register.filter
@@ -412,6 +463,31 @@ def tag_link(tag):
     )
 
 
+@register.simple_tag
+def time_ago(value):
+    """Renders how long ago a point in time was.
+
+    Pages and fragments that contain the interval are cached, so it's worked
+    out in the browser (see ``AP.showTimesAgo``). The date is shown until then.
+
+    .. code-block:: django
+
+        Last updated <strong>{% time_ago issue.updated_at %}</strong>
+
+    :param value: The point in time (in the server's time zone).
+    :type  value: ``datetime.date`` or ``datetime.datetime``
+    :returns: An HTML ``time`` element.
+    :rtype: ``str``
+    """
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time())
+
+    utc = datetime.utcfromtimestamp(mktime(value.timetuple()))
+    return "<time class=\"ago\" datetime=\"%sZ\" title=\"%s\">%s</time>" % (
+        utc.isoformat(), format_date(value, "DATETIME_FORMAT"),
+        format_date(value))
+
+
 @register.simple_tag
 def user_link(user, text=None):
     """Renders a link to a user's profile.
@@ -2,4 +2,11 @@
 from .forms import *
 from .managers import *
 from .models import *
+from .paginator import *
+from .search_backend import *
+from .similarity import *
+from .tasks import *
+from .templatetags import *
+from .trending import *
+from .versions import *
 from .views import *
\ No newline at end of file
@@ -1,6 +1,11 @@
 # coding=utf-8
 from .issue import *
 from .party import *
+from .party_agreement import *
 from .party_similarity import *
+from .queued_index_update import *
 from .reference import *
+from .stance_histogram import *
+from .tag import *
+from .tag_cooccurrence import *
 from .view import *
\ No newline at end of file
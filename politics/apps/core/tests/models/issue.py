@@ -1,6 +1,8 @@
 # coding=utf-8
+from datetime import datetime, timedelta
 from django.test import TransactionTestCase
-from politics.apps.core.models import Issue, Party
+from politics.apps.core.models import (Issue, Party, StanceHistogram, Tag,
+                                       View)
 
 
 class IssueTestCase(TransactionTestCase):
@@ -23,4 +25,48 @@ class IssueTestCase(TransactionTestCase):
     def test_percentage_views_known_no_views(self):
         """``percentage_views_known`` should return 0 when there are no views
             associated with the issue in the database."""
-        self.assertEqual(0, Issue.objects.get(pk=3).percentage_views_known)
\ No newline at end of file
+        self.assertEqual(0, Issue.objects.get(pk=3).percentage_views_known)
+
+    def test_known_root_party_count(self):
+        """``known_root_party_count`` should be kept up to date as stances
+            change and parties move in the tree."""
+        get_count = lambda: Issue.objects.get(pk=2).known_root_party_count
+
+        # The Labor Party is a root party.
+        view = View.objects.get(pk=5)
+        view.stance = View.UNKNOWN
+        view.save()
+
+        StanceHistogram.objects.apply_stance_change(view, View.SUPPORT)
+        self.assertEqual(0, get_count())
+
+        party = Party.objects.get(pk=3)
+        party.parent = None
+        party.save()
+        self.assertEqual(1, get_count())
+
+    def test_percentage_views_known_queries(self):
+        """``percentage_views_known`` shouldn't cost any queries once the
+            number of root parties has been cached."""
+        issues = list(Issue.objects.all())
+        issues[0].percentage_views_known
+
+        with self.assertNumQueries(0):
+            for issue in issues:
+                issue.percentage_views_known
+
+    def test_get_last_modified_tags(self):
+        """Assigning tags to and removing them from an issue should change
+            its last modified time."""
+        tag = Tag.objects.create(name="environment")
+        get_last_modified = lambda: Issue.objects.get(pk=1).get_last_modified()
+
+        for change in (lambda: tag.issue_set.add(Issue.objects.get(pk=1)),
+                       lambda: Issue.objects.get(pk=1).tags.remove(tag)):
+            last_week = datetime.now() - timedelta(weeks=1)
+            Issue.objects.filter(pk=1).update(tags_updated_at=last_week,
+                                              updated_at=last_week)
+            last_modified = get_last_modified()
+
+            change()
+            self.assertTrue(get_last_modified() > last_modified)
@@ -1,6 +1,6 @@
 # coding=utf-8
 from django.test import TransactionTestCase
-from politics.apps.core.models import Issue, Party
+from politics.apps.core.models import Issue, Party, View
 
 
 class PartyTestCase(TransactionTestCase):
@@ -22,4 +22,24 @@ class PartyTestCase(TransactionTestCase):
     def test_percentage_views_known_no_views(self):
         """``percentage_views_known`` should return 0 when there are no views
             associated with the party in the database."""
-        self.assertEqual(0, Party.objects.get(pk=5).percentage_views_known)
\ No newline at end of file
+        self.assertEqual(0, Party.objects.get(pk=5).percentage_views_known)
+
+    def test_known_view_count(self):
+        """``known_view_count`` should be kept up to date as views are
+            created and deleted."""
+        get_count = lambda: Party.objects.get(pk=5).known_view_count
+
+        view = View.objects.create(issue=Issue.objects.get(pk=3),
+                                   party=Party.objects.get(pk=5),
+                                   stance=View.OPPOSE)
+        self.assertEqual(1, get_count())
+
+        view.delete()
+        self.assertEqual(0, get_count())
+
+    def test_percentage_views_known_new_issue(self):
+        """``percentage_views_known`` should change when an issue is
+            created."""
+        Party.objects.get(pk=1).percentage_views_known
+        Issue.objects.create(name="Same-sex adoption")
+        self.assertEqual(60, Party.objects.get(pk=1).percentage_views_known)
@@ -0,0 +1,56 @@
+# coding=utf-8
+from django.test import TransactionTestCase
+from politics.apps.core.models import Party, PartyAgreement, View
+from politics.apps.core.similarity import StanceMatrix
+
+
+class PartyAgreementTestCase(TransactionTestCase):
+    """Unit tests for :class:`PartyAgreement`."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        PartyAgreement.objects.rebuild(*self._get_matrix())
+
+    def _get_matrix(self):
+        party_pks = Party.objects.values_list("pk", flat=True)
+        root_party_pks = Party.objects.filter(tree_level=0)
+        root_party_pks = list(root_party_pks.values_list("pk", flat=True))
+        return StanceMatrix.from_database(party_pks), root_party_pks
+
+    def _get_agreements(self):
+        agreements = PartyAgreement.objects.filter(shared_count__gt=0)
+        return set(agreements.values_list("first_party", "second_party",
+                                          "shared_count", "matching_count"))
+
+    def _change_stance(self, view_pk, stance):
+        view = View.objects.get(pk=view_pk)
+        old_stance, view.stance = view.stance, stance
+        view.save()
+
+        PartyAgreement.objects.apply_stance_change(view, old_stance)
+
+        # The counters should match those calculated from scratch.
+        expected = self._get_agreements()
+        PartyAgreement.objects.rebuild(*self._get_matrix())
+        self.assertEqual(self._get_agreements(), expected)
+
+    def test_apply_stance_change(self):
+        """``apply_stance_change()`` should adjust the counters of the view's
+            party to match its new stance."""
+        # Liberal Party, carbon tax: unknown -> oppose -> support -> unknown.
+        for stance in (View.OPPOSE, View.SUPPORT, View.UNKNOWN):
+            self._change_stance(2, stance)
+
+    def test_apply_stance_change_sub_party(self):
+        """``apply_stance_change()`` should only adjust the counters of a sub-
+            party's agreement with root parties."""
+        self._change_stance(4, View.SUPPORT)
+        self._change_stance(7, View.SUPPORT)
+        self.assertEqual({(1, 3, 1, 1), (1, 4, 1, 1)}, self._get_agreements())
+
+    def test_get_for_party(self):
+        """``get_for_party()`` should return the party's agreement with parties
+            it shares issues with."""
+        self.assertEqual([(3, 1, 0)], PartyAgreement.objects.get_for_party(1))
+        self.assertEqual([], PartyAgreement.objects.get_for_party(2))
@@ -0,0 +1,48 @@
+# coding=utf-8
+from ...models import Issue, QueuedIndexUpdate, Tag
+from django.contrib.contenttypes.models import ContentType
+from django.test import TransactionTestCase
+
+
+class QueuedIndexUpdateTestCase(TransactionTestCase):
+    """Unit tests for the :class:`QueuedIndexUpdate` class."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        # Loading the fixture queues its objects.
+        QueuedIndexUpdate.objects.all().delete()
+
+    def _get_queued(self, model):
+        content_type = ContentType.objects.get_for_model(model)
+        updates = QueuedIndexUpdate.objects.filter(content_type=content_type)
+        return set(updates.values_list("object_id", flat=True))
+
+    def test_deleted(self):
+        """Deleted objects should be queued so they're removed from the
+            index."""
+        Issue.objects.get(pk=3).delete()
+        self.assertEqual({3}, self._get_queued(Issue))
+
+    def test_get_stats(self):
+        self.assertEqual({"depth": 0, "lag": 0},
+                         QueuedIndexUpdate.objects.get_stats())
+
+        QueuedIndexUpdate.objects.enqueue(Issue, [1, 2])
+        self.assertEqual(2, QueuedIndexUpdate.objects.get_stats()["depth"])
+
+    def test_saved(self):
+        """Saving an object should queue it rather than index it."""
+        Issue.objects.get(pk=1).save()
+        self.assertEqual({1}, self._get_queued(Issue))
+
+    def test_tags_changed(self):
+        """Issues should be queued when their tags change."""
+        tag = Tag.objects.create(name="environment")
+        tag.issue_set.add(*Issue.objects.filter(pk__in=(1, 2)))
+        self.assertEqual({1, 2}, self._get_queued(Issue))
+        self.assertEqual({tag.pk}, self._get_queued(Tag))
+
+        QueuedIndexUpdate.objects.all().delete()
+        Issue.objects.get(pk=4).tags.add(tag)
+        self.assertEqual({4}, self._get_queued(Issue))
@@ -0,0 +1,92 @@
+# coding=utf-8
+from django.db import models
+from django.test import TransactionTestCase
+from politics.apps.core.models import Issue, Party, StanceHistogram, View
+from politics.utils.models import bulk_insert
+
+
+class StanceHistogramTestCase(TransactionTestCase):
+    """Unit tests for :class:`StanceHistogram`."""
+
+    fixtures = ("core_test_data",)
+
+    def _get_counts(self, issue_pk):
+        histogram = StanceHistogram.objects.get_for_issue(issue_pk)
+        return (histogram.oppose_count, histogram.support_count,
+                histogram.unclear_count, histogram.unknown_count)
+
+    def test_get_for_issue(self):
+        """``get_for_issue()`` should count the views on the issue."""
+        self.assertEqual((0, 1, 0, 3), self._get_counts(1))
+        self.assertEqual((1, 1, 0, 1), self._get_counts(2))
+        self.assertEqual((0, 0, 0, 0), self._get_counts(3))
+
+    def test_apply_stance_change(self):
+        """``apply_stance_change()`` should move a view between counts."""
+        self._get_counts(2)
+
+        view = View.objects.get(pk=7)
+        view.stance = View.SUPPORT
+        view.save()
+
+        StanceHistogram.objects.apply_stance_change(view, View.OPPOSE)
+        self.assertEqual((0, 2, 0, 1), self._get_counts(2))
+
+        # The Labor Party is a root party.
+        view = View.objects.get(pk=5)
+        view.stance = View.UNKNOWN
+        view.save()
+
+        StanceHistogram.objects.apply_stance_change(view, View.SUPPORT)
+        self.assertEqual((0, 1, 0, 2), self._get_counts(2))
+
+    def test_create_delete_view(self):
+        """Views should be counted when they're created and deleted."""
+        self._get_counts(3)
+
+        view = View.objects.create(issue=Issue.objects.get(pk=3),
+                                   party=Party.objects.get(pk=5),
+                                   stance=View.OPPOSE)
+        self.assertEqual((1, 0, 0, 0), self._get_counts(3))
+
+        view.delete()
+        self.assertEqual((0, 0, 0, 0), self._get_counts(3))
+
+    def test_invalidate(self):
+        """Deleting a party should invalidate every histogram."""
+        self._get_counts(2)
+        Party.objects.get(pk=3).delete()
+
+        self.assertEqual(0, StanceHistogram.objects.count())
+        self.assertEqual(View.objects.filter(issue=2).count(),
+                         sum(self._get_counts(2)))
+
+    def test_move_party(self):
+        """Moving a party shouldn't invalidate anything: the histograms don't
+            depend on the tree."""
+        self._get_counts(2)
+
+        party = Party.objects.get(pk=3)
+        party.parent = None
+        party.save()
+
+        self.assertEqual(1, StanceHistogram.objects.count())
+        self.assertEqual((1, 1, 0, 1), self._get_counts(2))
+
+    def test_rebuild_concurrently(self):
+        """Rebuilding a histogram that another request has just rebuilt
+            should return theirs."""
+        def _rebuild_elsewhere(instance, **kwargs):
+            bulk_insert([StanceHistogram(issue_id=instance.issue_id,
+                                         support_count=10)])
+
+        models.signals.pre_save.connect(_rebuild_elsewhere,
+                                        sender=StanceHistogram)
+        try:
+            histogram = StanceHistogram.objects.get_for_issue(2)
+        finally:
+            models.signals.pre_save.disconnect(_rebuild_elsewhere,
+                                               sender=StanceHistogram)
+
+        self.assertEqual(10, histogram.support_count)
+        self.assertEqual(1, StanceHistogram.objects.count())
@@ -0,0 +1,49 @@
+# coding=utf-8
+from datetime import datetime, timedelta
+from django.core.cache import cache
+from django.test import TransactionTestCase
+from politics.apps.core.models import Issue, Tag
+
+
+class TagTestCase(TransactionTestCase):
+    """Unit tests for :class:`Tag`."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        cache.clear()
+
+        self.tags = [Tag.objects.create(name=name) for name in "abcd"]
+        Issue.objects.get(pk=1).tags.add(*self.tags[:2])
+        Issue.objects.get(pk=2).tags.add(self.tags[2])
+
+        # Make sure the second issue was updated most recently.
+        Issue.objects.filter(pk=1).update(
+                updated_at=datetime.now() - timedelta(days=1))
+
+    def test_get_active(self):
+        """``get_active()`` should return the tags of the most recently updated
+            issues with a single query, then from the cache."""
+        a, b, c, d = self.tags
+
+        with self.assertNumQueries(1):
+            self.assertEqual([c, a, b], Tag.objects.get_active())
+
+        with self.assertNumQueries(0):
+            self.assertEqual([c, a, b], Tag.objects.get_active())
+
+        self.assertEqual([c, a], Tag.objects.get_active(2))
+
+    def test_get_active_refresh(self):
+        """The active tags should be refreshed when an issue or its tags
+            change."""
+        a, b, c, d = self.tags
+        Tag.objects.get_active()
+
+        Issue.objects.get(pk=1).save()
+        self.assertEqual([a, b, c], Tag.objects.get_active())
+
+        # Assigning tags doesn't touch the issue's updated_at timestamp.
+        Issue.objects.get(pk=3).tags.add(d)
+        self.assertEqual([a, b], Tag.objects.get_active()[:2])
+        self.assertIn(d, Tag.objects.get_active())
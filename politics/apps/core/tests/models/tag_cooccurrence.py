@@ -0,0 +1,74 @@
+# coding=utf-8
+from django.test import TransactionTestCase
+from politics.apps.core.models import Issue, Tag, TagCooccurrence
+from politics.utils.models import bulk_insert_missing
+
+
+class TagCooccurrenceTestCase(TransactionTestCase):
+    """Unit tests for :class:`TagCooccurrence`."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        self.tags = [Tag.objects.create(name=name) for name in "abc"]
+        self.issues = [Issue.objects.get(pk=pk) for pk in (1, 2)]
+
+    def _get_counts(self):
+        return dict(((cooccurrence.tag.name, cooccurrence.other_tag.name),
+                     cooccurrence.count)
+                    for cooccurrence in TagCooccurrence.objects.all())
+
+    def test_add(self):
+        """Assigning tags to an issue should count the pairs of its tags."""
+        a, b, c = self.tags
+        self.issues[0].tags.add(a, b)
+        self.issues[1].tags.add(a)
+        c.issue_set.add(*self.issues)
+
+        self.assertEqual({
+            ("a", "b"): 1, ("a", "c"): 2, ("b", "a"): 1, ("b", "c"): 1,
+            ("c", "a"): 2, ("c", "b"): 1
+        }, self._get_counts())
+
+    def test_add_concurrently(self):
+        """Pairs that another request created after they were looked up
+            should be skipped rather than violate their uniqueness."""
+        a, b, c = self.tags
+        self.issues[0].tags.add(a, b)
+
+        inserted = bulk_insert_missing([
+            TagCooccurrence(tag=a, other_tag=b),
+            TagCooccurrence(tag=a, other_tag=c, count=1)
+        ])
+
+        self.assertEqual(1, inserted)
+        self.assertEqual({("a", "b"): 1, ("a", "c"): 1, ("b", "a"): 1},
+                         self._get_counts())
+
+    def test_remove(self):
+        """Removing tags from an issue should stop counting its pairs."""
+        a, b, c = self.tags
+        self.issues[0].tags.add(a, b, c)
+        self.issues[1].tags.add(a, b)
+
+        self.issues[0].tags.remove(c)
+        self.assertEqual({("a", "b"): 2, ("b", "a"): 2}, self._get_counts())
+
+        a.issue_set.remove(self.issues[1])
+        self.assertEqual({("a", "b"): 1, ("b", "a"): 1}, self._get_counts())
+
+        self.issues[0].tags.clear()
+        self.assertEqual({}, self._get_counts())
+
+    def test_get_related(self):
+        """``get_related()`` should return the tags that share the most issues
+            with a tag."""
+        a, b, c = self.tags
+        self.issues[0].tags.add(a, b, c)
+        self.issues[1].tags.add(a, c)
+
+        self.assertEqual([c, b], TagCooccurrence.objects.get_related(a))
+        self.assertEqual([c], TagCooccurrence.objects.get_related(a, 1))
+
+        with self.assertNumQueries(1):
+            TagCooccurrence.objects.get_related(b)
@@ -1,4 +1,5 @@
 # coding=utf-8
+from datetime import date
 from django.contrib.auth.models import User
 from django.core.urlresolvers import reverse
 from django.db import IntegrityError
@@ -15,6 +16,36 @@ class ViewTestCase(TransactionTestCase):
     def setUp(self):
         self.view = View.objects.get(pk=1)
 
+    def test_delete_current_reference(self):
+        """Deleting a view's current reference should update its stance."""
+        Reference.objects.filter(pk=1).update(score=1)
+        Reference.objects.get(pk=1).save()
+        self.assertEqual(1, View.objects.get(pk=1).current_reference_id)
+
+        Reference.objects.get(pk=1).delete()
+        view = View.objects.get(pk=1)
+        self.assertEqual(View.UNKNOWN, view.stance)
+        self.assertEqual(None, view.get_current_reference())
+
+    def test_find_current_reference(self):
+        """``find_current_reference()`` should return the most recently
+            published reference with a score of at least 0.5."""
+        references = Reference.objects.filter(view=self.view)
+        references.update(score=1)
+
+        # Reference 2 has no publication date; it was created more recently.
+        self.assertEqual(2, self.view.find_current_reference().pk)
+
+        # Ties are broken by primary key.
+        references.filter(pk=2).update(published_on=date(2012, 1, 1))
+        self.assertEqual(1, self.view.find_current_reference().pk)
+
+        references.filter(pk=1).update(published_on=date(2011, 1, 1))
+        self.assertEqual(2, self.view.find_current_reference().pk)
+
+        references.update(score=0.4)
+        self.assertEqual(None, self.view.find_current_reference())
+
     def test_get_absolute_url(self):
         """``get_absolute_url()`` should return the view's absolute path."""
         expected = reverse("core:issues:view", kwargs={
@@ -0,0 +1,56 @@
+# coding=utf-8
+from ..models import Issue
+from datetime import datetime, timedelta
+from django.test import TransactionTestCase
+from politics.utils.paginator import KeysetPaginator
+
+
+class KeysetPaginatorTestCase(TransactionTestCase):
+    """Unit tests for :class:`KeysetPaginator`."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        # Issues 1 and 2 were updated at the same time to test tie-breaking.
+        now = datetime.now()
+        for pk, days in ((1, 1), (2, 1), (3, 0), (4, 2)):
+            Issue.objects.filter(pk=pk).update(
+                    updated_at=now - timedelta(days=days))
+
+        self.paginator = KeysetPaginator(Issue.objects.all(), 2,
+                                         ordering=("-updated_at", "-pk"))
+
+    def _get_pks(self, page):
+        return [issue.pk for issue in page.object_list]
+
+    def test_next(self):
+        """Following next cursors should visit every object once, without
+            counting them."""
+        with self.assertNumQueries(1):
+            page = self.paginator.page()
+
+        self.assertEqual([3, 2], self._get_pks(page))
+        self.assertFalse(page.has_previous())
+        self.assertTrue(page.has_next())
+
+        page = self.paginator.page(page.next_cursor)
+        self.assertEqual([1, 4], self._get_pks(page))
+        self.assertTrue(page.has_previous())
+        self.assertFalse(page.has_next())
+        self.assertEqual(None, page.next_cursor)
+
+    def test_previous(self):
+        """Following previous cursors should return to the first page."""
+        page = self.paginator.page()
+        page = self.paginator.page(page.next_cursor)
+        page = self.paginator.page(page.previous_cursor)
+
+        self.assertEqual([3, 2], self._get_pks(page))
+        self.assertFalse(page.has_previous())
+        self.assertTrue(page.has_next())
+
+    def test_invalid_cursor(self):
+        """Invalid cursors should return the first page."""
+        for cursor in ("Hello!", "W10=", "WyJuZXh0IiwgWyJ4IiwgInkiXV0=",
+                       "WyJuZXh0IiwgNV0=", "WyJuZXh0IiwgbnVsbF0="):
+            self.assertEqual([3, 2], self._get_pks(self.paginator.page(cursor)))
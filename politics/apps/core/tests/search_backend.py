@@ -0,0 +1,101 @@
+# coding=utf-8
+from ..models import Issue, Tag
+from django.test import TransactionTestCase
+from haystack import site
+from haystack.query import SearchQuerySet, SQ
+import os
+from politics.utils.search.bm25_backend import SearchBackend, SearchQuery
+from politics.utils.search.index import analyze_edge_ngrams, analyze_text
+import tempfile
+
+
+class BM25BackendTestCase(TransactionTestCase):
+    """Unit tests for the embedded BM25 search backend."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        # Loading the fixture doesn't render the issues' descriptions.
+        for issue in Issue.objects.all():
+            issue.description_html = issue.description
+            issue.save()
+
+        self.tag = Tag.objects.create(name="immigration")
+        self.tag.issue_set.add(*Issue.objects.filter(pk__in=(3, 4)))
+
+        self.backend = SearchBackend(site=site)
+        self.backend.path = None
+        self.backend.clear()
+        for model in (Issue, Tag):
+            self.backend.update(site.get_index(model), model.objects.all())
+
+    def _search(self):
+        return SearchQuerySet(query=SearchQuery(backend=self.backend))
+
+    def _get_objects(self, results):
+        return [result.object for result in results]
+
+    def test_analyze(self):
+        self.assertEqual([u"tax", u"carbon", u"emission"],
+                         analyze_text(u"A tax on carbon emissions."))
+        self.assertEqual(analyze_text(u"Taxes"), analyze_text(u"tax"))
+        self.assertEqual([u"ta", u"tax"], analyze_edge_ngrams(u"Tax"))
+
+    def test_auto_query(self):
+        """Issues containing every term should be returned, ranked by BM25."""
+        results = self._search().models(Issue).auto_query("asylum seekers")
+        self.assertEqual(2, len(results))
+        self.assertEqual({3, 4}, set(result.object.pk for result in results))
+
+        # Stop words are ignored and exclusions are applied.
+        results = self._search().models(Issue).auto_query(
+                "the asylum -offshore")
+        self.assertEqual([Issue.objects.get(pk=3)],
+                         self._get_objects(results))
+
+    def test_autocomplete(self):
+        results = self._search().models(Tag).filter(
+                SQ(content="immi") | SQ(name_autocomplete="immi"))
+        self.assertEqual([self.tag], self._get_objects(results))
+
+    def test_facets(self):
+        results = self._search().models(Issue).auto_query("asylum")
+        results = results.facet("tags")
+        results[0:1]
+
+        facets = results.query.get_facet_counts()["fields"]["tags"]
+        self.assertEqual([(unicode(self.tag.pk), 2)], facets)
+
+    def test_models(self):
+        """Only the requested models should be searched."""
+        self.assertEqual(3, len(self._search().auto_query("immigration")))
+
+        results = self._search().models(Tag).auto_query("immigration")
+        self.assertEqual([self.tag], self._get_objects(results))
+
+    def test_more_like_this(self):
+        results = self._search().models(Issue).more_like_this(
+                Issue.objects.get(pk=3))
+        self.assertEqual([Issue.objects.get(pk=4)],
+                         self._get_objects(results))
+
+    def test_remove(self):
+        self.backend.remove(Issue.objects.get(pk=1))
+        self.assertEqual(0, len(self._search().auto_query("carbon")))
+
+    def test_saved(self):
+        """Indexes saved to disk should be loaded by other backends."""
+        descriptor, path = tempfile.mkstemp()
+        os.close(descriptor)
+        os.remove(path)
+
+        try:
+            self.backend.path = path
+            self.backend.update(site.get_index(Tag), Tag.objects.all())
+
+            backend = SearchBackend(site=site)
+            backend.path = path
+            self.assertEqual(1, len(backend._get_index()))
+        finally:
+            os.remove(path)
+            os.remove(path + ".lock")
@@ -0,0 +1,51 @@
+# coding=utf-8
+from ..models import View
+from ..similarity import StanceMatrix
+from django.test import TransactionTestCase
+import random
+
+
+class StanceMatrixTestCase(TransactionTestCase):
+    """Unit tests for :class:`StanceMatrix`."""
+
+    def test_agreements(self):
+        """``agreements()`` should count the shared issues and matching stances
+            of every pair of parties."""
+        # Seeded so that failures can be reproduced.
+        generator = random.Random(0)
+        stances = (View.OPPOSE, View.SUPPORT, View.UNCLEAR, View.UNKNOWN)
+        views = [(party_pk, issue_pk, generator.choice(stances))
+                 for party_pk in xrange(20) for issue_pk in xrange(30)
+                 if generator.random() < 0.5]
+
+        matrix = StanceMatrix(range(20), views)
+        shared, matching = matrix.agreements()
+
+        known = dict(((party_pk, issue_pk), stance)
+                     for party_pk, issue_pk, stance in views
+                     if stance != View.UNKNOWN)
+
+        for first in xrange(20):
+            for second in xrange(20):
+                issues = [issue_pk for issue_pk in xrange(30)
+                          if (first, issue_pk) in known
+                          and (second, issue_pk) in known]
+                equal = [issue_pk for issue_pk in issues
+                         if known[first, issue_pk] == known[second, issue_pk]]
+
+                self.assertEqual(len(issues), shared[first, second])
+                self.assertEqual(len(equal), matching[first, second])
+
+    def test_iter_agreements(self):
+        """``iter_agreements()`` should only yield pairs of different parties
+            that share at least one issue."""
+        views = [(1, 1, View.SUPPORT), (2, 1, View.OPPOSE),
+                 (2, 2, View.SUPPORT), (3, 2, View.SUPPORT),
+                 (4, 3, View.SUPPORT)]
+
+        matrix = StanceMatrix([1, 2, 3, 4], views)
+        agreements = matrix.iter_agreements([1, 2, 3, 4], [1, 2, 3, 4],
+                                            block_size=3)
+
+        self.assertEqual({(1, 2, 1, 0), (2, 1, 1, 0), (2, 3, 1, 1),
+                          (3, 2, 1, 1)}, set(agreements))
@@ -0,0 +1,222 @@
+# coding=utf-8
+from ..models import (Issue, Party, PartyAgreement, PartySimilarity,
+                      QueuedIndexUpdate, StanceHistogram, View)
+from ..similarity import StanceMatrix
+from ..tasks import (_index_queued_updates,
+                     calculate_all_party_similarities,
+                     calculate_issue_notability, calculate_party_similarities,
+                     update_search_index)
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase
+from haystack import site
+from haystack.backends import BaseSearchBackend
+import os
+from politics.utils.search.bm25_backend import SearchBackend
+from politics.utils.tasks import delay_coalesced, get_coalescing_stats
+import tempfile
+
+
+class CalculatePartySimilaritiesTestCase(TransactionTestCase):
+    """Unit tests for the party similarity tasks."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        # Loading the fixture doesn't update the agreement counters.
+        party_pks = Party.objects.values_list("pk", flat=True)
+        root_party_pks = party_pks.filter(tree_level=0)
+        PartyAgreement.objects.rebuild(StanceMatrix.from_database(party_pks),
+                                       list(root_party_pks))
+
+    def _get_similarities(self):
+        similarities = PartySimilarity.objects.not_archived()
+        return set(similarities.values_list("first_party", "second_party",
+                                            "similarity"))
+
+    def test_calculate_all_party_similarities(self):
+        """``calculate_all_party_similarities`` should compare every party with
+            every root party."""
+        PartySimilarity(first_party=Party.objects.get(pk=1),
+                        second_party=Party.objects.get(pk=2),
+                        similarity=1).save()
+
+        calculate_all_party_similarities()
+
+        # Party 3 (a sub-party) shares one issue with party 1 and disagrees.
+        self.assertEqual({(3, 1, 0)}, self._get_similarities())
+
+    def test_calculate_party_similarities(self):
+        """``calculate_party_similarities`` should archive the party's previous
+            similarities and create new ones."""
+        party = Party.objects.get(pk=3)
+        PartySimilarity(first_party=party, second_party=Party.objects.get(pk=2),
+                        similarity=1).save()
+
+        calculate_party_similarities(party.pk)
+        self.assertEqual({(3, 1, 0)}, self._get_similarities())
+
+        calculate_party_similarities(1)
+        self.assertEqual({(3, 1, 0)}, self._get_similarities())
+
+
+class CalculateIssueNotabilityTestCase(TransactionTestCase):
+    """Unit tests for the ``calculate_issue_notability`` task."""
+
+    fixtures = ("core_test_data",)
+
+    def _get_notabilities(self, issue_pk):
+        views = View.objects.filter(issue=issue_pk)
+        return dict(views.values_list("pk", "notability"))
+
+    def test_calculate_issue_notability(self):
+        """``calculate_issue_notability`` should update every view's notability
+            with a constant number of queries."""
+        View.objects.update(notability=0.5)
+        StanceHistogram.objects.rebuild(1)
+
+        # Only the Labor Party's stance on the carbon tax is known: it's rare.
+        with self.assertNumQueries(2):
+            calculate_issue_notability(1)
+
+        self.assertEqual({1: 0.6, 2: 0, 3: 0, 4: 0}, self._get_notabilities(1))
+
+        # Two parties take different stances, so neither is notable.
+        calculate_issue_notability(2)
+        self.assertEqual({5: 0, 6: 0, 7: 0}, self._get_notabilities(2))
+
+        # Three parties support the issue and one opposes it.
+        View.objects.filter(pk__in=(2, 3)).update(stance=View.SUPPORT)
+        View.objects.filter(pk=4).update(stance=View.OPPOSE)
+        StanceHistogram.objects.rebuild(1)
+        calculate_issue_notability(1)
+        self.assertEqual({1: 0, 2: 0, 3: 0, 4: 1 - 1 / 3.0},
+                         self._get_notabilities(1))
+
+        # No stances are known.
+        View.objects.filter(issue=1).update(stance=View.UNKNOWN)
+        StanceHistogram.objects.rebuild(1)
+        calculate_issue_notability(1)
+        self.assertEqual({1: 0, 2: 0, 3: 0, 4: 0}, self._get_notabilities(1))
+
+
+class CoalescedTaskTestCase(TransactionTestCase):
+    """Unit tests for coalesced tasks."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_delay_coalesced(self):
+        """Identical tasks should only be queued once until they run."""
+        # Tasks aren't sent until the transaction is committed.
+        with transaction.commit_on_success():
+            self.assertTrue(delay_coalesced(calculate_issue_notability, 1))
+            self.assertFalse(delay_coalesced(calculate_issue_notability, 1))
+            self.assertTrue(delay_coalesced(calculate_issue_notability, 2))
+
+        # The tasks have run, so they can be queued again.
+        self.assertTrue(delay_coalesced(calculate_issue_notability, 1))
+
+        self.assertEqual({"deduplicated": 1, "enqueued": 3},
+                get_coalescing_stats(calculate_issue_notability))
+        self.assertEqual({"deduplicated": 0, "enqueued": 0},
+                get_coalescing_stats(calculate_party_similarities))
+
+
+class FailingSearchBackend(BaseSearchBackend):
+    """A search backend that can't be reached, like Solr when it's down."""
+
+    def _fail(self):
+        if not self.silently_fail:
+            raise IOError("Connection refused")
+
+    def remove(self, obj_or_string, commit=True):
+        self._fail()
+
+    def update(self, index, iterable, commit=True):
+        self._fail()
+
+
+class UpdateSearchIndexTestCase(TransactionTestCase):
+    """Unit tests for the ``update_search_index`` task."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        cache.clear()
+
+        # Keep the embedded index out of the project's directory.
+        descriptor, self.bm25_path = tempfile.mkstemp()
+        os.close(descriptor)
+        os.remove(self.bm25_path)
+
+        self.original_bm25_path = settings.HAYSTACK_BM25_PATH
+        settings.HAYSTACK_BM25_PATH = self.bm25_path
+
+    def tearDown(self):
+        settings.HAYSTACK_BM25_PATH = self.original_bm25_path
+        for path in (self.bm25_path, self.bm25_path + ".lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_update_search_index(self):
+        """Every queued object should be indexed and dequeued, including
+            objects that were deleted."""
+        Issue.objects.get(pk=1).save()
+        Issue.objects.get(pk=3).delete()
+        self.assertTrue(QueuedIndexUpdate.objects.get_stats()["depth"] > 0)
+
+        update_search_index()
+        self.assertEqual(0, QueuedIndexUpdate.objects.get_stats()["depth"])
+
+    def test_update_search_index_bm25(self):
+        """The embedded index should be kept up to date alongside the search
+            backend so that it can be used instead."""
+        Issue.objects.get(pk=3).delete()
+        update_search_index()
+
+        documents = SearchBackend(site=site)._get_index().documents
+        self.assertTrue("core.issue.1" in documents)
+        self.assertFalse("core.issue.3" in documents)
+
+    def test_update_search_index_failed(self):
+        """Objects should stay queued if the search backend fails, even if
+            it's configured to fail silently."""
+        depth = QueuedIndexUpdate.objects.get_stats()["depth"]
+
+        index = site.get_index(Issue)
+        backend, index.backend = index.backend, FailingSearchBackend(site)
+        try:
+            self.assertRaises(IOError, update_search_index)
+        finally:
+            index.backend = backend
+
+        self.assertEqual(depth, QueuedIndexUpdate.objects.get_stats()["depth"])
+
+    def test_update_search_index_locked(self):
+        """Only one update should run at a time."""
+        cache.add("update_search_index:lock", True)
+        update_search_index()
+        self.assertTrue(QueuedIndexUpdate.objects.get_stats()["depth"] > 0)
+
+    def test_update_search_index_duplicates(self):
+        """Updates queued after a batch shouldn't be dequeued with it."""
+        QueuedIndexUpdate.objects.all().delete()
+        for pk in (1, 2, 1):
+            QueuedIndexUpdate.objects.enqueue(Issue, [pk])
+
+        updates = QueuedIndexUpdate.objects.order_by("pk").values_list("pk",
+                "content_type", "object_id")
+        _index_queued_updates(list(updates[:2]))
+
+        self.assertEqual([1], list(QueuedIndexUpdate.objects.values_list(
+                "object_id", flat=True)))
+
+    def test_update_search_index_not_indexed(self):
+        """Queued objects whose models aren't indexed should be dropped."""
+        QueuedIndexUpdate.objects.enqueue(Party, [1])
+        update_search_index()
+        self.assertEqual(0, QueuedIndexUpdate.objects.get_stats()["depth"])
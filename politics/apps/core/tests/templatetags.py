@@ -0,0 +1,79 @@
+# coding=utf-8
+from ..models import Issue, Party, Reference, View
+from ..templatetags.core import issue_summary, party_summary, time_ago
+from datetime import date, datetime
+from django.core.cache import cache
+from django.test import TransactionTestCase
+from politics.apps.view_counts.models import ViewCount
+from politics.utils.cache import get_cache_stats
+
+
+class SummaryTestCase(TransactionTestCase):
+    """Unit tests for the ``issue_summary`` and ``party_summary`` tags."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_issue_summary(self):
+        """Issue summaries should be cached until one of the issue's views
+            changes."""
+        issue = Issue.objects.get(pk=1)
+        ViewCount.objects.prefetch([issue])
+        html = issue_summary(issue)
+        self.assertIn("Australian Labor Party", html)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(html, issue_summary(issue))
+
+        self.assertEqual({"hits": 1, "misses": 1},
+                         get_cache_stats("issue_summary"))
+
+        view = View.objects.get(pk=2)
+        view.stance = View.OPPOSE
+        view.save()
+
+        self.assertNotEqual(html, issue_summary(issue))
+        self.assertEqual({"hits": 1, "misses": 2},
+                         get_cache_stats("issue_summary"))
+
+    def test_issue_summary_reference(self):
+        """Issue summaries should be invalidated when a reference changes."""
+        issue = Issue.objects.get(pk=1)
+        ViewCount.objects.prefetch([issue])
+        issue_summary(issue)
+
+        Reference.objects.get(pk=1).save()
+        issue_summary(issue)
+        self.assertEqual(2, get_cache_stats("issue_summary")["misses"])
+
+    def test_issue_summary_view_count(self):
+        """Issue summaries should require the view count to be prefetched."""
+        self.assertRaises(ValueError, issue_summary, Issue.objects.get(pk=1))
+
+    def test_party_summary(self):
+        """Party summaries should be cached until a branch changes."""
+        party = Party.objects.get(pk=3)
+        html = party_summary(party)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(html, party_summary(party))
+
+        Party.objects.get(pk=4).delete()
+        self.assertNotEqual(html, party_summary(party))
+
+
+class TimeAgoTestCase(TransactionTestCase):
+    """Unit tests for the ``time_ago`` tag."""
+
+    def test_date(self):
+        """Dates should be treated as midnight."""
+        html = time_ago(date(2012, 6, 1))
+        self.assertIn("datetime=\"2012-06-01T00:00:00Z\"", html)
+
+    def test_datetime(self):
+        """The time should be rendered in UTC for the browser."""
+        html = time_ago(datetime(2012, 6, 1, 9, 30, 15, 500))
+        self.assertIn("datetime=\"2012-06-01T09:30:15Z\"", html)
+        self.assertNotIn("ago", html.replace("class=\"ago\"", ""))
@@ -0,0 +1,117 @@
+# coding=utf-8
+from ..models import Issue, Reference, TrendingState
+from ..trending import (COMMIT_DELAY, HALF_LIFE, PAGE_VIEW_WEIGHT,
+                        REBASE_INTERVAL, REFERENCE_WEIGHT, REFRESH_INTERVAL,
+                        VOTE_WEIGHT, get_trending_score,
+                        refresh_trending_scores)
+from datetime import datetime, timedelta
+from django.db.models import Max
+from django.test import TransactionTestCase
+from politics.apps.view_counts.models import View as PageView
+from politics.apps.votes.models import Vote
+
+
+class RefreshTrendingScoresTestCase(TransactionTestCase):
+    """Unit tests for ``refresh_trending_scores``."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        self.now = datetime.now()
+
+        # When the activity created now has been committed.
+        self.settled = self.now + REFRESH_INTERVAL
+
+        # Ignore the fixture's activity.
+        TrendingState.objects.create(pk=1, epoch=self.now,
+                reference_pk=Reference.objects.aggregate(pk=Max("pk"))["pk"],
+                vote_pk=Vote.objects.aggregate(pk=Max("pk"))["pk"])
+
+    def _create_page_view(self, issue_pk, created_at):
+        PageView.objects.create(content_object=Issue.objects.get(pk=issue_pk),
+                                created_at=created_at, ip_address="127.0.0.1")
+
+    def _get_score(self, issue_pk, now):
+        return get_trending_score(Issue.objects.get(pk=issue_pk), now)
+
+    def test_activity(self):
+        """New page views, references and votes should be counted."""
+        self._create_page_view(2, self.now)
+        self._create_page_view(2, self.now)
+
+        # The author of a reference votes for it.
+        reference = Reference.objects.get(pk=3)
+        reference.pk = None
+        reference.url = "http://example.com/"
+        reference.save()
+
+        refresh_trending_scores(self.settled)
+
+        # Reference 3 is on issue 2.
+        self.assertAlmostEqual(2 * PAGE_VIEW_WEIGHT + REFERENCE_WEIGHT +
+                               VOTE_WEIGHT, self._get_score(2, self.now),
+                               places=2)
+        self.assertEqual(0, self._get_score(1, self.now))
+
+        # Activity shouldn't be counted twice.
+        refresh_trending_scores(self.settled)
+        self.assertAlmostEqual(2 * PAGE_VIEW_WEIGHT + REFERENCE_WEIGHT +
+                               VOTE_WEIGHT, self._get_score(2, self.now),
+                               places=2)
+
+    def test_decay(self):
+        """Scores should halve every ``HALF_LIFE`` without being updated."""
+        self._create_page_view(1, self.now)
+        refresh_trending_scores(self.settled)
+        score = Issue.objects.get(pk=1).trending_score
+        self.assertAlmostEqual(PAGE_VIEW_WEIGHT, score, places=5)
+
+        refresh_trending_scores(self.now + HALF_LIFE)
+        self.assertEqual(score, Issue.objects.get(pk=1).trending_score)
+        self.assertAlmostEqual(score / 2,
+                               self._get_score(1, self.now + HALF_LIFE))
+
+        # Activity should be decayed from when it happened.
+        later = self.now + HALF_LIFE * 2
+        self._create_page_view(1, later - HALF_LIFE / 2)
+        refresh_trending_scores(later)
+
+        self.assertAlmostEqual(score / 4 + PAGE_VIEW_WEIGHT * 0.5 ** 0.5,
+                               self._get_score(1, later))
+
+    def test_late(self):
+        """Activity that's committed after a later refresh should be counted
+            by the next refresh."""
+        refresh_trending_scores(self.now)
+        self._create_page_view(1, self.now - HALF_LIFE)
+
+        refresh_trending_scores(self.now + timedelta(minutes=10))
+        self.assertAlmostEqual(PAGE_VIEW_WEIGHT / 2,
+                               self._get_score(1, self.now))
+
+    def test_uncommitted(self):
+        """Activity shouldn't be counted until it's ``COMMIT_DELAY`` old, and
+            older activity with a higher primary key shouldn't be counted
+            before it."""
+        self._create_page_view(1, self.now)
+        self._create_page_view(1, self.now - COMMIT_DELAY)
+
+        refresh_trending_scores(self.now)
+        self.assertEqual(0, Issue.objects.get(pk=1).trending_score)
+
+        refresh_trending_scores(self.now + COMMIT_DELAY)
+        self.assertAlmostEqual(PAGE_VIEW_WEIGHT * (1 + 0.5 ** (
+                COMMIT_DELAY.total_seconds() / HALF_LIFE.total_seconds())),
+                self._get_score(1, self.now))
+
+    def test_rebase(self):
+        """Rebasing the scores shouldn't change them."""
+        self._create_page_view(1, self.now)
+        refresh_trending_scores(self.settled)
+
+        later = self.now + REBASE_INTERVAL
+        score = self._get_score(1, later)
+        refresh_trending_scores(later)
+
+        self.assertEqual(later, TrendingState.objects.get_current().epoch)
+        self.assertAlmostEqual(score, self._get_score(1, later))
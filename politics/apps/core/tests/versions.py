@@ -0,0 +1,118 @@
+# coding=utf-8
+from ..models import Issue, Party, Reference, Tag, View
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase
+from politics.apps.comments.models import Comment
+from politics.utils.cache import (get_cached_count, get_version,
+                                  get_versioned_key, refresh_cached_count)
+
+
+class VersionTestCase(TransactionTestCase):
+    """Unit tests for the versions kept by ``register_versioned``."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        cache.clear()
+
+    def _get_versions(self, *dependencies):
+        return [get_version(*dependency) for dependency in dependencies]
+
+    def test_save(self):
+        """Saving an object should bump its version, its model's version and
+            those of the objects it follows."""
+        dependencies = ((View, 4), (View,), (Issue, 1), (Party, 4))
+        unchanged = ((View, 1), (Issue,), (Issue, 2), (Party,), (Party, 2),
+                     (Party, 3))
+
+        versions = self._get_versions(*dependencies)
+        unchanged_versions = self._get_versions(*unchanged)
+        View.objects.get(pk=4).save()
+
+        self.assertEqual([version + 1 for version in versions],
+                         self._get_versions(*dependencies))
+        self.assertEqual(unchanged_versions, self._get_versions(*unchanged))
+
+    def test_save_followed_models(self):
+        """Saving an object shouldn't bump the versions of the models that it
+            follows."""
+        version = get_version(Party)
+        View.objects.get(pk=4).save()
+        self.assertEqual(version, get_version(Party))
+
+    def test_follow_chain(self):
+        """Changes should be followed through objects that are loaded."""
+        dependencies = ((Reference, 3), (View, 6), (Issue, 2))
+        versions = self._get_versions(*dependencies)
+
+        comment = Comment(author_id=1, body="Hi")
+        comment.content_object = Reference.objects.select_related(
+                "view__issue").get(pk=3)
+        comment.save()
+
+        self.assertEqual([version + 1 for version in versions],
+                         self._get_versions(*dependencies))
+
+    def test_follow_unloaded(self):
+        """Objects that aren't loaded shouldn't be loaded to follow them."""
+        versions = self._get_versions((Reference, 3), (View, 6), (Issue, 2))
+
+        comment = Comment(author_id=1, body="Hi")
+        comment.content_object = Reference.objects.get(pk=3)
+        comment.save()
+
+        self.assertEqual([versions[0] + 1, versions[1] + 1, versions[2]],
+                         self._get_versions((Reference, 3), (View, 6),
+                                            (Issue, 2)))
+
+    def test_m2m_changed(self):
+        """Changing an object's many-to-many relations should bump both
+            sides' versions."""
+        issue = Issue.objects.get(pk=3)
+        tag = Tag.objects.create(name="new")
+
+        key = get_versioned_key("test", issue, Tag)
+        versions = self._get_versions((Issue, 3), (Tag, tag.pk), (Tag,))
+
+        issue.tags.add(tag)
+        self.assertEqual([version + 1 for version in versions],
+                         self._get_versions((Issue, 3), (Tag, tag.pk),
+                                            (Tag,)))
+        self.assertNotEqual(key, get_versioned_key("test", issue, Tag))
+
+
+class CachedCountTestCase(TransactionTestCase):
+    """Unit tests for ``get_cached_count``."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        cache.clear()
+
+    def _get_count(self):
+        return get_cached_count("issues", Issue.objects.all(), Issue)
+
+    def test_cached(self):
+        """Counts should be cached until a dependency changes."""
+        with self.assertNumQueries(1):
+            self.assertEqual(4, self._get_count())
+
+        with self.assertNumQueries(0):
+            self.assertEqual(4, self._get_count())
+
+    def test_refresh(self):
+        """The previous count should be returned while it's refreshed in the
+            background after a dependency changes."""
+        self._get_count()
+        Issue.objects.create(name="Same-sex adoption")
+
+        # Roll back to discard the queued refresh_count task.
+        with transaction.commit_manually():
+            with self.assertNumQueries(0):
+                self.assertEqual(4, self._get_count())
+
+            transaction.rollback()
+
+        refresh_cached_count("issues", Issue.objects.all(), Issue)
+        self.assertEqual(5, self._get_count())
@@ -1,5 +1,7 @@
 # coding=utf-8
+from .core import *
 from .issues import *
 from .parties import *
 from .references import *
+from .tags import *
 from .views import *
\ No newline at end of file
@@ -0,0 +1,67 @@
+# coding=utf-8
+from ...models import Issue, Tag
+from ...views import core
+from django.core.urlresolvers import reverse
+from django.test import TransactionTestCase
+from django.test.client import Client
+from haystack import site
+from haystack.query import SearchQuerySet
+from politics.utils.search.bm25_backend import SearchBackend, SearchQuery
+
+
+class CoreViewTestCase(TransactionTestCase):
+    """Unit tests for core views."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        self.client = Client()
+
+        self.tag = Tag.objects.create(name="environment")
+        self.tag.issue_set.add(Issue.objects.get(pk=1))
+
+        # Search an in-process index so that the tests don't need Solr.
+        backend = SearchBackend(site=site)
+        backend.path = None
+        backend.clear()
+        for model in (Issue, Tag):
+            backend.update(site.get_index(model), model.objects.all())
+
+        self.backend = backend
+        core.SearchQuerySet = lambda: SearchQuerySet(
+                query=SearchQuery(backend=backend))
+
+    def tearDown(self):
+        core.SearchQuerySet = SearchQuerySet
+
+    def test_search(self):
+        """Only the issues on the requested page should be returned and the
+            tags of those issues should be suggested."""
+        response = self.client.get(reverse("core:search"), {"q": "carbon"})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, response.context["page"].paginator.count)
+        self.assertEqual([Issue.objects.get(pk=1)],
+                         response.context["page"].object_list)
+        self.assertTrue(self.tag in response.context["tags"])
+
+    def test_search_facets(self):
+        """Backends that support faceting should suggest the tags of every
+            result from the counts of the issues' ``tags_exact`` field."""
+        # Tags assigned since the issue was indexed aren't counted.
+        unindexed_tag = Tag.objects.create(name="pollution")
+        unindexed_tag.issue_set.add(Issue.objects.get(pk=1))
+
+        document = self.backend._get_index().documents["core.issue.1"]
+        self.assertEqual([self.tag.pk], document["tags_exact"])
+
+        response = self.client.get(reverse("core:search"), {"q": "carbon"})
+        self.assertEqual(1, response.context["page"].paginator.count)
+        self.assertTrue(self.tag in response.context["tags"])
+        self.assertFalse(unindexed_tag in response.context["tags"])
+
+    def test_search_page_out_of_range(self):
+        response = self.client.get(reverse("core:search"),
+                                   {"page": 5, "q": "carbon"})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, response.context["page"].number)
+        self.assertEqual(1, len(response.context["page"].object_list))
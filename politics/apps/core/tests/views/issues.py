@@ -1,8 +1,11 @@
 # coding=utf-8
-from ...models import Issue
+from ...models import Issue, View
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.test import TransactionTestCase
 from django.test.client import Client
+from politics.apps.view_counts.buffer import record_hit
+from politics.apps.view_counts.tasks import flush_views
 
 
 class IssueViewTestCase(TransactionTestCase):
@@ -27,4 +30,138 @@ class IssueViewTestCase(TransactionTestCase):
 
     def test_new(self):
         response = self.client.get(reverse("core:issues:new"))
-        self.assertEqual(response.status_code, 200)
\ No newline at end of file
+        self.assertEqual(response.status_code, 200)
+
+    def test_list(self):
+        """The issues' view counts should be retrieved with one query rather
+            than one for each issue."""
+        cache.clear()
+        record_hit(Issue.objects.get(pk=1), "127.0.0.1")
+        record_hit(Issue.objects.get(pk=1), "127.0.0.2")
+        record_hit(Issue.objects.get(pk=2), "127.0.0.1")
+        flush_views()
+
+        with self.assertNumQueries(15):
+            response = self.client.get(reverse("core:issues:list"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({1: 2, 2: 1, 3: 0, 4: 0},
+                         dict((issue.pk, issue._view_count) for issue
+                              in response.context["page"].object_list))
+
+    def test_trending(self):
+        response = self.client.get(reverse("core:issues:trending"))
+        self.assertEqual(response.status_code, 200)
+
+
+class IssuePageCacheTestCase(TransactionTestCase):
+    """Unit tests for the caching of :class:`Issue` pages."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+        issue = Issue.objects.get(pk=1)
+        self.url = reverse("core:issues:show", kwargs={
+            "issue_pk": issue.pk,
+            "issue_slug": issue.slug
+        })
+
+    def test_anonymous(self):
+        """Pages should be cached for anonymous users until an object they
+            depend on changes."""
+        content = self.client.get(self.url).content
+
+        # Only the issue is retrieved.
+        with self.assertNumQueries(1):
+            self.assertEqual(content, self.client.get(self.url).content)
+
+        view = View.objects.get(pk=2)
+        view.stance = View.OPPOSE
+        view.save()
+        self.assertNotEqual(content, self.client.get(self.url).content)
+
+    def test_csrf_token(self):
+        """Cached pages should contain the current user's CSRF token."""
+        tokens = []
+        for i in xrange(2):
+            client = Client()
+            response = client.get(self.url)
+            token = client.cookies["csrftoken"].value
+            self.assertIn(token, response.content)
+            tokens.append(token)
+
+        self.assertNotEqual(tokens[0], tokens[1])
+
+    def test_query_string(self):
+        """Query string parameters that the view doesn't read shouldn't
+            affect the cache."""
+        # The page isn't stored, as the parameter may be copied into links.
+        self.client.get(self.url, {"utm_source": "a"})
+        self.client.get(self.url)
+
+        with self.assertNumQueries(1):
+            self.client.get(self.url, {"utm_source": "b"})
+
+    def test_authenticated(self):
+        """Pages shouldn't be cached for users that are logged in."""
+        self.client.login(username="chris", password="password")
+        self.client.get(self.url)
+        self.client.logout()
+
+        # The page must be rendered again for the anonymous user, then cached.
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+
+class IssueConditionalTestCase(TransactionTestCase):
+    """Unit tests for conditional requests for :class:`Issue` pages."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+        issue = Issue.objects.get(pk=1)
+        self.url = reverse("core:issues:show", kwargs={
+            "issue_pk": issue.pk,
+            "issue_slug": issue.slug
+        })
+
+    def test_if_modified_since(self):
+        """304 Not Modified should be returned to anonymous users if the page
+            hasn't changed since they last retrieved it."""
+        last_modified = self.client.get(self.url)["Last-Modified"]
+
+        # Once from the page cache and once with the page cache empty.
+        for i in xrange(2):
+            response = self.client.get(self.url,
+                                       HTTP_IF_MODIFIED_SINCE=last_modified)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.templates, [])
+            cache.clear()
+
+    def test_if_none_match(self):
+        """304 Not Modified should be returned without rendering the page if
+            its ETag matches and 200 OK once the page has changed."""
+        self.client.login(username="chris", password="password")
+
+        response = self.client.get(self.url)
+        self.assertNotIn("Last-Modified", response)
+        etag = response["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.templates, [])
+
+        view = View.objects.get(pk=2)
+        view.stance = View.OPPOSE
+        view.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
@@ -36,3 +36,10 @@ class PartyViewsTestCase(TransactionTestCase):
         }))
 
         self.assertEqual(200, response.status_code)
+
+    def test_list(self):
+        """The list should show the average percentage of issues on which the
+            root parties' views are known."""
+        response = self.client.get(reverse("core:parties:list"))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(25, response.context["average_view_percentage"])
@@ -0,0 +1,34 @@
+# coding=utf-8
+from ...models import Issue, Tag
+from django.core.cache import cache
+from django.core.urlresolvers import reverse
+from django.test import TransactionTestCase
+from django.test.client import Client
+
+
+class TagViewTestCase(TransactionTestCase):
+    """Unit tests for :class:`Tag` views."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+        self.tag = Tag.objects.create(name="environment")
+        self.tag.issue_set.add(*Issue.objects.filter(pk__in=(1, 2)))
+
+    def test_list(self):
+        response = self.client.get(reverse("core:tags:list"))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, response.context["page"].paginator.count)
+        self.assertEqual(2, response.context["average_issues"])
+
+    def test_show(self):
+        response = self.client.get(reverse("core:tags:show", kwargs={
+            "pk": self.tag.pk,
+            "slug": self.tag.slug
+        }))
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(2, len(response.context["page"].object_list))
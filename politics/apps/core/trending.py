@@ -0,0 +1,147 @@
+# coding=utf-8
+from collections import defaultdict
+from datetime import datetime, timedelta
+from django.db.models import F
+from politics.apps.core.models import Issue, Reference, TrendingState
+from politics.apps.view_counts.models import View as PageView
+from politics.apps.votes.models import Vote
+
+
+# Activity loses half of its weight in this time.
+HALF_LIFE = timedelta(days=1)
+
+# Scores are rebased onto a new epoch when their epoch is this old, so that
+# they don't grow too large (they double every HALF_LIFE).
+REBASE_INTERVAL = timedelta(days=30)
+
+# Activity is only counted once it's this old, so that the transactions that
+# created it have committed. Primary keys are allocated when rows are inserted,
+# not when they're committed, so a row can become visible after one with a
+# higher primary key; it's missed if that takes longer than this.
+COMMIT_DELAY = timedelta(minutes=1)
+
+# How often the scores are refreshed.
+REFRESH_INTERVAL = timedelta(minutes=10)
+
+# The weight of each kind of activity when it's brand new.
+PAGE_VIEW_WEIGHT = 1.0
+REFERENCE_WEIGHT = 10.0
+VOTE_WEIGHT = 3.0
+
+
+def _get_growth(interval):
+    """Returns how much more activity after a time is weighted than at it.
+
+    :param interval: The time since the earlier time (negative if it's later).
+    :type  interval: ``datetime.timedelta``
+    :rtype: ``float``
+    """
+    return 2 ** (interval.total_seconds() / HALF_LIFE.total_seconds())
+
+
+def _iter_activity(state, now):
+    """Yields the activity on each issue since the scores were last refreshed.
+
+    Activity is yielded in primary key order, stopping at the first that's
+    newer than ``COMMIT_DELAY``. The state's primary keys are advanced past
+    the activity that's yielded.
+
+    :param state: The state of the last refresh.
+    :type  state: :class:`TrendingState`
+    :param   now: The current time.
+    :type    now: ``datetime.datetime``
+    :returns: Issue pk, time, weight tuples.
+    :rtype: *Iterable* of ``tuple``
+    """
+    cutoff = now - COMMIT_DELAY
+
+    page_views = PageView.objects.get_for_model(Issue).filter(
+            pk__gt=state.page_view_pk).order_by("pk")
+    for pk, issue_pk, created_at in page_views.values_list("pk", "object_id",
+                                                           "created_at"):
+        if created_at > cutoff:
+            break
+        state.page_view_pk = pk
+        yield issue_pk, created_at, PAGE_VIEW_WEIGHT
+
+    references = Reference.objects.filter(
+            pk__gt=state.reference_pk).order_by("pk")
+    for pk, issue_pk, created_at in references.values_list("pk",
+            "view__issue", "created_at"):
+        if created_at > cutoff:
+            break
+        state.reference_pk = pk
+        yield issue_pk, created_at, REFERENCE_WEIGHT
+
+    votes = Vote.objects.get_for_model(Reference).filter(
+            pk__gt=state.vote_pk).order_by("pk")
+    votes = list(votes.values_list("pk", "object_id", "created_at"))
+    reference_issues = dict(Reference.objects.filter(
+            pk__in=set(reference_pk for _, reference_pk, _ in votes))
+            .values_list("pk", "view__issue"))
+
+    for pk, reference_pk, created_at in votes:
+        if created_at > cutoff:
+            break
+        state.vote_pk = pk
+        if reference_pk in reference_issues:
+            yield reference_issues[reference_pk], created_at, VOTE_WEIGHT
+
+
+def get_trending_score(issue, now=None):
+    """Returns an issue's trending score as of a time.
+
+    :param issue: The issue.
+    :type  issue: :class:`Issue`
+    :param   now: The time (``datetime.now()`` if ``None``).
+    :type    now: ``datetime.datetime``
+    :rtype: ``float``
+    """
+    epoch = TrendingState.objects.get_current().epoch
+    return issue.trending_score * _get_growth(epoch - (now or datetime.now()))
+
+
+def refresh_trending_scores(now=None):
+    """Add the activity since the last refresh to the issues' trending scores.
+
+    An issue's score is the sum of the weights of its page views, references
+    and votes, each halving every ``HALF_LIFE``. Rather than decaying every
+    score on every refresh, activity is weighted by how long after the epoch
+    it happened (doubling every ``HALF_LIFE``), which orders the issues the
+    same way. So only the issues with new activity are updated, apart from
+    when the scores are rebased every ``REBASE_INTERVAL``.
+
+    This must be called in a transaction, so that the scores and the
+    :class:`TrendingState` are saved together. If refreshes overlap, only the
+    first to save the state adds the activity.
+
+    :param now: The current time (``datetime.now()`` if ``None``).
+    :type  now: ``datetime.datetime``
+    """
+    now = now or datetime.now()
+    state = TrendingState.objects.get_current()
+
+    fields = ("epoch", "page_view_pk", "reference_pk", "vote_pk")
+    previous = dict((field, getattr(state, field)) for field in fields)
+
+    activity = list(_iter_activity(state, now))
+    if now - state.epoch >= REBASE_INTERVAL:
+        state.epoch = now
+
+    # If another refresh has saved the state since it was read, it has counted
+    # the activity already and this matches nothing.
+    if TrendingState.objects.filter(pk=state.pk, **previous).update(
+            **dict((field, getattr(state, field)) for field in fields)) == 0:
+        return
+
+    if state.epoch != previous["epoch"]:
+        Issue.objects.update(trending_score=F("trending_score") *
+                             _get_growth(previous["epoch"] - state.epoch))
+
+    scores = defaultdict(float)
+    for issue_pk, created_at, weight in activity:
+        scores[issue_pk] += weight * _get_growth(created_at - state.epoch)
+
+    for issue_pk, score in scores.iteritems():
+        Issue.objects.filter(pk=issue_pk).update(
+                trending_score=F("trending_score") + score)
@@ -35,6 +35,7 @@ issue_patterns = prefix(issue_prefix, patterns("",
 issues_patterns = patterns("",
     url(r"^$", issues.list, name="list"),
     url(r"^new/$", issues.form, name="new"),
+    url(r"^trending/$", issues.trending, name="trending"),
 ) + issue_patterns
 
 # /parties/{pk}-{slug}/
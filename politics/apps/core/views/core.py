@@ -8,6 +8,7 @@ from django.shortcuts import redirect
 from django.views.decorators.http import require_POST
 from haystack.query import SearchQuerySet
 import logging
+from politics.apps.view_counts.models import ViewCount
 from politics.utils.decorators import render_to_template
 from politics.utils.paginator import Paginator
 from politics.utils.views import simple_view
@@ -103,23 +104,46 @@ def request(request):
 
 @render_to_template("core/search.html")
 def search(request):
-    """The search page."""
+    """The search page.
+
+    Only one page of issues is requested from the search backend and only
+    those issues are loaded from the database. The tags related to the results
+    are found by faceting the issues on their tags, so that the other matching
+    issues never have to be loaded.
+    """
     query = request.GET.get("q")
 
     if not query:
         return redirect("core:home")
 
-    # Search for Issue and Tags matching the query.
-    results = SearchQuerySet().auto_query(query).load_all()
-    issues = [result.object for result in results.models(Issue)]
-    tags = [result.object for result in results.models(Tag)]
+    issues = SearchQuerySet().models(Issue).auto_query(query)
+    issues = issues.facet("tags").load_all()
+
+    # The paginator requests the page before counting the issues; the number
+    # of results and the facet counts come back with it.
+    page = Paginator(issues, 25).page(request.GET.get("page", 1))
+    page.object_list = [result.object for result in page.object_list]
+    ViewCount.objects.prefetch(page.object_list)
+
+    tags = SearchQuerySet().models(Tag).auto_query(query).load_all()
+    tags = [result.object for result in tags[:20]]
 
     # Extract commons tags that may not be in the search results. Remove
     # duplicates as this is shown below the results (but preserve ordering).
-    related_tags = Issue.common_tags(issues)
+    # Backends that don't support faceting (e.g. in tests) fall back to the
+    # tags of the issues on the page.
+    facets = issues.query.get_facet_counts().get("fields", {}).get("tags")
+    if facets:
+        tag_pks = [int(pk) for pk, count in facets if count > 0]
+        related_tags = Tag.objects.in_bulk(tag_pks)
+        related_tags = [related_tags[pk] for pk in tag_pks
+                        if pk in related_tags]
+    else:
+        related_tags = Issue.common_tags(page.object_list)
+
     related_tags = [tag for tag in related_tags if tag not in tags]
 
-    if len(results) == 0:
+    if page.paginator.count == 0 and len(tags) == 0:
         username = "An anonymous user"
         if not request.user.is_anonymous():
             username = request.user.get_full_name()
@@ -131,8 +155,7 @@ def search(request):
         })
 
     return {
-        "issues": issues,
-        "page": Paginator(issues, 25).page(request.GET.get("page", 1)),
+        "page": page,
         "query": query,
         "tags": (tags + related_tags)[:20]
     }
@@ -1,5 +1,6 @@
 # coding=utf-8
 from politics.apps.core.models import Election
+from politics.apps.view_counts.models import ViewCount
 from politics.utils.decorators import render_to_template, slug_url
 from politics.utils.paginator import Paginator
 
@@ -28,6 +29,7 @@ def show(request, election, tab="issues"):
     """
     issues = sorted(election.issues.all(), key=lambda issue: issue.name.lower())
     page = Paginator(issues, 25).page(request.GET.get("page", 1))
+    ViewCount.objects.prefetch(page.object_list)
 
     return {
         "election": election,
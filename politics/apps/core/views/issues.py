@@ -6,24 +6,42 @@ from haystack.query import SearchQuerySet
 import logging
 from politics.apps.core.forms import IssueForm
 from politics.apps.core.managers import ViewManager
-from politics.apps.core.models import Issue, View
+from politics.apps.core.models import (Issue, Party, StanceHistogram, Tag,
+                                      View)
 from politics.apps.view_counts.decorators import record_view
-from politics.utils.decorators import render_to_template, slug_url
-from politics.utils.paginator import Paginator
+from politics.apps.view_counts.models import ViewCount
+from politics.utils.decorators import (cache_anonymous_page,
+                                       render_to_template, slug_url)
+from politics.utils.models import estimate_count
+from politics.utils.paginator import KeysetPaginator, Paginator
 import reversion
 
 
+@cache_anonymous_page(Issue, Party, Tag, query=("cursor",))
 @render_to_template("core/issues/list.html")
 def list(request):
     """Shows active issues: those that have been updated recently."""
-    issues = Issue.objects.order_by("-updated_at")
-    page = Paginator(issues, 25).page(request.GET.get("page", 1))
+    paginator = KeysetPaginator(Issue.objects.all(), 25,
+                                ordering=("-updated_at", "-pk"))
+    page = paginator.page(request.GET.get("cursor"))
+    ViewCount.objects.prefetch(page.object_list)
 
-    # Extract the set of tags from the most recently updated issues.
-    tags = sum((tuple(issue.tags.all()) for issue in issues), tuple())
-    tags = sorted(set(tags), key=tags.index)
+    return {"page": page, "tags": Tag.objects.get_active()}
 
-    return {"page": page, "tags": tags}
+
+@render_to_template("core/issues/trending.html")
+def trending(request):
+    """Shows trending issues: those with the most activity recently.
+
+    The issues are ordered by their trending score, which is refreshed
+    periodically by the ``refresh_issue_trending_scores`` task.
+    """
+    issues = Issue.objects.order_by("-trending_score", "-updated_at")
+    paginator = Paginator(issues, 25, count=estimate_count(Issue))
+    page = paginator.page(request.GET.get("page", 1))
+    ViewCount.objects.prefetch(page.object_list)
+
+    return {"page": page}
 
 
 @login_required
@@ -60,7 +78,9 @@ def form(request, issue):
 
 @slug_url(Issue, pk_key="issue_pk", slug_key="issue_slug")
 @record_view
-@render_to_template("core/issues/show.html")
+@cache_anonymous_page(Party)
+@render_to_template("core/issues/show.html",
+        last_modified=lambda request, issue: issue.get_last_modified())
 def show(request, issue):
     """Display information about an issue."""
     related_issues = SearchQuerySet().models(Issue).more_like_this(issue)
@@ -70,9 +90,17 @@ def show(request, issue):
     views = ViewManager().get_views_for_issue(issue)
     views = sorted(views, key=lambda view: view.party.name.lower())
 
+    # Parties without a saved view on the issue are included in the list of
+    # views, but not the histogram; their stances are unknown.
+    histogram = StanceHistogram.objects.get_for_issue(issue)
+    known_count = sum(histogram.get_known_counts().values())
+
     stances = []
     for stance in View.STANCE_CHOICES:
-        count = sum(1 for view in views if view.stance == stance[0])
+        count = histogram.get_count(stance[0])
+        if stance[0] == View.UNKNOWN:
+            count = len(views) - known_count
+
         stances.append((stance[1], count))
 
     return {
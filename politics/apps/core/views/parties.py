@@ -4,9 +4,10 @@ from django.core.urlresolvers import reverse
 from django.shortcuts import get_object_or_404, redirect
 import logging
 from politics.apps.core.forms import PartyForm
-from politics.apps.core.models import Issue, Party, View
+from politics.apps.core.models import Issue, Party, PartySimilarity, View
 from politics.apps.view_counts.decorators import record_view
-from politics.utils.decorators import render_to_template, pk_url, slug_url
+from politics.utils.decorators import (cache_anonymous_page,
+                                       render_to_template, pk_url, slug_url)
 import re
 import reversion
 
@@ -78,7 +79,9 @@ def new_child(request, party):
 
 @slug_url(Party)
 @record_view
-@render_to_template("core/parties/show.html")
+@cache_anonymous_page(Issue, PartySimilarity, View, query=("tab",))
+@render_to_template("core/parties/show.html",
+        last_modified=lambda request, party: party.get_last_modified())
 def show(request, party):
     """Show information about a ``Party``."""
     tab = request.GET.get("tab", "views")
@@ -12,7 +12,12 @@ from politics.utils.decorators import pk_url, render_to_template
 import reversion
 
 
-@pk_url(Reference)
+# Load the objects that references follow so that changes to references bump
+# their versions (see politics.utils.cache.register_versioned).
+_references = Reference.objects.select_related("view__issue", "view__party")
+
+
+@pk_url(_references)
 def comments(request, reference):
     """Create/read reference comments.
 
@@ -25,7 +30,7 @@ def comments(request, reference):
 
 
 @login_required
-@pk_url(Reference)
+@pk_url(_references)
 @render_to_template("core/references/form.html")
 def edit(request, reference):
     """Edit a reference.
@@ -59,7 +64,7 @@ def edit(request, reference):
     return {"form": form, "reference": reference}
 
 
-@pk_url(Reference)
+@pk_url(_references)
 def votes(request, reference):
     """Create/delete votes.
 
@@ -1,9 +1,11 @@
 # coding=utf-8
 from django.db.models import Avg, Count
-from politics.apps.core.models import Issue, Tag
+from politics.apps.core.models import Issue, Tag, TagCooccurrence
+from politics.apps.view_counts.models import ViewCount
 from politics.utils import group_n
+from politics.utils.cache import get_cached, get_cached_count
 from politics.utils.decorators import render_to_template, slug_url
-from politics.utils.paginator import Paginator
+from politics.utils.paginator import KeysetPaginator, Paginator
 
 
 @render_to_template("core/tags/list.html")
@@ -15,13 +17,18 @@ def list(request):
     """
     tags = Tag.objects.annotate(issue_count=Count("issue"))
     tags = tags.filter(issue_count__gt=0).order_by("-issue_count")
-    page = Paginator(tags, 27).page(request.GET.get("page", 1))
+
+    # Counting the tags is as expensive as retrieving them, so the counts are
+    # cached until an issue or tag changes.
+    count = get_cached_count("used_tags", tags, Issue, Tag)
+    page = Paginator(tags, 27, count=count).page(request.GET.get("page", 1))
+    average_issues = get_cached("average_tag_issues", lambda: int(round(
+            tags.aggregate(avg=Avg("issue_count"))["avg"] or 0)), Issue, Tag)
 
     return {
-        "average_issues": int(round(tags.aggregate(avg=Avg("issue_count"))["avg"])),
+        "average_issues": average_issues,
         "page": page,
-        "tag_rows": group_n(page.object_list, 3),
-        "tags": tags,
+        "tag_rows": group_n(page.object_list, 3)
     }
 
 
@@ -29,11 +36,12 @@ def list(request):
 @render_to_template("core/tags/show.html")
 def show(request, tag):
     """Shows information about a tag."""
-    issues = Issue.objects.filter(tags=tag).order_by("name")
-    page = Paginator(issues, 25).page(request.GET.get("page", 1))
+    paginator = KeysetPaginator(Issue.objects.filter(tags=tag), 25,
+                                ordering=("name", "pk"))
+    page = paginator.page(request.GET.get("cursor"))
+    ViewCount.objects.prefetch(page.object_list)
 
     # Retrieve the tags that occur most frequently with this one.
-    related_tags = Issue.common_tags(tag.issue_set.all())
-    related_tags.remove(tag)
+    related_tags = TagCooccurrence.objects.get_related(tag, 5)
 
     return {"page": page, "related_tags": related_tags, "tag": tag}
@@ -5,13 +5,15 @@ from politics.apps.core.managers import ViewManager
 from politics.apps.core.models import Issue, Party, Reference, View
 from politics.apps.core.templatetags.core import view_url
 from politics.apps.view_counts.decorators import record_view
-from politics.utils.decorators import render_to_template, slug_url
+from politics.utils.decorators import (cache_anonymous_page,
+                                       render_to_template, slug_url)
 from random import random
 import reversion
 
 
 @slug_url(Issue, pk_key="issue_pk", slug_key="issue_slug")
 @slug_url(Party, pk_key="party_pk", slug_key="party_slug")
+@cache_anonymous_page()
 @render_to_template("core/views/show.html")
 def show(request, issue, party):
     """Shows information about a :class:`View`.
@@ -0,0 +1,118 @@
+# coding=utf-8
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from politics.utils.cache import increment
+import time
+
+
+# Each hit is stored in its own numbered slot; the slot counter is incremented
+# atomically so concurrent requests never overwrite each other's hits.
+_FLUSHED_KEY = "view_counts:flushed"
+_LOCK_KEY = "view_counts:lock"
+_NEXT_KEY = "view_counts:next"
+_WAITING_KEY = "view_counts:waiting"
+
+# How long hits are kept before they're considered lost. The flush task runs
+# far more often than this, so hits are only lost if memcached is restarted or
+# evicts them, or if the flush task doesn't run for this long.
+HIT_TIMEOUT = 60 * 60 * 24
+
+# The slot counters live as long as memcached allows (30 days); when they
+# expire, numbering starts again from the first slot.
+COUNTER_TIMEOUT = 60 * 60 * 24 * 30
+
+# How long a crashed flush can prevent other flushes.
+LOCK_TIMEOUT = 60 * 5
+
+# The maximum number of hits to flush at once.
+MAX_FLUSH_SIZE = 10000
+
+# Hits that were allocated a slot but haven't been stored yet (their request
+# is between incr() and set()) are only waited for for this many seconds.
+IN_FLIGHT_TIMEOUT = 60
+
+
+def _get_hit_key(slot):
+    return "view_counts:hit:%d" % slot
+
+
+def record_hit(instance, ip_address):
+    """Buffer a user viewing an object.
+
+    The hit is stored in the cache rather than the database so that viewing a
+    page doesn't cost an ``INSERT``. Buffered hits are written to the database
+    in bulk by :func:`flush_hits`.
+
+    :param   instance: The object that was viewed.
+    :type    instance: ``django.db.models.Model``
+    :param ip_address: The IP address of the user doing the viewing.
+    :type  ip_address: ``str``
+    """
+    content_type = ContentType.objects.get_for_model(instance)
+    slot = increment(_NEXT_KEY, timeout=COUNTER_TIMEOUT)
+    cache.set(_get_hit_key(slot), (content_type.pk, instance.pk, ip_address,
+                                   time.time()), HIT_TIMEOUT)
+
+
+def flush_hits(save):
+    """Pass the buffered hits to a function and remove them from the buffer.
+
+    Only one process may flush at a time; if another process is flushing, this
+    returns immediately.
+
+    :param save: A function that stores a list of content type ID, object ID,
+                 IP address, time (as a timestamp) tuples. If it raises an
+                 exception, the hits are left in the buffer so that they can
+                 be flushed again later.
+    :type  save: ``function``
+    :returns: The number of hits that were flushed.
+    :rtype: ``int``
+    """
+    if not cache.add(_LOCK_KEY, True, LOCK_TIMEOUT):
+        return 0
+
+    try:
+        now = time.time()
+        flushed = cache.get(_FLUSHED_KEY, 0)
+        newest = cache.get(_NEXT_KEY, 0)
+
+        # The newest slot when a flush last had to wait for a missing slot,
+        # and when that was. Every slot up to it was allocated by then.
+        waiting = cache.get(_WAITING_KEY)
+
+        # The counter expired or memcached was restarted; start again.
+        if newest < flushed:
+            flushed = 0
+            waiting = None
+
+        # Missing slots that were allocated long enough ago have been lost.
+        lost = 0
+        if waiting is not None and now - waiting[1] >= IN_FLIGHT_TIMEOUT:
+            lost = waiting[0]
+            waiting = None
+
+        last = min(newest, flushed + MAX_FLUSH_SIZE)
+
+        keys = [_get_hit_key(slot) for slot in xrange(flushed + 1, last + 1)]
+        hits = cache.get_many(keys)
+
+        # Stop at the first missing slot that may still be stored so we pick
+        # it up next time.
+        for slot in xrange(max(flushed, lost) + 1, last + 1):
+            if _get_hit_key(slot) not in hits:
+                last = slot - 1
+                if waiting is None:
+                    waiting = (newest, now)
+                break
+        else:
+            waiting = None
+
+        keys = keys[:last - flushed]
+        save([hits[key] for key in keys if key in hits])
+
+        cache.set(_FLUSHED_KEY, last, COUNTER_TIMEOUT)
+        cache.set(_WAITING_KEY, waiting, COUNTER_TIMEOUT)
+        cache.delete_many(keys)
+        return len([key for key in keys if key in hits])
+    finally:
+        cache.delete(_LOCK_KEY)
@@ -1,5 +1,5 @@
 # coding=utf-8
-from .models import View
+from .buffer import record_hit
 from functools import wraps
 
 
@@ -9,6 +9,10 @@ def record_view(function):
     Assumes that the first argument is the request and the second is the object
     being viewed; thus, this decorator should follow ``pk_url`` or ``slug_url``.
 
+    Views are buffered and written to the database periodically (see
+    :func:`politics.apps.view_counts.tasks.flush_views`), so they aren't
+    counted straight away.
+
     .. code-block:: python
 
         @pk_url(MyModel)
@@ -19,7 +23,7 @@ def record_view(function):
     @wraps(function)
     def wrapper(request, instance, *args, **kwargs):
         ip_address = request.META["REMOTE_ADDR"]
-        View(content_object=instance, ip_address=ip_address).save()
+        record_hit(instance, ip_address)
         return function(request, instance, *args, **kwargs)
 
     return wrapper
@@ -0,0 +1,26 @@
+# coding=utf-8
+from datetime import datetime, timedelta
+from django.core.management.base import NoArgsCommand
+from optparse import make_option
+from politics.apps.view_counts.models import (DELETE_BATCH_SIZE,
+                                              RETENTION_PERIOD, View)
+
+
+class Command(NoArgsCommand):
+    help = ("Deletes raw views that have been added to the rollups and are "
+            "older than the retention period.")
+
+    option_list = NoArgsCommand.option_list + (
+        make_option("--batch-size", default=DELETE_BATCH_SIZE, type="int",
+                    help="The maximum number of views to delete at once."),
+        make_option("--days", default=RETENTION_PERIOD.days, type="int",
+                    help="Delete views older than this many days."),
+    )
+
+    def handle_noargs(self, **options):
+        cutoff = datetime.now() - timedelta(days=options["days"])
+        total = View.objects.count()
+
+        deleted = View.objects.delete_before(cutoff, options["batch_size"])
+        self.stdout.write("Deleted %d of %d view(s) created before %s.\n" % (
+                deleted, total, cutoff.strftime("%Y-%m-%d %H:%M")))
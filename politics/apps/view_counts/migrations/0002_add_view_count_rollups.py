@@ -0,0 +1,89 @@
+# encoding: utf-8
+import datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        
+        # Adding model 'DailyViewCount'
+        db.create_table('view_counts_dailyviewcount', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('content_type', self.gf('django.db.models.fields.related.ForeignKey')(to=orm['contenttypes.ContentType'])),
+            ('object_id', self.gf('django.db.models.fields.PositiveIntegerField')()),
+            ('sketch', self.gf('django.db.models.fields.TextField')(blank=True)),
+            ('visitor_count', self.gf('django.db.models.fields.PositiveIntegerField')(default=0)),
+            ('date', self.gf('django.db.models.fields.DateField')()),
+        ))
+        db.send_create_signal('view_counts', ['DailyViewCount'])
+
+        # Adding unique constraint on 'DailyViewCount', fields ['content_type', 'object_id', 'date']
+        db.create_unique('view_counts_dailyviewcount', ['content_type_id', 'object_id', 'date'])
+
+        # Adding model 'ViewCount'
+        db.create_table('view_counts_viewcount', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('content_type', self.gf('django.db.models.fields.related.ForeignKey')(to=orm['contenttypes.ContentType'])),
+            ('object_id', self.gf('django.db.models.fields.PositiveIntegerField')()),
+            ('sketch', self.gf('django.db.models.fields.TextField')(blank=True)),
+            ('visitor_count', self.gf('django.db.models.fields.PositiveIntegerField')(default=0)),
+        ))
+        db.send_create_signal('view_counts', ['ViewCount'])
+
+        # Adding unique constraint on 'ViewCount', fields ['content_type', 'object_id']
+        db.create_unique('view_counts_viewcount', ['content_type_id', 'object_id'])
+
+
+    def backwards(self, orm):
+        
+        # Removing unique constraint on 'ViewCount', fields ['content_type', 'object_id']
+        db.delete_unique('view_counts_viewcount', ['content_type_id', 'object_id'])
+
+        # Removing unique constraint on 'DailyViewCount', fields ['content_type', 'object_id', 'date']
+        db.delete_unique('view_counts_dailyviewcount', ['content_type_id', 'object_id', 'date'])
+
+        # Deleting model 'DailyViewCount'
+        db.delete_table('view_counts_dailyviewcount')
+
+        # Deleting model 'ViewCount'
+        db.delete_table('view_counts_viewcount')
+
+
+    models = {
+        'contenttypes.contenttype': {
+            'Meta': {'ordering': "('name',)", 'unique_together': "(('app_label', 'model'),)", 'object_name': 'ContentType', 'db_table': "'django_content_type'"},
+            'app_label': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'model': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '100'})
+        },
+        'view_counts.dailyviewcount': {
+            'Meta': {'unique_together': "(('content_type', 'object_id', 'date'),)", 'object_name': 'DailyViewCount'},
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']"}),
+            'date': ('django.db.models.fields.DateField', [], {}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'object_id': ('django.db.models.fields.PositiveIntegerField', [], {}),
+            'sketch': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'visitor_count': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'})
+        },
+        'view_counts.view': {
+            'Meta': {'object_name': 'View'},
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']"}),
+            'created_at': ('django.db.models.fields.DateTimeField', [], {'auto_now_add': 'True', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'ip_address': ('django.db.models.fields.IPAddressField', [], {'max_length': '15'}),
+            'object_id': ('django.db.models.fields.PositiveIntegerField', [], {})
+        },
+        'view_counts.viewcount': {
+            'Meta': {'unique_together': "(('content_type', 'object_id'),)", 'object_name': 'ViewCount'},
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']"}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'object_id': ('django.db.models.fields.PositiveIntegerField', [], {}),
+            'sketch': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'visitor_count': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'})
+        }
+    }
+
+    complete_apps = ['view_counts']
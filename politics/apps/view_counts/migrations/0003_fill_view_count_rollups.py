@@ -0,0 +1,71 @@
+# encoding: utf-8
+import datetime
+from south.db import db
+from south.v2 import DataMigration
+from django.db import models
+from politics.utils.hyperloglog import HyperLogLog
+
+class Migration(DataMigration):
+
+    def forwards(self, orm):
+        daily_sketches = {}
+        sketches = {}
+
+        views = orm.View.objects.values_list("content_type", "object_id", "created_at", "ip_address")
+        for content_type_pk, object_pk, created_at, ip_address in views.iterator():
+            key = (content_type_pk, object_pk)
+            daily_key = key + (created_at.date(),)
+
+            sketches.setdefault(key, HyperLogLog()).add(ip_address)
+            daily_sketches.setdefault(daily_key, HyperLogLog()).add(ip_address)
+
+        for (content_type_pk, object_pk, date), sketch in daily_sketches.iteritems():
+            orm.DailyViewCount.objects.create(content_type_id=content_type_pk, object_id=object_pk, date=date,
+                                              sketch=sketch.serialize(), visitor_count=sketch.count())
+
+        for (content_type_pk, object_pk), sketch in sketches.iteritems():
+            orm.ViewCount.objects.create(content_type_id=content_type_pk, object_id=object_pk,
+                                         sketch=sketch.serialize(), visitor_count=sketch.count())
+
+
+    def backwards(self, orm):
+        orm.DailyViewCount.objects.all().delete()
+        orm.ViewCount.objects.all().delete()
+
+
+    models = {
+        'contenttypes.contenttype': {
+            'Meta': {'ordering': "('name',)", 'unique_together': "(('app_label', 'model'),)", 'object_name': 'ContentType', 'db_table': "'django_content_type'"},
+            'app_label': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'model': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '100'})
+        },
+        'view_counts.dailyviewcount': {
+            'Meta': {'unique_together': "(('content_type', 'object_id', 'date'),)", 'object_name': 'DailyViewCount'},
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']"}),
+            'date': ('django.db.models.fields.DateField', [], {}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'object_id': ('django.db.models.fields.PositiveIntegerField', [], {}),
+            'sketch': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'visitor_count': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'})
+        },
+        'view_counts.view': {
+            'Meta': {'object_name': 'View'},
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']"}),
+            'created_at': ('django.db.models.fields.DateTimeField', [], {'auto_now_add': 'True', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'ip_address': ('django.db.models.fields.IPAddressField', [], {'max_length': '15'}),
+            'object_id': ('django.db.models.fields.PositiveIntegerField', [], {})
+        },
+        'view_counts.viewcount': {
+            'Meta': {'unique_together': "(('content_type', 'object_id'),)", 'object_name': 'ViewCount'},
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']"}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'object_id': ('django.db.models.fields.PositiveIntegerField', [], {}),
+            'sketch': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'visitor_count': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'})
+        }
+    }
+
+    complete_apps = ['view_counts']
@@ -0,0 +1,56 @@
+# encoding: utf-8
+import datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        
+        # Changing field 'View.created_at'
+        db.alter_column('view_counts_view', 'created_at', self.gf('django.db.models.fields.DateTimeField')())
+
+
+    def backwards(self, orm):
+        
+        # Changing field 'View.created_at'
+        db.alter_column('view_counts_view', 'created_at', self.gf('django.db.models.fields.DateTimeField')(auto_now_add=True))
+
+
+    models = {
+        'contenttypes.contenttype': {
+            'Meta': {'ordering': "('name',)", 'unique_together': "(('app_label', 'model'),)", 'object_name': 'ContentType', 'db_table': "'django_content_type'"},
+            'app_label': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'model': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '100'})
+        },
+        'view_counts.dailyviewcount': {
+            'Meta': {'unique_together': "(('content_type', 'object_id', 'date'),)", 'object_name': 'DailyViewCount'},
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']"}),
+            'date': ('django.db.models.fields.DateField', [], {}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'object_id': ('django.db.models.fields.PositiveIntegerField', [], {}),
+            'sketch': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'visitor_count': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'})
+        },
+        'view_counts.view': {
+            'Meta': {'object_name': 'View'},
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']"}),
+            'created_at': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now', 'db_index': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'ip_address': ('django.db.models.fields.IPAddressField', [], {'max_length': '15'}),
+            'object_id': ('django.db.models.fields.PositiveIntegerField', [], {})
+        },
+        'view_counts.viewcount': {
+            'Meta': {'unique_together': "(('content_type', 'object_id'),)", 'object_name': 'ViewCount'},
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']"}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'object_id': ('django.db.models.fields.PositiveIntegerField', [], {}),
+            'sketch': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'visitor_count': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'})
+        }
+    }
+
+    complete_apps = ['view_counts']
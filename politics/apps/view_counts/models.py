@@ -1,7 +1,55 @@
 # coding=utf-8
+from collections import defaultdict
+from datetime import datetime, timedelta
 from django.contrib.contenttypes import generic
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
+import operator
 from politics.apps.core.models.generic_manager import GenericManager
+from politics.utils.hyperloglog import HyperLogLog
+from politics.utils.models import bulk_insert
+
+
+# How long raw views are kept after they've been added to the rollups.
+RETENTION_PERIOD = timedelta(days=30)
+
+# The maximum number of raw views to delete in each transaction.
+DELETE_BATCH_SIZE = 5000
+
+
+class ViewManager(GenericManager):
+    """The default :class:`View` manager."""
+
+    def delete_before(self, cutoff, batch_size=DELETE_BATCH_SIZE):
+        """Delete views that occurred before a time.
+
+        Views are counted in the :class:`DailyViewCount` and :class:`ViewCount`
+        rollups as they're saved, so old views are only needed for auditing.
+        They're deleted in batches, each in its own transaction, so that the
+        table is never locked for long.
+
+        :param     cutoff: Views created before this time are deleted.
+        :type      cutoff: ``datetime.datetime``
+        :param batch_size: The maximum number of views to delete at once.
+        :type  batch_size: ``int``
+        :returns: The number of views that were deleted.
+        :rtype: ``int``
+        """
+        @transaction.commit_on_success
+        def _delete_batch():
+            views = self.get_query_set().filter(created_at__lt=cutoff)
+            pks = list(views.order_by("pk").values_list("pk", flat=True)
+                       [:batch_size])
+            self.get_query_set().filter(pk__in=pks).delete()
+            return len(pks)
+
+        deleted = 0
+        while True:
+            count = _delete_batch()
+            deleted += count
+
+            if count < batch_size:
+                return deleted
 
 
 class View(models.Model):
@@ -19,11 +67,168 @@ class View(models.Model):
     :type      object_id: ``int``
     """
 
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(db_index=True, default=datetime.now)
     content_object = generic.GenericForeignKey("content_type", "object_id")
     content_type = models.ForeignKey("contenttypes.ContentType")
     ip_address = models.IPAddressField()
     object_id = models.PositiveIntegerField()
 
     # Override the default manger.
-    objects = GenericManager()
+    objects = ViewManager()
+
+
+class VisitorCountManager(GenericManager):
+    """The default manager for :class:`VisitorCount` subclasses."""
+
+    def add_hits(self, hits, **kwargs):
+        """Add visitors to the counts of the objects they viewed.
+
+        Counts that don't exist yet are created. Only the view count flush
+        task writes to counts, and it never runs concurrently with itself, so
+        there's no need to lock the rows.
+
+        :param   hits: Content type ID, object ID, IP address, time tuples.
+        :type    hits: *Iterable* of ``tuple``
+        :param kwargs: Extra fields that identify the counts to update (e.g.
+                       the ``date`` of :class:`DailyViewCount` objects).
+        """
+        ip_addresses = defaultdict(set)
+        for content_type_pk, object_pk, ip_address, timestamp in hits:
+            ip_addresses[content_type_pk, object_pk].add(ip_address)
+
+        if len(ip_addresses) == 0:
+            return
+
+        condition = reduce(operator.or_, (Q(content_type=content_type_pk,
+                                            object_id=object_pk)
+                                          for content_type_pk, object_pk
+                                          in ip_addresses))
+        counts = self.get_query_set().filter(condition, **kwargs)
+        counts = dict(((count.content_type_id, count.object_id), count)
+                      for count in counts)
+
+        new_counts = []
+        for (content_type_pk, object_pk), visitors in \
+                ip_addresses.iteritems():
+            count = counts.get((content_type_pk, object_pk))
+            if count is None:
+                count = self.model(content_type_id=content_type_pk,
+                                   object_id=object_pk, **kwargs)
+                new_counts.append(count)
+
+            count.add_visitors(visitors)
+            if count.pk is not None:
+                count.save()
+
+        bulk_insert(new_counts)
+
+
+class VisitorCount(models.Model):
+    """An estimate of the number of unique visitors to an object.
+
+    Rather than storing every visitor's IP address, a :class:`HyperLogLog`
+    sketch of them is stored. Its estimate is cached in ``visitor_count`` so
+    that it can be read without loading the sketch.
+
+    :ivar content_object: The object that was viewed.
+    :type content_object: ``django.db.models.Model``
+    :ivar   content_type: The type of the object that was viewed.
+    :type   content_type: ``django.contrib.contenttypes.models.ContentType``
+    :ivar      object_id: The ID of the object that was viewed.
+    :type      object_id: ``int``
+    :ivar         sketch: The serialized :class:`HyperLogLog` sketch of the
+                          visitors' IP addresses.
+    :type         sketch: ``str``
+    :ivar  visitor_count: The estimated number of unique visitors.
+    :type  visitor_count: ``int``
+    """
+
+    content_object = generic.GenericForeignKey("content_type", "object_id")
+    content_type = models.ForeignKey("contenttypes.ContentType")
+    object_id = models.PositiveIntegerField()
+    sketch = models.TextField(blank=True)
+    visitor_count = models.PositiveIntegerField(default=0)
+
+    # Override the default manger.
+    objects = VisitorCountManager()
+
+    class Meta:
+        abstract = True
+
+    def add_visitors(self, ip_addresses):
+        """Add visitors to the sketch and update the count.
+
+        :param ip_addresses: The visitors' IP addresses.
+        :type  ip_addresses: *Iterable* of ``str``
+        """
+        sketch = HyperLogLog.deserialize(self.sketch)
+        for ip_address in ip_addresses:
+            sketch.add(ip_address)
+
+        self.sketch = sketch.serialize()
+        self.visitor_count = sketch.count()
+
+
+class DailyViewCount(VisitorCount):
+    """The unique visitors to an object on a particular day.
+
+    :ivar date: The day on which the object was viewed.
+    :type date: ``datetime.date``
+    """
+
+    date = models.DateField()
+
+    class Meta:
+        unique_together = ("content_type", "object_id", "date")
+
+
+class ViewCountManager(VisitorCountManager):
+    """The default :class:`ViewCount` manager."""
+
+    def get_counts(self, instances):
+        """Returns the view counts of a number of objects with one query.
+
+        :param instances: The objects, which must all be of the same model.
+        :type  instances: *Iterable* of ``django.db.models.Model``
+        :returns: A dictionary mapping the objects' primary keys to their view
+                  counts. Objects that have never been viewed are included.
+        :rtype: ``dict``
+        """
+        instances = list(instances)
+        if len(instances) == 0:
+            return {}
+
+        counts = dict((instance.pk, 0) for instance in instances)
+        rows = self._get_for_model(instances[0])
+        rows = rows.filter(object_id__in=counts.keys())
+        counts.update(rows.values_list("object_id", "visitor_count"))
+        return counts
+
+    def prefetch(self, instances):
+        """Retrieve the view counts of a number of objects with one query.
+
+        The counts are stored on the objects so that the ``view_count``
+        template filter doesn't need to query the database for each of them.
+
+        :param instances: The objects, which must all be of the same model.
+        :type  instances: *Iterable* of ``django.db.models.Model``
+        """
+        instances = list(instances)
+        counts = self.get_counts(instances)
+
+        for instance in instances:
+            instance._view_count = counts[instance.pk]
+
+
+class ViewCount(VisitorCount):
+    """The unique visitors to an object of all time.
+
+    This is the union of the object's :class:`DailyViewCount`s, so it can be
+    read with a single lookup however long the object has been around.
+    """
+
+    # Override the default manger.
+    objects = ViewCountManager()
+
+    class Meta:
+        unique_together = ("content_type", "object_id")
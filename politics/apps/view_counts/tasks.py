@@ -0,0 +1,61 @@
+# coding=utf-8
+from celery.schedules import crontab
+from celery.task import periodic_task
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from django.db import transaction
+from politics.apps.view_counts.buffer import MAX_FLUSH_SIZE, flush_hits
+from politics.apps.view_counts.models import (RETENTION_PERIOD,
+                                              DailyViewCount, View, ViewCount)
+from politics.utils.models import bulk_insert
+import time
+
+
+# How long a flush keeps draining the buffer before leaving the rest to the
+# next run. It's less than the interval the task runs at so runs don't overlap.
+FLUSH_TIME_LIMIT = 50
+
+
+@periodic_task(ignore_result=True, run_every=timedelta(minutes=1))
+def flush_views():
+    """Write buffered hits to the database as :class:`View` objects.
+
+    The hits are also added to the :class:`DailyViewCount` and
+    :class:`ViewCount` rollups in the same transaction.
+
+    Run every minute. Hits are flushed in batches until the buffer is drained
+    or ``FLUSH_TIME_LIMIT`` runs out, so a backlog built up under load is
+    worked off rather than left to expire.
+    """
+    @transaction.commit_on_success
+    def _save(hits):
+        bulk_insert(View(content_type_id=content_type_pk, object_id=object_pk,
+                         ip_address=ip_address,
+                         created_at=datetime.fromtimestamp(timestamp))
+                    for content_type_pk, object_pk, ip_address, timestamp
+                    in hits)
+
+        # Hits are counted on the day they occurred, not the day they're
+        # flushed (they may be flushed after midnight).
+        days = defaultdict(list)
+        for hit in hits:
+            days[date.fromtimestamp(hit[3])].append(hit)
+
+        for day, day_hits in days.iteritems():
+            DailyViewCount.objects.add_hits(day_hits, date=day)
+
+        ViewCount.objects.add_hits(hits)
+
+    started = time.time()
+    while (flush_hits(_save) >= MAX_FLUSH_SIZE and
+           time.time() - started < FLUSH_TIME_LIMIT):
+        pass
+
+
+@periodic_task(ignore_result=True, run_every=crontab(hour=2, minute=0))
+def delete_old_views():
+    """Delete raw views that are older than ``RETENTION_PERIOD``.
+
+    They've already been added to the rollups. Run at 2 AM every day.
+    """
+    View.objects.delete_before(datetime.now() - RETENTION_PERIOD)
@@ -1,7 +1,6 @@
 # coding=utf-8
-from ..models import View
+from ..models import ViewCount
 from django import template
-from django.db.models import Count
 
 
 register = template.Library()
@@ -11,10 +10,19 @@ register = template.Library()
 def view_count(instance):
     """Returns the view count of the given object.
 
+    This is the estimated number of unique visitors to the object, read from
+    its :class:`ViewCount` rollup. Views are only counted once they've been
+    flushed from the buffer. If the count has been retrieved in advance by
+    :meth:`ViewCountManager.prefetch`, the database isn't queried at all.
+
     :param instance: The object whose view count is to be returned.
     :type  instance: ``django.db.models.Model``
     :returns: The view count of ``instance``.
     :rtype: ``int``
     """
-    views = View.objects.get_for_instance(instance)
-    return views.values("ip_address").annotate(Count("ip_address")).count()
+    if hasattr(instance, "_view_count"):
+        return instance._view_count
+
+    counts = ViewCount.objects.get_for_instance(instance)
+    counts = counts.values_list("visitor_count", flat=True)
+    return counts[0] if len(counts) > 0 else 0
@@ -0,0 +1,4 @@
+# coding=utf-8
+from .models import *
+from .tasks import *
+from .templatetags import *
@@ -0,0 +1,73 @@
+# coding=utf-8
+from ..buffer import record_hit
+from ..models import View, ViewCount
+from ..tasks import flush_views
+from ..templatetags.view_counts import view_count
+from datetime import datetime, timedelta
+from django.core.cache import cache
+from django.test import TransactionTestCase
+from politics.apps.core.models import Issue, Party
+
+
+class ViewCountManagerTestCase(TransactionTestCase):
+    """Unit tests for :class:`ViewCountManager`."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        cache.clear()
+
+        record_hit(Issue.objects.get(pk=1), "127.0.0.1")
+        record_hit(Issue.objects.get(pk=1), "127.0.0.2")
+        record_hit(Issue.objects.get(pk=2), "127.0.0.1")
+        record_hit(Party.objects.get(pk=3), "127.0.0.1")
+        flush_views()
+
+    def test_get_counts(self):
+        """The counts of many objects should be retrieved with one query."""
+        issues = Issue.objects.filter(pk__in=(1, 2, 3))
+        issues = list(issues)
+
+        with self.assertNumQueries(1):
+            counts = ViewCount.objects.get_counts(issues)
+
+        self.assertEqual({1: 2, 2: 1, 3: 0}, counts)
+        self.assertEqual({}, ViewCount.objects.get_counts([]))
+
+    def test_prefetch(self):
+        """Prefetched counts should be used by the ``view_count`` filter."""
+        issues = list(Issue.objects.filter(pk__in=(1, 2, 3)).order_by("pk"))
+        ViewCount.objects.prefetch(issues)
+
+        with self.assertNumQueries(0):
+            self.assertEqual([2, 1, 0], map(view_count, issues))
+
+
+class ViewManagerTestCase(TransactionTestCase):
+    """Unit tests for :class:`ViewManager`."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_delete_before(self):
+        """Old views should be deleted in batches, leaving the rollups."""
+        issue = Issue.objects.get(pk=1)
+        for ip_address in ("127.0.0.1", "127.0.0.2", "127.0.0.3",
+                           "127.0.0.4", "127.0.0.5"):
+            record_hit(issue, ip_address)
+        flush_views()
+
+        now = datetime.now()
+        old_pks = View.objects.order_by("pk").values_list("pk", flat=True)[:3]
+        View.objects.filter(pk__in=list(old_pks)).update(
+                created_at=now - timedelta(days=60))
+
+        # A full batch and a partial one, three queries each.
+        with self.assertNumQueries(6):
+            deleted = View.objects.delete_before(now - timedelta(days=30), 2)
+
+        self.assertEqual(3, deleted)
+        self.assertEqual(2, View.objects.count())
+        self.assertEqual(5, ViewCount.objects.get_counts([issue])[1])
@@ -0,0 +1,132 @@
+# coding=utf-8
+from .. import buffer, tasks
+from ..buffer import IN_FLIGHT_TIMEOUT, record_hit
+from ..models import DailyViewCount, View, ViewCount
+from ..tasks import flush_views
+from datetime import date, datetime, timedelta
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.test import TransactionTestCase
+from politics.apps.core.models import Issue, Party
+from politics.utils.cache import increment
+import time
+
+
+class FlushViewsTestCase(TransactionTestCase):
+    """Unit tests for the ``flush_views`` task."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        cache.clear()
+
+    def _get_views(self):
+        return sorted(View.objects.values_list("object_id", "ip_address"))
+
+    def test_flush_views(self):
+        """Buffered hits should be written to the database in bulk."""
+        record_hit(Issue.objects.get(pk=1), "127.0.0.1")
+        record_hit(Issue.objects.get(pk=1), "127.0.0.2")
+        record_hit(Party.objects.get(pk=2), "127.0.0.1")
+        self.assertEqual([], self._get_views())
+
+        # One to insert the views, two for each of the rollups.
+        with self.assertNumQueries(5):
+            flush_views()
+
+        self.assertEqual([(1, "127.0.0.1"), (1, "127.0.0.2"),
+                          (2, "127.0.0.1")], self._get_views())
+
+        # Flushed hits shouldn't be written again.
+        flush_views()
+        self.assertEqual(3, View.objects.count())
+
+    def test_flush_views_batches(self):
+        """Hits beyond the maximum flush size should be flushed in further
+            batches by the same run."""
+        old_size = buffer.MAX_FLUSH_SIZE
+        buffer.MAX_FLUSH_SIZE = tasks.MAX_FLUSH_SIZE = 2
+        try:
+            for ip_address in ("127.0.0.1", "127.0.0.2", "127.0.0.3",
+                               "127.0.0.4", "127.0.0.5"):
+                record_hit(Issue.objects.get(pk=1), ip_address)
+
+            flush_views()
+        finally:
+            buffer.MAX_FLUSH_SIZE = tasks.MAX_FLUSH_SIZE = old_size
+
+        self.assertEqual(5, View.objects.count())
+
+    def test_flush_views_in_flight(self):
+        """Hits that have been allocated a slot but not stored yet should be
+            flushed later."""
+        record_hit(Issue.objects.get(pk=1), "127.0.0.1")
+        slot = increment("view_counts:next")
+        record_hit(Issue.objects.get(pk=2), "127.0.0.1")
+
+        flush_views()
+        self.assertEqual([(1, "127.0.0.1")], self._get_views())
+
+        content_type_pk = View.objects.get().content_type_id
+        cache.set("view_counts:hit:%d" % slot, (content_type_pk, 3,
+                                                "127.0.0.1", time.time()))
+        flush_views()
+        self.assertEqual([(1, "127.0.0.1"), (2, "127.0.0.1"),
+                          (3, "127.0.0.1")], self._get_views())
+
+    def test_flush_views_lost(self):
+        """Hits that haven't been stored long after their slot was allocated
+            should be skipped."""
+        increment("view_counts:next")
+        record_hit(Issue.objects.get(pk=2), "127.0.0.1")
+
+        flush_views()
+        self.assertEqual([], self._get_views())
+
+        # Pretend that the flush waited a long time ago.
+        newest, waited_at = cache.get("view_counts:waiting")
+        cache.set("view_counts:waiting",
+                  (newest, waited_at - IN_FLIGHT_TIMEOUT))
+        flush_views()
+        self.assertEqual([(2, "127.0.0.1")], self._get_views())
+
+    def test_flush_views_times(self):
+        """Views should be recorded at the time of the hit (rather than the
+            flush) and counted on that day."""
+        content_type_pk = ContentType.objects.get_for_model(Issue).pk
+        yesterday = datetime.now() - timedelta(days=1)
+
+        slot = increment("view_counts:next")
+        cache.set("view_counts:hit:%d" % slot, (content_type_pk, 1,
+                  "127.0.0.1", time.mktime(yesterday.timetuple())))
+        flush_views()
+
+        self.assertEqual(yesterday.replace(microsecond=0),
+                         View.objects.get().created_at)
+        self.assertEqual([yesterday.date()], list(DailyViewCount.objects
+                .values_list("date", flat=True)))
+
+    def test_flush_views_rollups(self):
+        """Flushed hits should be added to the unique visitor rollups."""
+        issue = Issue.objects.get(pk=1)
+        record_hit(issue, "127.0.0.1")
+        record_hit(issue, "127.0.0.1")
+        record_hit(issue, "127.0.0.2")
+        flush_views()
+
+        daily_count = DailyViewCount.objects.get_for_instance(issue).get()
+        self.assertEqual(date.today(), daily_count.date)
+        self.assertEqual(2, daily_count.visitor_count)
+        self.assertEqual(2, ViewCount.objects.get_for_instance(issue)
+                .get().visitor_count)
+
+        # Existing rollups should be updated rather than duplicated, and
+        # returning visitors shouldn't be counted again.
+        record_hit(issue, "127.0.0.2")
+        record_hit(issue, "127.0.0.3")
+        flush_views()
+
+        counts = ViewCount.objects.get_for_instance(issue)
+        self.assertEqual([3], list(counts.values_list("visitor_count",
+                                                      flat=True)))
+        self.assertEqual(1, DailyViewCount.objects.count())
@@ -0,0 +1,28 @@
+# coding=utf-8
+from ..buffer import record_hit
+from ..tasks import flush_views
+from ..templatetags.view_counts import view_count
+from django.core.cache import cache
+from django.test import TransactionTestCase
+from politics.apps.core.models import Issue
+
+
+class ViewCountTestCase(TransactionTestCase):
+    """Unit tests for the ``view_count`` filter."""
+
+    fixtures = ("core_test_data",)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_view_count(self):
+        """The filter should read the object's rollup with a single query."""
+        issue = Issue.objects.get(pk=1)
+        self.assertEqual(0, view_count(issue))
+
+        for ip_address in ("127.0.0.1", "127.0.0.2", "127.0.0.1"):
+            record_hit(issue, ip_address)
+        flush_views()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(2, view_count(issue))
@@ -8,6 +8,10 @@ class ScoreField(models.FloatField):
     Effectively acts as a marker for :class:`Vote`. Add an instance of this
     field to a model and it will automagically be updated as votes are cast.
 
+    The score is calculated from the number of up and down votes, which must be
+    stored in integer fields alongside it. These counters are adjusted as votes
+    are cast and archived, so we never have to count the votes themselves.
+
     .. code-block:: python
 
         from django.db import models
@@ -15,7 +19,10 @@ class ScoreField(models.FloatField):
 
 
         class MyModel(models.Model):
-            score = ScoreField()
+            down_vote_count = models.IntegerField(default=0)
+            score = ScoreField(down_field="down_vote_count",
+                               up_field="up_vote_count")
+            up_vote_count = models.IntegerField(default=0)
 
     The following demonstrates automatic updating of the field:
 
@@ -33,13 +40,38 @@ class ScoreField(models.FloatField):
     """
 
     # Override to provide a default default.
-    def __init__(self, default=0, *args, **kwargs):
-        super(ScoreField, self).__init__(default=default, *args, **kwargs)
+    def __init__(self, *args, **kwargs):
+        """
+        Takes ``FloatField``'s arguments, plus these keyword arguments:
+
+        :param down_field: The name of the field that counts down votes.
+        :type  down_field: ``str``
+        :param   up_field: The name of the field that counts up votes.
+        :type    up_field: ``str``
+        """
+        self.down_field = kwargs.pop("down_field", None)
+        self.up_field = kwargs.pop("up_field", None)
+        kwargs.setdefault("default", 0)
+        super(ScoreField, self).__init__(*args, **kwargs)
+
+    def get_count_field(self, type):
+        """Returns the name of the field that counts votes of a type.
+
+        :param type: The vote type (``Vote.UP`` or ``Vote.DOWN``).
+        :type  type: ``str``
+        :rtype: ``str`` or ``None``
+        """
+        from .models import Vote
+
+        return self.up_field if type == Vote.UP else self.down_field
 
 
 # Add South introspection rules.
 try:
     from south.modelsinspector import add_introspection_rules
-    add_introspection_rules([], ["^politics\.apps\.votes\.fields\.ScoreField"])
+    add_introspection_rules([([ScoreField], [], {
+        "down_field": ["down_field", {"default": None}],
+        "up_field": ["up_field", {"default": None}]
+    })], ["^politics\.apps\.votes\.fields\.ScoreField"])
 except ImportError:
     pass
@@ -1,12 +1,36 @@
 # coding=utf-8
 from .fields import ScoreField
 from django.contrib.contenttypes import generic
-from django.db import IntegrityError, models
-from django.db.models import Count
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F
 from politics.apps.core.models.generic_manager import GenericManager
+from politics.utils.cache import bump_versions
 from math import sqrt
 
 
+def _wilson(up, down):
+    """Returns the lower bound of the Wilson score interval of some votes.
+
+    The interval has 95% confidence; this is 0 if there are no votes.
+
+    :param   up: The number of up votes.
+    :type    up: ``int``
+    :param down: The number of down votes.
+    :type  down: ``int``
+    :rtype: ``float``
+    """
+    n = float(up + down)
+    if n <= 0:
+        return 0
+
+    p = up / n
+    z = 1.65 # 95%
+    z2 = z * z
+    result = p + z2 / (2 * n)
+    result = result - z * sqrt((p * (1 - p)) / n + z2 / (4 * n * n))
+    return result / (1 + z2 / n)
+
+
 class VotesManager(GenericManager):
     """The default :class:`Vote`s manager.
 
@@ -23,6 +47,44 @@ class VotesManager(GenericManager):
         votes = super(VotesManager, self).get_for_instance(instance)
         return votes if include_archived else votes.filter(is_archived=False)
 
+    @transaction.commit_on_success
+    def cast(self, author, instance, type=None):
+        """Replace a user's vote on an object.
+
+        The user's current votes on the object are archived with a single
+        query and, if ``type`` is given, a new vote is created. The object's
+        score (and anything that depends on it) is refreshed once at the end,
+        rather than once for every vote that is archived or created.
+
+        :param   author: The user casting the vote.
+        :type    author: ``django.contrib.auth.models.User``
+        :param instance: The object being voted on.
+        :type  instance: ``django.db.models.Model``
+        :param     type: The type of the new vote or ``None`` to only archive
+                         the user's current votes.
+        :type      type: ``str`` or ``None``
+        :returns: The new vote, if one was created.
+        :rtype: :class:`Vote` or ``None``
+        """
+        votes = self.get_for_instance(instance).filter(author=author)
+        deltas = {}
+
+        for archived_type in votes.values_list("type", flat=True):
+            deltas[archived_type] = deltas.get(archived_type, 0) - 1
+
+        votes.update(is_archived=True)
+
+        vote = None
+        if type is not None:
+            # Assign the instance after construction so that it's cached.
+            vote = Vote(author=author, type=type)
+            vote.content_object = instance
+            vote.save(refresh_score=False)
+            deltas[type] = deltas.get(type, 0) + 1
+
+        Vote.update_score(instance, deltas)
+        return vote
+
     def not_archived(self):
         """Returns votes that aren't archived.
 
@@ -92,10 +154,48 @@ class Vote(models.Model):
     class Meta:
         app_label = "votes"
 
+    def __init__(self, *args, **kwargs):
+        super(Vote, self).__init__(*args, **kwargs)
+
+        # The type that the vote is counted as in its subject's counters (if
+        # any) so that we know what to adjust when it's archived or deleted.
+        self._counted_type = self._get_counted_type()
+
+    def _get_counted_type(self):
+        """Returns the type that the vote should be counted as, if at all."""
+        return None if self.pk is None or self.is_archived else self.type
+
+    @staticmethod
+    def _recount_score(subject, votes):
+        """Update the subject's score and counters from a set of votes.
+
+        This is used in migrations, where the counters can't be trusted.
+        """
+        votes = votes.values("type").annotate(count=Count("type"))
+        votes = dict((v["type"], v["count"]) for v in votes)
+
+        for field in subject._meta.fields:
+            if isinstance(field, ScoreField):
+                for type in (Vote.DOWN, Vote.UP):
+                    if field.get_count_field(type) is not None:
+                        setattr(subject, field.get_count_field(type),
+                                votes.get(type, 0))
+
+                setattr(subject, field.name, _wilson(votes.get(Vote.UP, 0),
+                                                     votes.get(Vote.DOWN, 0)))
+
+        subject.save()
+
     @staticmethod
     def refresh_score(instance, **kwargs):
         """Update the subject's score if it has a :class:`ScoreField`.
 
+        The subject's up and down vote counters are adjusted with ``F()``
+        expressions and the score is calculated from them, so the cost of a
+        vote doesn't depend on how many votes the subject has received. If the
+        score changes and the subject has a ``handle_score_changed()`` method,
+        it is called.
+
         :param instance: The :class:`Vote` that was deleted or saved.
         :type  instance: :class:`Vote`
         """
@@ -103,37 +203,94 @@ class Vote(models.Model):
         if kwargs.get("raw"):
             return
 
-        # Returns the lower bound of a sample's Wilson score interval with 95%
-        # confidence. n is the sample size, p is the observed proportion.
-        def _wilson(n, p):
-            z = 1.65 # 95%
-            z2 = z * z
-            result = p + z2 / (2 * n)
-            result = result - z * sqrt((p * (1 - p)) / n + z2 / (4 * n * n))
-            return result / (1 + z2 / n)
-
         # The subject will be None in cascading deletes.
         subject = instance.content_object
         if subject is None:
             return
 
         # The votes are passed in when we're running in a migration.
-        votes = kwargs.pop("votes", Vote.objects.get_for_instance(subject))
-        votes = votes.values("type").annotate(count=Count("type"))
-        votes = dict((v["type"], 1.0 * v["count"]) for v in votes)
+        if "votes" in kwargs:
+            Vote._recount_score(subject, kwargs["votes"])
+            return
 
-        up = votes.get(Vote.UP, 0.0)
-        total = up + votes.get(Vote.DOWN, 0.0)
-        score = _wilson(total, up / total) if total > 0 else 0
+        counted_type = instance._get_counted_type()
+        if kwargs.get("signal") is models.signals.post_delete:
+            counted_type = None
 
-        # Update all the subject's ScoreFields.
-        for field in subject._meta.fields:
-            if isinstance(field, ScoreField):
-                setattr(subject, field.name, score)
+        deltas = {}
+        if instance._counted_type is not None:
+            deltas[instance._counted_type] = -1
+        if counted_type is not None:
+            deltas[counted_type] = deltas.get(counted_type, 0) + 1
 
-        subject.save()
+        instance._counted_type = counted_type
+
+        # The score is refreshed once by the caller when casting votes.
+        if getattr(instance, "_refresh_score", True):
+            Vote.update_score(subject, deltas)
+
+    @staticmethod
+    def update_score(subject, deltas):
+        """Adjust a subject's vote counters and recalculate its score.
+
+        If the score changes and the subject has a ``handle_score_changed()``
+        method, it is called. Score fields without both counters are skipped,
+        as their scores can't be calculated without counting the votes.
+
+        :param subject: The subject of the votes.
+        :type  subject: ``django.db.models.Model``
+        :param  deltas: The amount to add to the counter of each vote type.
+        :type   deltas: ``dict``
+        """
+        fields = [field for field in subject._meta.fields
+                  if isinstance(field, ScoreField) and
+                  field.down_field is not None and field.up_field is not None]
+        if len(fields) == 0:
+            return
+
+        subjects = type(subject)._default_manager.filter(pk=subject.pk)
+
+        counters = {}
+        for field in fields:
+            for type_, delta in deltas.iteritems():
+                name = field.get_count_field(type_)
+                if delta != 0:
+                    counters[name] = F(name) + delta
+
+        if len(counters) > 0:
+            subjects.update(**counters)
+
+            # The subject isn't saved, so cached pages that show its counts
+            # wouldn't be invalidated otherwise.
+            bump_versions(subject)
+
+        # Calculate the scores from the updated counters.
+        names = sum(([field.up_field, field.down_field] for field in fields),
+                    [])
+        counts = subjects.values(*names)[0]
+        scores = {}
+
+        for field in fields:
+            scores[field.name] = _wilson(counts[field.up_field],
+                                         counts[field.down_field])
+
+        changed = any(getattr(subject, name) != score
+                      for name, score in scores.iteritems())
+
+        subjects.update(**scores)
+        for name, value in counts.items() + scores.items():
+            setattr(subject, name, value)
+
+        if changed and hasattr(subject, "handle_score_changed"):
+            subject.handle_score_changed()
 
     def save(self, *args, **kwargs):
+        """
+        :param refresh_score: Whether the subject's score should be refreshed.
+        :type  refresh_score: ``bool``
+        """
+        self._refresh_score = kwargs.pop("refresh_score", True)
+
         # Ensure that the user hasn't already voted on this object. It's the
         # caller's responsibility to archive votes before creating new ones.
         votes = Vote.objects.get_for_instance(self.content_object)
@@ -143,6 +300,7 @@ class Vote(models.Model):
             raise IntegrityError("Duplicate vote.")
 
         super(Vote, self).save(*args, **kwargs)
+        self._refresh_score = True
 
 
 
@@ -1,4 +1,5 @@
 # coding=utf-8
+from ..fields import ScoreField
 from ..models import Vote
 from django.contrib.auth.models import User
 from django.db import IntegrityError
@@ -6,6 +7,19 @@ from django.test import TransactionTestCase
 from politics.apps.core.models import Reference
 
 
+class ScoreFieldTestCase(TransactionTestCase):
+    """Unit tests for :class:`ScoreField`."""
+
+    def test_init(self):
+        """``FloatField``'s positional arguments should be passed through."""
+        field = ScoreField("Score", down_field="down_vote_count",
+                           up_field="up_vote_count")
+        self.assertEqual("Score", field.verbose_name)
+        self.assertEqual(0, field.default)
+        self.assertEqual(("down_vote_count", "up_vote_count"),
+                         (field.down_field, field.up_field))
+
+
 class VoteTestCase(TransactionTestCase):
     """Unit tests for the ``Vote`` class."""
 
@@ -44,3 +58,40 @@ class VoteTestCase(TransactionTestCase):
 
         reference = Reference.objects.get(pk=2)
         self.assertEqual(0, reference.score)
+
+    def test_refresh_score_counters(self):
+        """Casting and archiving votes should adjust the subject's counters."""
+        reference = Reference.objects.get(pk=3)
+        user = User.objects.get(pk=1)
+
+        vote = Vote.objects.get_for_instance(reference).get(author=user)
+        vote.is_archived = True
+        vote.save()
+
+        Vote(author=user, content_object=reference, type=Vote.DOWN).save()
+
+        reference = Reference.objects.get(pk=3)
+        self.assertEqual((1, 2), (reference.down_vote_count,
+                                  reference.up_vote_count))
+        self.assertAlmostEqual(0.2526950, reference.score)
+
+        # Deleting a vote should also remove it from the counters.
+        Vote.objects.get_for_instance(reference).get(author=user).delete()
+
+        reference = Reference.objects.get(pk=3)
+        self.assertEqual((0, 2), (reference.down_vote_count,
+                                  reference.up_vote_count))
+
+    def test_refresh_score_no_counters(self):
+        """Score fields without counters should be skipped."""
+        field = Reference._meta.get_field("score")
+        down_field, field.down_field = field.down_field, None
+        try:
+            reference = Reference.objects.get(pk=2)
+            Vote(author=User.objects.get(pk=2), content_object=reference,
+                 type=Vote.UP).save()
+        finally:
+            field.down_field = down_field
+
+        reference = Reference.objects.get(pk=2)
+        self.assertEqual(0, reference.up_vote_count)
@@ -2,10 +2,13 @@
 from ..models import Vote
 from ..views import votes
 from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.contenttypes.models import ContentType
 from django.test import TransactionTestCase
 import fudge
 import json
-from politics.apps.core.models import Reference
+# Versions views with reversion, as the admin does in production.
+import politics.apps.core.admin
+from politics.apps.core.models import Reference, View
 
 
 class VotesViewTestCase(TransactionTestCase):
@@ -122,3 +125,53 @@ class VotesViewTestCase(TransactionTestCase):
         self.assertEqual("", response.content)
         self.assertEqual(400, response.status_code)
         self.assertEqual(self.vote_count, Vote.objects.count())
+
+    def test_post_query_count(self):
+        """A POST request should archive the user's vote and refresh the
+            object's score (and the view's stance) exactly once."""
+        request = fudge.Fake("HttpRequest").has_attr(
+            method="POST",
+            POST={"type": Vote.DOWN},
+            user=self.user
+        )
+
+        # The fixture's stance is out of date; bring it up to date first so
+        # that the vote doesn't change it.
+        self.reference.view.refresh_stance()
+
+        # Whether the content type is cached depends on earlier tests.
+        ContentType.objects.get_for_model(self.reference)
+
+        # Archive (2), create (2), score (3), stance (1).
+        with self.assertNumQueries(8):
+            response = votes(request, self.reference)
+
+        self.assertEqual(201, response.status_code)
+        self.assertAlmostEqual(0, json.loads(response.content)["score"])
+
+    def test_post_query_count_stance(self):
+        """A POST request that changes the view's stance should apply the
+            change with a fixed number of queries."""
+        request = fudge.Fake("HttpRequest").has_attr(
+            method="POST",
+            POST={"type": Vote.UP},
+            user=self.user
+        )
+
+        # The fixture's score is out of date, so the view's stance is unknown
+        # until the vote refreshes it.
+        reference = Reference.objects.get(pk=3)
+        reference.view.refresh_stance()
+        self.assertEqual(View.UNKNOWN, View.objects.get(pk=6).stance)
+
+        ContentType.objects.get_for_model(reference)
+
+        # Archive (2), create (2), score (2), stance and saving the view, its
+        # revision and the issue (11), the histogram and known counts (4),
+        # agreements (5), and the coalesced tasks, which run eagerly in tests
+        # (10).
+        with self.assertNumQueries(36):
+            response = votes(request, reference)
+
+        self.assertEqual(201, response.status_code)
+        self.assertEqual(View.OPPOSE, View.objects.get(pk=6).stance)
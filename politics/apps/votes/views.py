@@ -19,18 +19,13 @@ def votes(request, instance):
     :type  instance: ``django.db.models.Model``
     """
     def _build_response(status=200):
-        score = instance.__class__.objects.get(pk=instance.pk).score
-        return HttpResponse(json.dumps({"score": score}),
+        # Vote.objects.cast() updates the instance's score.
+        return HttpResponse(json.dumps({"score": instance.score}),
                 mimetype="application/json", status=status)
 
-    # Either way, their current vote(s) are archived. We need to actually call
-    # save() to trigger the post_save signal which updates the object's score.
-    votes = Vote.objects.get_for_instance(instance)
-    for vote in votes.filter(author=request.user):
-        vote.is_archived = True
-        vote.save()
-
+    # Either way, their current vote(s) are archived.
     if request.method == "DELETE":
+        Vote.objects.cast(request.user, instance)
         return _build_response()
 
     if request.method == "POST":
@@ -38,7 +33,8 @@ def votes(request, instance):
         form = VoteForm(request.POST, instance=vote)
 
         if form.is_valid():
-            vote = form.save()
+            vote = Vote.objects.cast(request.user, instance,
+                                     form.cleaned_data["type"])
             logging.getLogger("email").info("New Vote", extra={"body":
                 "%s voted %s %d %s." % (
                     request.user.get_full_name(),
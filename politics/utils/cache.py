@@ -0,0 +1,364 @@
+# coding=utf-8
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import models
+import hashlib
+import time
+
+
+def increment(key, delta=1, timeout=None):
+    """Increments a counter in the cache, creating it if necessary.
+
+    :param     key: The counter's cache key.
+    :type      key: ``str``
+    :param   delta: The amount to add to the counter.
+    :type    delta: ``int``
+    :param timeout: The counter's timeout if it has to be created (the cache's
+                    default timeout is used if this is ``None``).
+    :type  timeout: ``int`` or ``None``
+    :returns: The counter's new value.
+    :rtype: ``int``
+    """
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # The counter doesn't exist yet (or was evicted). If another process
+        # created it in the meantime, add() fails so we have to incr() again.
+        if cache.add(key, delta, timeout):
+            return delta
+
+        return cache.incr(key, delta)
+
+
+# Versions live as long as memcached allows (30 days). If one is evicted, it's
+# recreated from the current time so that it never matches an older version.
+VERSION_TIMEOUT = 60 * 60 * 24 * 30
+
+# Values cached by get_cached() are recalculated at least this often, even if
+# the objects they depend on haven't changed.
+CACHED_TIMEOUT = 60 * 60
+
+# The models whose versions are tracked, mapped to the fields they follow.
+_versioned_models = {}
+
+
+def _get_version_key(model, pk=None):
+    meta = model._meta
+    key = "version:%s.%s" % (meta.app_label, meta.module_name)
+    return key if pk is None else "%s:%s" % (key, pk)
+
+
+def get_version(model, pk=None):
+    """Returns the version of a model or one of its objects for cache keys.
+
+    Cached values that depend on an object should include its version in their
+    keys; bumping the version when the object changes (see
+    :func:`register_versioned`) causes the stale values to be ignored and
+    eventually evicted. A model's version changes whenever any of its objects
+    do, so it suits values that depend on many of them (e.g. a list).
+
+    :param model: The model.
+    :type  model: ``django.db.models.base.ModelBase``
+    :param    pk: The object's primary key, or ``None`` for the model's version.
+    :type     pk: ``int``
+    :rtype: ``int``
+    """
+    key = _get_version_key(model, pk)
+    version = cache.get(key)
+
+    if version is None:
+        cache.add(key, int(time.time() * 1000), VERSION_TIMEOUT)
+        version = cache.get(key)
+
+    return version
+
+
+def bump_version(model, pk=None):
+    """Invalidates cached values that depend on a model or one of its objects.
+
+    :param model: The model.
+    :type  model: ``django.db.models.base.ModelBase``
+    :param    pk: The object's primary key, or ``None`` for the model's version.
+    :type     pk: ``int``
+    """
+    try:
+        cache.incr(_get_version_key(model, pk))
+    except ValueError:
+        # There's no version, so nothing depends on it yet.
+        pass
+
+
+def _get_related(instance, name):
+    """Returns the model and primary key of an object's related object.
+
+    :param instance: The object.
+    :type  instance: ``django.db.models.Model``
+    :param     name: The name of a foreign key or generic foreign key.
+    :type      name: ``str``
+    :returns: The related object's model, its primary key (``None`` if there's
+              no related object) and the related object itself if it has
+              already been loaded (otherwise ``None``).
+    :rtype: ``tuple``
+    """
+    for field in instance._meta.virtual_fields:
+        if field.name == name:
+            content_type_pk = getattr(instance, "%s_id" % field.ct_field)
+            if content_type_pk is None:
+                return None, None, None
+
+            content_type = ContentType.objects.get_for_id(content_type_pk)
+            return (content_type.model_class(),
+                    getattr(instance, field.fk_field),
+                    getattr(instance, field.cache_attr, None))
+
+    field = instance._meta.get_field(name)
+    return (field.rel.to, getattr(instance, field.attname),
+            getattr(instance, field.get_cache_name(), None))
+
+
+def _bump_followed_versions(instance):
+    """Bump the versions of the objects that an object follows.
+
+    Only the objects' own versions are bumped, not their models'; otherwise
+    every change would invalidate everything that depends on the models
+    (e.g. saving a view would invalidate every page that depends on
+    ``Party``). Related objects are never loaded from the database, so objects
+    that they follow in turn are only bumped if they're already loaded.
+    """
+    for name in _versioned_models.get(type(instance), ()):
+        related_model, related_pk, related = _get_related(instance, name)
+        if related_pk is None:
+            continue
+
+        bump_version(related_model, related_pk)
+        if related is not None:
+            _bump_followed_versions(related)
+
+
+def bump_versions(instance):
+    """Bump the versions of an object, its model and the objects it follows.
+
+    This is done automatically when a registered object is saved or deleted
+    (see :func:`register_versioned`), but must be called explicitly if it's
+    changed in some other way (e.g. by ``QuerySet.update()``).
+
+    :param instance: The object that changed.
+    :type  instance: ``django.db.models.Model``
+    """
+    model = type(instance)
+    bump_version(model)
+    bump_version(model, instance.pk)
+    _bump_followed_versions(instance)
+
+
+def _handle_saved_or_deleted(instance, **kwargs):
+    bump_versions(instance)
+
+
+def _handle_m2m_changed(instance, action, model, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+
+    bump_versions(instance)
+    bump_version(model)
+    for pk in pk_set or ():
+        bump_version(model, pk)
+
+
+def register_versioned(model, follow=()):
+    """Keep track of the versions of a model and its objects.
+
+    When an object is saved or deleted, or one of its many-to-many relations
+    changes, its version and its model's version are bumped. The versions of
+    the objects that it refers to through the foreign keys named in ``follow``
+    are bumped too (but not their models' versions), as are the versions of
+    the objects they follow if they're already loaded.
+
+    .. code-block:: python
+
+        register_versioned(View, follow=("issue", "party"))
+
+    :param  model: The model.
+    :type   model: ``django.db.models.base.ModelBase``
+    :param follow: The names of the model's foreign keys to follow.
+    :type  follow: *Iterable* of ``str``
+    """
+    _versioned_models[model] = tuple(follow)
+
+    dispatch_uid = _get_version_key(model)
+    models.signals.post_delete.connect(_handle_saved_or_deleted, sender=model,
+                                       dispatch_uid=dispatch_uid)
+    models.signals.post_save.connect(_handle_saved_or_deleted, sender=model,
+                                     dispatch_uid=dispatch_uid)
+
+    # Generic relations are listed too, but they don't have a through model.
+    for field in model._meta.many_to_many:
+        if field.rel.through is None:
+            continue
+
+        models.signals.m2m_changed.connect(_handle_m2m_changed,
+                                           sender=field.rel.through,
+                                           dispatch_uid=dispatch_uid)
+
+
+def get_versioned_key(name, *dependencies):
+    """Returns a cache key that changes when any of its dependencies do.
+
+    .. code-block:: python
+
+        key = get_versioned_key("tag_cloud", Tag, Issue)
+
+    :param         name: A name for the cached value.
+    :type          name: ``str``
+    :param dependencies: The models and objects that the value depends on
+                         (whose versions are included) and any other values
+                         that it depends on, which must be convertible to
+                         strings.
+    :rtype: ``str``
+    """
+    parts = []
+    for dependency in dependencies:
+        if isinstance(dependency, models.base.ModelBase):
+            parts.append("%s-%s" % (_get_version_key(dependency),
+                                    get_version(dependency)))
+        elif isinstance(dependency, models.Model):
+            model = type(dependency)
+            parts.append("%s-%s" % (_get_version_key(model, dependency.pk),
+                                    get_version(model, dependency.pk)))
+        else:
+            parts.append(unicode(dependency))
+
+    # The key may be long or contain spaces, which memcached doesn't allow.
+    return "cached:%s:%s" % (name, hashlib.md5(
+            ":".join(parts).encode("utf-8")).hexdigest())
+
+
+def _get_cache_stats_key(name, stat):
+    return "cached:%s:%s" % (stat, name)
+
+
+def get_cached(name, function, *dependencies):
+    """Returns a value from the cache, calculating it if necessary.
+
+    The value is cached under a key containing the versions of the models and
+    objects it depends on (see :func:`get_versioned_key`), so it's calculated
+    again whenever one of them changes.
+
+    .. code-block:: python
+
+        html = get_cached("issue_summary",
+                          lambda: render_to_string(template, context), issue)
+
+    :param         name: A name for the value.
+    :type          name: ``str``
+    :param     function: A function that calculates the value.
+    :type      function: ``function``
+    :param dependencies: What the value depends on (see
+                         :func:`get_versioned_key`).
+    """
+    key = get_versioned_key(name, *dependencies)
+
+    value = cache.get(key)
+    if value is not None:
+        increment(_get_cache_stats_key(name, "hits"))
+        return value
+
+    increment(_get_cache_stats_key(name, "misses"))
+    value = function()
+    cache.set(key, value, CACHED_TIMEOUT)
+    return value
+
+
+def get_cache_stats(name):
+    """Returns the number of times a value was found in the cache or not.
+
+    The counters are stored in the cache, so they're approximate: they start
+    from zero whenever the cache is flushed.
+
+    :param name: The name of the value (as passed to :func:`get_cached`).
+    :type  name: ``str``
+    :returns: A dictionary with ``hits`` and ``misses`` keys.
+    :rtype: ``dict``
+    """
+    return dict((stat, cache.get(_get_cache_stats_key(name, stat), 0))
+                for stat in ("hits", "misses"))
+
+
+def _get_latest_count_key(name):
+    return "counts:latest:%s" % name
+
+
+def _get_refreshing_count_key(key):
+    return "counts:refreshing:%s" % key
+
+
+def refresh_cached_count(name, queryset, *dependencies):
+    """Count the objects in a queryset and cache the result.
+
+    This is called by :func:`get_cached_count` (or in the background by the
+    ``refresh_cached_count`` task); it shouldn't usually be called directly.
+
+    :param         name: A name for the count.
+    :type          name: ``str``
+    :param     queryset: The objects to count.
+    :type      queryset: ``django.db.models.query.QuerySet``
+    :param dependencies: What the count depends on (see
+                         :func:`get_versioned_key`).
+    :returns: The number of objects.
+    :rtype: ``int``
+    """
+    # Build the key first so that changes made while we count cause it to be
+    # counted again.
+    key = get_versioned_key(name, *dependencies)
+    count = queryset.count()
+
+    cache.set(key, count, CACHED_TIMEOUT)
+    cache.set(_get_latest_count_key(name), count, VERSION_TIMEOUT)
+    cache.delete(_get_refreshing_count_key(key))
+    return count
+
+
+def get_cached_count(name, queryset, *dependencies):
+    """Returns the number of objects in a queryset, from the cache if possible.
+
+    Like :func:`get_cached`, the count is cached under a key containing the
+    versions of the models and objects it depends on. When one of them
+    changes, the previous count is returned while the queryset is counted
+    again in the background, so only the very first request pays for the
+    ``COUNT(*)``. That makes it suitable for paginators, where an out of date
+    count only affects the links to the last pages.
+
+    .. code-block:: python
+
+        count = get_cached_count("tags", Tag.objects.all(), Tag)
+        page = Paginator(tags, 25, count=count).page(number)
+
+    :param         name: A name for the count; it must only be used for one
+                         queryset.
+    :type          name: ``str``
+    :param     queryset: The objects to count. It is pickled and passed to a
+                         task, so it shouldn't be too large.
+    :type      queryset: ``django.db.models.query.QuerySet``
+    :param dependencies: What the count depends on (see
+                         :func:`get_versioned_key`).
+    :rtype: ``int``
+    """
+    from politics.apps.core.tasks import refresh_count
+
+    key = get_versioned_key(name, *dependencies)
+
+    count = cache.get(key)
+    if count is not None:
+        increment(_get_cache_stats_key(name, "hits"))
+        return count
+
+    increment(_get_cache_stats_key(name, "misses"))
+    count = cache.get(_get_latest_count_key(name))
+    if count is None:
+        return refresh_cached_count(name, queryset, *dependencies)
+
+    # Only queue one refresh for each version.
+    if cache.add(_get_refreshing_count_key(key), True, CACHED_TIMEOUT):
+        refresh_count.delay(name, queryset, *dependencies)
+
+    return count
@@ -1,11 +1,222 @@
 # coding=utf-8
+from django.contrib.messages import get_messages
+from django.core.cache import cache
 from django.core.urlresolvers import resolve
-from django.http import Http404, HttpResponse, HttpResponseNotFound
+from django.db import models
+from django.http import (Http404, HttpResponse, HttpResponseNotFound,
+                         HttpResponseNotModified)
+from django.middleware.csrf import get_token
 from django.shortcuts import get_object_or_404, redirect, render_to_response
 from django.template import loader, RequestContext
+from django.utils.http import (http_date, parse_etags, parse_http_date_safe,
+                               quote_etag)
 from django.views.decorators.http import require_http_methods
 from functools import wraps
+import hashlib
 import json
+from politics.utils.cache import get_versioned_key
+import time
+
+
+# Cached pages are rendered again at least this often, even if the objects
+# they depend on haven't changed (e.g. to pick up search results).
+PAGE_TIMEOUT = 60 * 10
+
+# Stands in for the user's CSRF token in cached pages.
+_CSRF_PLACEHOLDER = "__csrf_token__"
+
+
+def cache_anonymous_page(*dependencies, **kwargs):
+    """A view decorator that caches the pages shown to anonymous users.
+
+    Pages are cached under keys containing the versions of the objects they
+    depend on (see :func:`politics.utils.cache.register_versioned`), so they
+    are purged whenever one of those objects changes. The model instances that
+    are passed to the view are dependencies, as are ``dependencies``.
+
+    .. code-block:: python
+
+        @slug_url(Issue)
+        @cache_anonymous_page(Party)
+        @render_to_template("issue.html")
+        def view(request, issue):
+            # ...
+
+    Requests that aren't ``GET`` or ``HEAD``, requests from users that are
+    logged in and requests with pending messages bypass the cache, as do
+    responses that set cookies. Every page contains a CSRF token (in the
+    feedback form), so it's replaced with a placeholder in the cached page and
+    the current user's token is put back when it's served. ``ETag`` and
+    ``Last-Modified`` headers (see :func:`conditional`) are cached with the
+    page so that conditional requests can still be answered from the cache.
+
+    Pages are cached by path and the query string parameters named in
+    ``query`` (e.g. ``@cache_anonymous_page(Issue, query=("page",))``); other
+    parameters are ignored, so they can't be used to fill the cache. Pages
+    are only stored from requests without other parameters, which may be
+    copied into links (e.g. by the ``query_string`` tag).
+
+    :param dependencies: Models and objects the pages depend on.
+    :type  dependencies: ``django.db.models.base.ModelBase`` or
+                         ``django.db.models.Model``
+    :param        query: The query string parameters that the view reads.
+    :type         query: *Iterable* of ``str``
+    """
+    query = tuple(sorted(kwargs.pop("query", ())))
+
+    def inner(function):
+        @wraps(function)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ("GET", "HEAD") or
+                    request.user.is_authenticated() or
+                    len(get_messages(request)) > 0):
+                return function(request, *args, **kwargs)
+
+            instances = [arg for arg in args + tuple(kwargs.values())
+                         if isinstance(arg, models.Model)]
+            parameters = [(name, request.GET.getlist(name))
+                          for name in query]
+            key = get_versioned_key("page", request.path, parameters,
+                                    *(dependencies + tuple(instances)))
+
+            page = cache.get(key)
+            if page is not None:
+                content, content_type, validators = page
+
+                if "ETag" in validators:
+                    response = _get_not_modified_response(request,
+                            validators["ETag"],
+                            validators.get("Last-Modified"))
+                    if response is not None:
+                        return response
+
+                # get_token() also makes the middleware set the CSRF cookie.
+                if _CSRF_PLACEHOLDER in content:
+                    content = content.replace(_CSRF_PLACEHOLDER,
+                                              get_token(request))
+
+                response = HttpResponse(content, content_type=content_type)
+                for header, value in validators.iteritems():
+                    response[header] = value
+
+                return response
+
+            response = function(request, *args, **kwargs)
+            if (response.status_code == 200 and not response.cookies and
+                    set(request.GET) <= set(query)):
+                content = response.content
+                if request.META.get("CSRF_COOKIE_USED"):
+                    content = content.replace(get_token(request),
+                                              _CSRF_PLACEHOLDER)
+
+                validators = dict((header, response[header]) for header
+                                  in ("ETag", "Last-Modified")
+                                  if response.has_header(header))
+                cache.set(key, (content, response["Content-Type"],
+                                validators), PAGE_TIMEOUT)
+
+            return response
+
+        return wrapper
+
+    return inner
+
+
+def _get_not_modified_response(request, etag, last_modified):
+    """Returns 304 Not Modified if a conditional request's page is unchanged.
+
+    :param       request: The HTTP request.
+    :type        request: ``django.http.HttpRequest``
+    :param          etag: The page's quoted ETag.
+    :type           etag: ``str``
+    :param last_modified: The page's ``Last-Modified`` header, if it has one.
+    :type  last_modified: ``str`` or ``None``
+    :returns: A 304 Not Modified response or ``None`` if the page changed (or
+              the request isn't conditional).
+    :rtype: ``django.http.HttpResponseNotModified`` or ``None``
+    """
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if_modified_since = request.META.get("HTTP_IF_MODIFIED_SINCE")
+
+    # If-None-Match takes precedence over If-Modified-Since.
+    if if_none_match is not None:
+        etags = parse_etags(if_none_match)
+        not_modified = "*" in etags or etag.strip('"') in etags
+    elif if_modified_since is not None and last_modified is not None:
+        not_modified = (parse_http_date_safe(if_modified_since) >=
+                        parse_http_date_safe(last_modified))
+    else:
+        not_modified = False
+
+    if not not_modified:
+        return None
+
+    response = HttpResponseNotModified()
+    response["ETag"] = etag
+    return response
+
+
+def conditional(last_modified):
+    """A view decorator that supports conditional ``GET`` requests.
+
+    ``last_modified`` is called with the view's arguments and should return
+    when the page's content last changed, as cheaply as possible (e.g. from
+    ``updated_at`` timestamps). If the client's cached copy is up to date, 304
+    Not Modified is returned without calling the view; otherwise, ``ETag`` and
+    ``Last-Modified`` headers are added to the view's response.
+
+    .. code-block:: python
+
+        @pk_url(MyModel)
+        @conditional(lambda request, instance: instance.updated_at)
+        def view(request, instance):
+            # ...
+
+    The ``ETag`` also depends on the user, as pages differ for each user. For
+    the same reason, ``Last-Modified`` is only sent to anonymous users.
+    Requests with pending messages are never answered with 304 Not Modified
+    as the messages would be lost.
+
+    :param last_modified: Returns when the page last changed (or ``None`` if
+                          that can't be determined).
+    :type  last_modified: ``function``
+    """
+    def inner(function):
+        @wraps(function)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ("GET", "HEAD") or
+                    len(get_messages(request)) > 0):
+                return function(request, *args, **kwargs)
+
+            modified = last_modified(request, *args, **kwargs)
+            if modified is None:
+                return function(request, *args, **kwargs)
+
+            etag = quote_etag(hashlib.md5("%s:%s:%s" % (
+                    request.get_full_path(), request.user.id,
+                    modified.isoformat())).hexdigest())
+
+            # HTTP dates only have a resolution of one second.
+            if request.user.is_authenticated():
+                modified = None
+            else:
+                modified = http_date(time.mktime(modified.timetuple()))
+
+            response = _get_not_modified_response(request, etag, modified)
+            if response is not None:
+                return response
+
+            response = function(request, *args, **kwargs)
+            if response.status_code == 200:
+                response["ETag"] = etag
+                if modified is not None:
+                    response["Last-Modified"] = modified
+
+            return response
+
+        return wrapper
+
+    return inner
 
 
 def pk_url(model):
@@ -29,8 +240,10 @@ def pk_url(model):
             url(r"^(?P<pk>\d+)/", view, name="view"),
         )
 
-    :param model: The model on which lookups are to be performed.
-    :type  model: ``django.db.models.base.ModelBase``
+    :param model: The model (or query set) on which lookups are to be
+                  performed.
+    :type  model: ``django.db.models.base.ModelBase`` or
+                  ``django.db.models.query.QuerySet``
     """
     def inner(function):
         @wraps(function)
@@ -66,14 +279,21 @@ def render_json(function):
     return wrapper
 
 
-def render_to_template(template):
+def render_to_template(template, last_modified=None):
     """A view decorator that renders a template using the returned context.
 
     If the view returns a ``dict``, it will be used as the context when
     rendering ``template``; anything else will be returned unchanged.
 
-    :param template: The template to render.
-    :type  template: ``str``
+    If ``last_modified`` is given, conditional requests are supported (see
+    :func:`conditional`): the view isn't called and the template isn't
+    rendered if the client's copy of the page is up to date.
+
+    :param      template: The template to render.
+    :type       template: ``str``
+    :param last_modified: Returns when the page last changed, given the
+                          view's arguments.
+    :type  last_modified: ``function``
     """
     def inner(view):
         @wraps(view)
@@ -87,6 +307,9 @@ def render_to_template(template):
             return render_to_response(template, context,
                     context_instance=RequestContext(request))
 
+        if last_modified is not None:
+            return conditional(last_modified)(wrapper)
+
         return wrapper
 
     return inner
@@ -0,0 +1,106 @@
+# coding=utf-8
+import base64
+import hashlib
+import math
+
+
+class HyperLogLog(object):
+    """Estimates the number of distinct values in a set using little memory.
+
+    Each value is hashed; the first ``precision`` bits of the hash pick one of
+    ``2 ** precision`` registers and the register records the longest run of
+    leading zeros seen in the rest of the hash. The number of distinct values
+    can be estimated from the registers, with a standard error of roughly
+    ``1.04 / sqrt(2 ** precision)`` (about 3% with the default precision).
+
+    Sketches can be merged, so daily sketches can be combined into a total
+    without double-counting values that appear on more than one day.
+
+    .. code-block:: python
+
+        >>> sketch = HyperLogLog()
+        >>> for value in ("a", "b", "a"):
+        ...     sketch.add(value)
+        >>> sketch.count()
+        2
+
+    :ivar precision: The number of hash bits used to pick a register.
+    :type precision: ``int``
+    :ivar registers: The registers.
+    :type registers: ``bytearray``
+    """
+
+    def __init__(self, precision=10, registers=None):
+        """
+        :param precision: The number of hash bits used to pick a register.
+        :type  precision: ``int``
+        :param registers: The initial registers (empty if ``None``).
+        :type  registers: ``bytearray`` or ``None``
+        """
+        self.precision = precision
+        self.registers = registers or bytearray(2 ** precision)
+
+    def add(self, value):
+        """Add a value to the set.
+
+        :param value: The value.
+        :type  value: ``str``
+        """
+        hashed = hashlib.sha1(value.encode("utf-8")).hexdigest()
+        hashed = int(hashed[:16], 16)
+        index = hashed >> (64 - self.precision)
+
+        # Count the leading zeros of the remaining bits (plus one).
+        remaining_bits = 64 - self.precision
+        remainder = hashed & ((1 << remaining_bits) - 1)
+        rank = remaining_bits - remainder.bit_length() + 1
+
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        """Estimate the number of distinct values that have been added.
+
+        :rtype: ``int``
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+
+        # Small cardinalities are estimated much more accurately by counting
+        # the registers that haven't been used yet (linear counting).
+        zeros = sum(1 for r in self.registers if r == 0)
+        if estimate <= 2.5 * m and zeros > 0:
+            estimate = m * math.log(float(m) / zeros)
+
+        return int(round(estimate))
+
+    def merge(self, other):
+        """Add the values of another sketch to this one.
+
+        :param other: A sketch with the same precision.
+        :type  other: :class:`HyperLogLog`
+        """
+        self.registers = bytearray(max(a, b) for a, b
+                                   in zip(self.registers, other.registers))
+
+    @classmethod
+    def deserialize(cls, data):
+        """Create a sketch from the output of :meth:`serialize`.
+
+        :param data: The serialized sketch or an empty string.
+        :type  data: ``str``
+        :rtype: :class:`HyperLogLog`
+        """
+        if not data:
+            return cls()
+
+        registers = bytearray(base64.b64decode(data))
+        return cls(int(math.log(len(registers), 2)), registers)
+
+    def serialize(self):
+        """Returns the sketch as an ASCII string for storage.
+
+        :rtype: ``str``
+        """
+        return base64.b64encode(str(self.registers))
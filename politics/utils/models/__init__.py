@@ -1,2 +1,5 @@
 # coding=utf-8
+from .aggregates import get_latest
+from .bulk import bulk_insert, bulk_insert_missing
+from .counts import estimate_count
 from .fields import MarkdownField
@@ -0,0 +1,31 @@
+# coding=utf-8
+from django.db.models import Max
+
+
+def get_latest(*timestamps):
+    """Returns the latest of a number of timestamps.
+
+    Each timestamp is either a ``datetime`` or a queryset and the name of a
+    field whose latest value is found with an aggregate query, e.g.:
+
+    .. code-block:: python
+
+        get_latest(issue.updated_at, (issue.view_set, "updated_at"))
+
+    Missing timestamps (e.g. of empty querysets) are ignored.
+
+    :param timestamps: The timestamps.
+    :type  timestamps: ``datetime.datetime`` or ``(QuerySet, str)`` tuples
+    :returns: The latest timestamp or ``None`` if they're all missing.
+    :rtype: ``datetime.datetime`` or ``None``
+    """
+    latest = None
+    for timestamp in timestamps:
+        if isinstance(timestamp, tuple):
+            queryset, field = timestamp
+            timestamp = queryset.aggregate(latest=Max(field))["latest"]
+
+        if timestamp is not None and (latest is None or timestamp > latest):
+            latest = timestamp
+
+    return latest
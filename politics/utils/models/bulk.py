@@ -0,0 +1,105 @@
+# coding=utf-8
+from django.db import connection, IntegrityError, models, transaction
+
+
+# The most parameters a query may have (SQLite's limit is the lowest).
+MAX_PARAMETERS = 999
+
+
+def bulk_insert(instances):
+    """Inserts a number of unsaved model instances with a single query.
+
+    Django doesn't provide a way to insert many rows at once, so we build a
+    multi-row ``INSERT`` statement ourselves. Very large numbers of instances
+    are split into batches to stay under the database's limit on the number
+    of parameters in a query, costing one query per batch.
+
+    .. code-block:: python
+
+        bulk_insert(MyModel(name=name) for name in names)
+
+    .. warning::
+
+        The instances' primary keys aren't set and no signals are sent.
+
+    :param instances: The model instances to insert. They must all be of the
+                      same model.
+    :type  instances: *Iterable* of ``django.db.models.Model``
+    :returns: The number of rows that were inserted.
+    :rtype: ``int``
+    """
+    instances = list(instances)
+    if len(instances) == 0:
+        return 0
+
+    meta = instances[0]._meta
+    fields = [field for field in meta.local_fields
+              if not isinstance(field, models.AutoField)]
+
+    quote_name = connection.ops.quote_name
+    sql = "INSERT INTO %s (%s) VALUES " % (
+        quote_name(meta.db_table),
+        ", ".join(quote_name(field.column) for field in fields)
+    )
+    placeholders = "(%s)" % ", ".join(["%s"] * len(fields))
+
+    # pre_save() takes care of auto_now_add, etc.
+    rows = [[field.get_db_prep_save(field.pre_save(instance, True),
+                                    connection=connection)
+             for field in fields] for instance in instances]
+
+    cursor = connection.cursor()
+    batch_size = max(1, MAX_PARAMETERS // len(fields))
+    for start in xrange(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        cursor.execute(sql + ", ".join([placeholders] * len(batch)),
+                       [value for row in batch for value in row])
+
+    # Raw queries don't mark the transaction as dirty, so commit_on_success
+    # and friends wouldn't otherwise commit the rows we just inserted.
+    transaction.set_dirty()
+    return len(rows)
+
+
+def bulk_insert_missing(instances):
+    """Inserts a number of unsaved model instances, skipping duplicates.
+
+    Finding the rows that don't exist yet and inserting them isn't enough if
+    other requests may be inserting the same rows: one of them will violate a
+    unique constraint. If the rows can't all be inserted at once, each is
+    inserted in its own savepoint and those that already exist are skipped.
+
+    .. warning::
+
+        The instances' primary keys aren't set and no signals are sent.
+
+    :param instances: The model instances to insert. They must all be of the
+                      same model.
+    :type  instances: *Iterable* of ``django.db.models.Model``
+    :returns: The number of rows that were inserted.
+    :rtype: ``int``
+    """
+    instances = list(instances)
+    if len(instances) == 0:
+        return 0
+
+    savepoint = transaction.savepoint()
+    try:
+        inserted = bulk_insert(instances)
+    except IntegrityError:
+        transaction.savepoint_rollback(savepoint)
+    else:
+        transaction.savepoint_commit(savepoint)
+        return inserted
+
+    inserted = 0
+    for instance in instances:
+        savepoint = transaction.savepoint()
+        try:
+            inserted += bulk_insert([instance])
+        except IntegrityError:
+            transaction.savepoint_rollback(savepoint)
+        else:
+            transaction.savepoint_commit(savepoint)
+
+    return inserted
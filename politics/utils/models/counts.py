@@ -0,0 +1,31 @@
+# coding=utf-8
+from django.db import connection
+
+
+# Below this many rows, tables are counted exactly: it's cheap and estimates
+# of small tables are relatively inaccurate.
+EXACT_COUNT_THRESHOLD = 10000
+
+
+def estimate_count(model):
+    """Returns the approximate number of objects of a model.
+
+    On PostgreSQL, ``COUNT(*)`` has to scan the whole table, so the planner's
+    estimate of the table's size (``pg_class.reltuples``, which is updated by
+    ``VACUUM`` and ``ANALYZE``) is used for large tables. On other databases,
+    or if the table is small, the objects are counted exactly.
+
+    :param model: The model.
+    :type  model: ``django.db.models.base.ModelBase``
+    :rtype: ``int``
+    """
+    if connection.vendor == "postgresql":
+        cursor = connection.cursor()
+        cursor.execute("SELECT reltuples FROM pg_class WHERE relname = %s",
+                       (model._meta.db_table,))
+        row = cursor.fetchone()
+
+        if row is not None and row[0] >= EXACT_COUNT_THRESHOLD:
+            return int(row[0])
+
+    return model._default_manager.count()
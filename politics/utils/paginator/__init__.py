@@ -1,2 +1,3 @@
 # coding=utf-8
+from .keyset import KeysetPage, KeysetPaginator
 from .paginator import Paginator
@@ -0,0 +1,186 @@
+# coding=utf-8
+import base64
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+import json
+
+
+class KeysetPaginator(object):
+    """A paginator that seeks to pages rather than counting and offsetting.
+
+    Django's paginator counts every object and retrieves a page with ``OFFSET``,
+    so later pages get slower as the database skips more and more rows. This
+    paginator instead remembers the ordering key of the first and last objects
+    on a page and retrieves the next (or previous) page by filtering on it;
+    given an index on the ordering, every page costs the same single query.
+
+    .. code-block:: python
+
+        paginator = KeysetPaginator(Issue.objects.all(), 25,
+                                    ordering=("-updated_at", "-pk"))
+        page = paginator.page(request.GET.get("cursor"))
+
+    Pages are identified by opaque cursors rather than numbers, so it's not
+    possible to jump to an arbitrary page or to know how many pages there are.
+
+    :ivar object_list: The objects to paginate.
+    :type object_list: ``django.db.models.query.QuerySet``
+    :ivar    ordering: The fields by which the objects are ordered, each
+                       optionally prefixed with "-" for descending order. They
+                       must be non-null fields of the model (not of related
+                       models) and together they must be unique (e.g. end
+                       with "pk").
+    :type    ordering: ``tuple`` of ``str``
+    :ivar    per_page: The maximum number of objects on each page.
+    :type    per_page: ``int``
+    """
+
+    def __init__(self, object_list, per_page, ordering=("-pk",)):
+        self.object_list = object_list
+        self.ordering = tuple(ordering)
+        self.per_page = int(per_page)
+
+    def _decode_cursor(self, cursor):
+        """Returns the direction and key values encoded in a cursor.
+
+        :raises ValueError: If the cursor is invalid.
+        """
+        try:
+            direction, values = json.loads(base64.urlsafe_b64decode(
+                    str(cursor)))
+            if direction not in ("next", "previous") or \
+                    not isinstance(values, list) or \
+                    len(values) != len(self.ordering):
+                raise ValueError()
+        except (TypeError, ValueError, UnicodeError):
+            raise ValueError("Invalid cursor.")
+
+        try:
+            return direction, [self._get_field(name).to_python(value)
+                               for name, value in zip(self.ordering, values)]
+        except ValidationError:
+            raise ValueError("Invalid cursor.")
+
+    def _encode_cursor(self, direction, instance):
+        """Returns a cursor for the objects before or after an instance."""
+        values = [unicode(getattr(instance, name.lstrip("-")))
+                  for name in self.ordering]
+        return base64.urlsafe_b64encode(json.dumps([direction, values]))
+
+    def _filter_after(self, values, reverse):
+        """Returns a ``Q`` matching the objects after a key in the ordering.
+
+        For the ordering ``("-updated_at", "-pk")``, for example, objects with
+        an earlier ``updated_at`` or the same ``updated_at`` and a lower ``pk``
+        come after the key. If ``reverse``, the objects before the key match.
+        """
+        condition = None
+        for index, name in enumerate(self.ordering):
+            descending = name.startswith("-") != reverse
+            lookups = dict((self.ordering[i].lstrip("-"), values[i])
+                           for i in range(index))
+            lookups["%s__%s" % (name.lstrip("-"),
+                                "lt" if descending else "gt")] = values[index]
+
+            if condition is None:
+                condition = Q(**lookups)
+            else:
+                condition |= Q(**lookups)
+
+        return condition
+
+    def _get_field(self, name):
+        """Returns the model field that an ordering name refers to."""
+        meta = self.object_list.model._meta
+        name = name.lstrip("-")
+        return meta.pk if name == "pk" else meta.get_field(name)
+
+    def page(self, cursor=None):
+        """Returns the page identified by a cursor.
+
+        Invalid cursors are treated as ``None``: the first page is returned.
+
+        :param cursor: A cursor from :attr:`KeysetPage.next_cursor` or
+                       :attr:`KeysetPage.previous_cursor` (or ``None`` for
+                       the first page).
+        :type  cursor: ``str`` or ``None``
+        :rtype: :class:`KeysetPage`
+        """
+        direction, values = "next", None
+        if cursor:
+            try:
+                direction, values = self._decode_cursor(cursor)
+            except ValueError:
+                pass
+
+        reverse = direction == "previous"
+        if reverse:
+            ordering = [name[1:] if name.startswith("-") else "-" + name
+                        for name in self.ordering]
+        else:
+            ordering = list(self.ordering)
+
+        object_list = self.object_list.order_by(*ordering)
+        if values is not None:
+            object_list = object_list.filter(
+                    self._filter_after(values, reverse))
+
+        # Retrieve one extra object to find out if there's another page.
+        object_list = list(object_list[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+
+        if reverse:
+            object_list.reverse()
+            return KeysetPage(object_list, self, has_next=True,
+                              has_previous=has_more)
+
+        return KeysetPage(object_list, self, has_next=has_more,
+                          has_previous=values is not None)
+
+
+class KeysetPage(object):
+    """A page of objects from a :class:`KeysetPaginator`.
+
+    :ivar object_list: The objects on the page.
+    :type object_list: ``list``
+    :ivar   paginator: The paginator that created the page.
+    :type   paginator: :class:`KeysetPaginator`
+    """
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next and len(object_list) > 0
+        self._has_previous = has_previous and len(object_list) > 0
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def has_previous(self):
+        return self._has_previous
+
+    @property
+    def next_cursor(self):
+        """The cursor of the next page (``None`` on the last page)."""
+        if not self._has_next:
+            return None
+
+        return self.paginator._encode_cursor("next", self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        """The cursor of the previous page (``None`` on the first page)."""
+        if not self._has_previous:
+            return None
+
+        return self.paginator._encode_cursor("previous", self.object_list[0])
@@ -1,9 +1,31 @@
 # coding=utf-8
-from django.core.paginator import Paginator as BasePaginator
+from django.core.paginator import Page, Paginator as BasePaginator
 
 
 class Paginator(BasePaginator):
-    """A paginator that handles invalid page numbers."""
+    """A paginator that handles invalid page numbers.
+
+    The total number of objects can be passed as ``count`` (e.g. from
+    :func:`politics.utils.cache.get_cached_count` or
+    :func:`politics.utils.models.estimate_count`) so that the objects don't
+    have to be counted on every request.
+
+    Pages are sliced from the objects before they're counted: search results
+    (e.g. a ``haystack.query.SearchQuerySet``) come back with the number of
+    matches, so fetching a page doesn't cost another request to count them.
+    """
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        """
+        :param object_list: The objects to paginate.
+        :type  object_list: ``list`` or ``django.db.models.query.QuerySet``
+        :param    per_page: The maximum number of objects on each page.
+        :type     per_page: ``int``
+        :param       count: The number of objects (counted if ``None``).
+        :type        count: ``int`` or ``None``
+        """
+        super(Paginator, self).__init__(object_list, per_page, **kwargs)
+        self._count = count
 
     def page(self, number):
         """Returns a ``Page`` object for the given 1-based page number.
@@ -17,8 +39,16 @@ class Paginator(BasePaginator):
         :type  number: ``int`` or ``str``
         """
         try:
-            number = max(1, min(self.num_pages, int(number)))
+            number = max(1, int(number))
         except ValueError:
             number = 1
 
-        return super(Paginator, self).page(number)
+        bottom = (number - 1) * self.per_page
+        object_list = self.object_list[bottom:bottom + self.per_page]
+
+        # Numbers past the last page are rounded down to it and the last page
+        # may include orphans, so it's left to Django.
+        if number >= self.num_pages:
+            return super(Paginator, self).page(self.num_pages)
+
+        return Page(object_list, number, self)
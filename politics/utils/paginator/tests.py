@@ -25,6 +25,30 @@ class PaginatorTestCase(unittest.TestCase):
         page = self.paginator.page("Hello!")
         self.assertEqual(1, page.number)
 
+    def test_count(self):
+        """A given count should be used instead of counting the objects."""
+        paginator = Paginator(range(10), 5, count=20)
+        self.assertEqual(4, paginator.num_pages)
+        self.assertEqual(4, paginator.page(10).number)
+
+    def test_slice_before_count(self):
+        """Pages before the last should be sliced before the objects are
+            counted, so that search results can count themselves."""
+        calls = []
+
+        class Results(object):
+            def __getitem__(self, index):
+                calls.append("slice")
+                return range(10)[index]
+
+            def __len__(self):
+                calls.append("count")
+                return 10
+
+        page = Paginator(Results(), 5).page(1)
+        self.assertEqual(range(5), page.object_list)
+        self.assertEqual(["slice", "count"], calls)
+
 
 if __name__ == "__main__":
     unittest.main()
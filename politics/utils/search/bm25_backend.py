@@ -0,0 +1,467 @@
+# coding=utf-8
+"""An embedded haystack backend that searches an in-process inverted index.
+
+It needs no search server, so it's used for offline development and tests and
+as a fallback while Solr is unavailable:
+
+.. code-block:: python
+
+    HAYSTACK_SEARCH_ENGINE = "politics.utils.search.bm25"
+
+    # Where to keep the index. If unset, it's only kept in memory (so each
+    # process has its own index).
+    HAYSTACK_BM25_PATH = "/var/lib/politics/search_index.pickle"
+
+Then run ``manage.py rebuild_index``. While another engine (i.e. Solr) is
+used, the ``update_search_index`` task keeps the index at
+``HAYSTACK_BM25_PATH`` up to date too, so that it can be switched to without
+rebuilding it. Queries built with ``auto_query()``,
+``filter()``, ``exclude()``, ``models()`` and ``facet()``, autocompletion on
+``EdgeNgramField``\ s and ``more_like_this()`` are supported; results are
+ranked with BM25. Exact phrases match documents containing all of their words
+(positions aren't indexed).
+"""
+from .index import InvertedIndex
+from contextlib import contextmanager
+import cPickle as pickle
+from django.conf import settings
+from django.utils.encoding import force_unicode
+from haystack.backends import BaseSearchBackend, BaseSearchQuery, SearchNode
+from haystack.constants import DJANGO_CT, DJANGO_ID, ID
+from haystack.fields import EdgeNgramField, FacetField
+from haystack.models import SearchResult
+import fcntl
+import heapq
+import os
+import tempfile
+import threading
+
+
+BACKEND_NAME = "bm25"
+
+# The number of terms of an object used to find objects like it.
+MORE_LIKE_THIS_TERMS = 25
+
+# The inverted indexes of this process, by path (None for memory only), with
+# the modification time of the file they were loaded from.
+_indexes = {}
+_lock = threading.RLock()
+
+
+class SearchBackend(BaseSearchBackend):
+    """Searches an :class:`InvertedIndex` in the current process.
+
+    If ``settings.HAYSTACK_BM25_PATH`` is set, the index is saved there after
+    every change and is reloaded whenever another process changes it. Changes
+    are made while holding a lock on the file, so that processes changing the
+    index at the same time don't overwrite each other's changes.
+    """
+
+    def __init__(self, site=None):
+        super(SearchBackend, self).__init__(site)
+        self.path = getattr(settings, "HAYSTACK_BM25_PATH", None)
+
+    def _get_index(self):
+        """Returns the inverted index, loading it from disk if it changed."""
+        with _lock:
+            modified_at, index = _indexes.get(self.path, (None, None))
+
+            if self.path is not None and os.path.exists(self.path):
+                if os.path.getmtime(self.path) != modified_at:
+                    with open(self.path, "rb") as f:
+                        index = pickle.load(f)
+
+                    modified_at = os.path.getmtime(self.path)
+
+            if index is None:
+                index = InvertedIndex()
+
+            _indexes[self.path] = (modified_at, index)
+            return index
+
+    @contextmanager
+    def _lock_index(self):
+        """Hold the index exclusively (across processes if there's a path)
+        while it's loaded, changed and saved."""
+        with _lock:
+            if self.path is None:
+                yield
+                return
+
+            with open(self.path + ".lock", "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _save_index(self, index):
+        """Save the inverted index to disk (if there's a path)."""
+        if self.path is None:
+            return
+
+        # Write to a temporary file and rename it so readers never see a
+        # partially written index.
+        with _lock:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            descriptor, temporary_path = tempfile.mkstemp(dir=directory)
+            with os.fdopen(descriptor, "wb") as f:
+                pickle.dump(index, f, pickle.HIGHEST_PROTOCOL)
+
+            os.rename(temporary_path, self.path)
+            _indexes[self.path] = (os.path.getmtime(self.path), index)
+
+    def _get_content_field(self):
+        """Returns the name of the field that holds the indexed documents."""
+        for name, field in self.site.all_searchfields().iteritems():
+            if field.document:
+                return name
+
+        return "text"
+
+    def _evaluate(self, node, index, candidates):
+        """Returns the candidate documents that match a query and their scores.
+
+        :param       node: The query.
+        :type        node: ``haystack.backends.SearchNode``
+        :param      index: The inverted index.
+        :type       index: :class:`InvertedIndex`
+        :param candidates: The identifiers of the documents that may match.
+        :type  candidates: ``set``
+        :returns: Matching identifiers mapped to scores, or ``None`` if the
+                  query has no terms (e.g. it only contains stop words), in
+                  which case it's ignored like Solr ignores it.
+        :rtype: ``dict`` or ``None``
+        """
+        scores = None
+        for child in node.children:
+            if isinstance(child, SearchNode):
+                child_scores = self._evaluate(child, index, candidates)
+            else:
+                expression, value = child
+                field, filter_type = node.split_expression(expression)
+                child_scores = self._match(field, filter_type, value, index,
+                                           candidates)
+
+            if child_scores is None:
+                continue
+            elif scores is None:
+                scores = child_scores
+            elif node.connector == SearchNode.AND:
+                scores = dict((identifier, score + child_scores[identifier])
+                              for identifier, score in scores.iteritems()
+                              if identifier in child_scores)
+            else:
+                for identifier, score in child_scores.iteritems():
+                    scores[identifier] = scores.get(identifier, 0) + score
+
+        if scores is not None and node.negated:
+            scores = dict.fromkeys(candidates - set(scores), 0)
+
+        return scores
+
+    def _match(self, field, filter_type, value, index, candidates):
+        """Returns the candidate documents that match a single condition.
+
+        See :meth:`_evaluate`.
+        """
+        if field == "content":
+            field = self._get_content_field()
+        else:
+            field = self.site.get_index_fieldname(field)
+
+        if hasattr(value, "values_list"):
+            value = list(value)
+
+        # Analyzed fields are searched for by their terms.
+        if field in index.fields:
+            if filter_type == "in":
+                terms = [index.analyze_query(field, force_unicode(item))
+                         for item in value]
+            else:
+                terms = [index.analyze_query(field, force_unicode(value))]
+
+            terms = [item for item in terms if item]
+            if len(terms) == 0:
+                return None
+
+            if filter_type == "startswith":
+                matches = index.match_prefix(field, terms[0][0])
+                return dict.fromkeys(matches & candidates, 0)
+
+            scores = {}
+            for item in terms:
+                scores.update(index.match(field, item))
+
+            return dict((identifier, score)
+                        for identifier, score in scores.iteritems()
+                        if identifier in candidates)
+
+        # Other fields are compared with their stored values.
+        comparisons = {
+            "exact": lambda stored: stored == value,
+            "gt": lambda stored: stored > value,
+            "gte": lambda stored: stored >= value,
+            "in": lambda stored: stored in value,
+            "lt": lambda stored: stored < value,
+            "lte": lambda stored: stored <= value,
+            "range": lambda stored: value[0] <= stored <= value[1],
+            "startswith": lambda stored: force_unicode(stored).startswith(
+                    force_unicode(value)),
+        }
+
+        if filter_type in ("exact", "startswith"):
+            value = force_unicode(value)
+        elif filter_type == "in":
+            value = [force_unicode(item) for item in value]
+
+        def matches(stored):
+            if stored is None:
+                return False
+            if filter_type in ("exact", "in", "startswith"):
+                stored = force_unicode(stored)
+            return comparisons[filter_type](stored)
+
+        scores = {}
+        for identifier in candidates:
+            stored = index.documents[identifier].get(field)
+            if isinstance(stored, (list, tuple)):
+                is_match = any(matches(item) for item in stored)
+            else:
+                is_match = matches(stored)
+
+            if is_match:
+                scores[identifier] = 0
+
+        return scores
+
+    def _get_candidates(self, index, django_cts, limit_to_registered_models):
+        """Returns the identifiers of the documents of some models."""
+        if not django_cts and limit_to_registered_models is not False and \
+                getattr(settings, "HAYSTACK_LIMIT_TO_REGISTERED_MODELS", True):
+            django_cts = ["%s.%s" % (model._meta.app_label,
+                                     model._meta.module_name)
+                          for model in self.site.get_indexed_models()]
+
+        if not django_cts:
+            return set(index.documents)
+
+        django_cts = set(django_cts)
+        return set(identifier for identifier, stored
+                   in index.documents.iteritems()
+                   if stored.get(DJANGO_CT) in django_cts)
+
+    def _get_results(self, index, scores, start_offset, end_offset, sort_by,
+                     facets, result_class):
+        """Returns a page of matching documents in haystack's format."""
+        if sort_by:
+            # Sort by each field in turn, starting with the last.
+            identifiers = sorted(scores)
+            for field in reversed(list(sort_by)):
+                name = field.lstrip("-")
+                identifiers.sort(key=lambda identifier:
+                                 index.documents[identifier].get(name),
+                                 reverse=field.startswith("-"))
+        elif end_offset is not None:
+            identifiers = heapq.nlargest(end_offset, scores,
+                                         key=lambda key: (scores[key], key))
+        else:
+            identifiers = sorted(scores, key=lambda key: (scores[key], key),
+                                 reverse=True)
+
+        if result_class is None:
+            result_class = SearchResult
+
+        results = []
+        for identifier in identifiers[start_offset:end_offset]:
+            stored = dict((str(name), value) for name, value
+                          in index.documents[identifier].iteritems()
+                          if name not in (ID, DJANGO_CT, DJANGO_ID))
+            app_label, module_name = \
+                    index.documents[identifier][DJANGO_CT].split(".")
+            results.append(result_class(
+                    app_label, module_name,
+                    index.documents[identifier][DJANGO_ID],
+                    scores[identifier], searchsite=self.site, **stored))
+
+        facet_counts = {}
+        for field in facets or ():
+            counts = {}
+            for identifier in scores:
+                values = index.documents[identifier].get(field)
+                if not isinstance(values, (list, tuple)):
+                    values = [] if values is None else [values]
+
+                for value in set(force_unicode(value) for value in values):
+                    counts[value] = counts.get(value, 0) + 1
+
+            facet_counts[field] = sorted(counts.iteritems(),
+                                         key=lambda (value, count):
+                                         (-count, value))
+
+        response = {"hits": len(scores), "results": results}
+        if facet_counts:
+            response["facets"] = {"fields": facet_counts}
+
+        return response
+
+    def update(self, index, iterable, commit=True):
+        with self._lock_index():
+            inverted_index = self._get_index()
+
+            for obj in iterable:
+                data = index.full_prepare(obj)
+                stored, analyzed = {}, {}
+
+                for field in index.fields.itervalues():
+                    name = field.index_fieldname
+                    value = data.get(name)
+
+                    if field.indexed and not isinstance(field, FacetField) and \
+                            field.field_type in ("string", "edge_ngram") and \
+                            value is not None:
+                        kind = "text"
+                        if isinstance(field, EdgeNgramField):
+                            kind = "edge_ngram"
+                        analyzed[name] = (kind, value)
+
+                    # Keep the index compact by not storing the documents.
+                    if not field.document:
+                        stored[name] = value
+
+                for name in (ID, DJANGO_CT, DJANGO_ID):
+                    stored[name] = data[name]
+
+                inverted_index.add(data[ID], stored, analyzed)
+
+            if commit:
+                self._save_index(inverted_index)
+
+    def remove(self, obj_or_string, commit=True):
+        from haystack.utils import get_identifier
+
+        with self._lock_index():
+            index = self._get_index()
+            index.remove(get_identifier(obj_or_string))
+
+            if commit:
+                self._save_index(index)
+
+    def clear(self, models=[], commit=True):
+        with self._lock_index():
+            index = self._get_index()
+            if models:
+                index.clear("%s.%s" % (model._meta.app_label,
+                                       model._meta.module_name)
+                            for model in models)
+            else:
+                index.clear()
+
+            if commit:
+                self._save_index(index)
+
+    def search(self, query_string, sort_by=None, start_offset=0,
+               end_offset=None, fields="", highlight=False, facets=None,
+               date_facets=None, query_facets=None, narrow_queries=None,
+               spelling_query=None, limit_to_registered_models=None,
+               result_class=None, **kwargs):
+        """Search the index.
+
+        :param query_string: A query built by :class:`SearchQuery`: its filter
+                             and the models to search (raw query strings are
+                             searched for as text).
+        :type  query_string: ``tuple`` or ``unicode``
+        """
+        if isinstance(query_string, basestring):
+            node = SearchNode()
+            if query_string.strip() not in ("", "*"):
+                node.add(("content", query_string), SearchNode.AND)
+            query_string = (node, ())
+
+        node, django_cts = query_string
+        index = self._get_index()
+
+        candidates = self._get_candidates(index, django_cts,
+                                          limit_to_registered_models)
+        for narrow_query in narrow_queries or ():
+            field, value = narrow_query.split(":", 1)
+            candidates = set(self._match(field, "exact", value.strip('"'),
+                                         index, candidates))
+
+        if len(node) == 0:
+            scores = dict.fromkeys(candidates, 0)
+        else:
+            scores = self._evaluate(node, index, candidates) or {}
+
+        return self._get_results(index, scores, start_offset, end_offset,
+                                 sort_by, facets, result_class)
+
+    def more_like_this(self, model_instance, additional_query_string=None,
+                       start_offset=0, end_offset=None,
+                       limit_to_registered_models=None, result_class=None,
+                       **kwargs):
+        """Find the documents that share the most distinctive terms with an
+        object.
+
+        :param additional_query_string: A query built by :class:`SearchQuery`
+                                        that the results must also match.
+        :type  additional_query_string: ``tuple`` or ``None``
+        """
+        from haystack.utils import get_identifier
+
+        index = self._get_index()
+        search_index = self.site.get_index(type(model_instance))
+        field = search_index.get_content_field()
+        data = search_index.full_prepare(model_instance)
+
+        # Pick the terms that best distinguish the object from others.
+        terms = index.analyze_query(field, force_unicode(data[field]))
+        frequencies = dict((term, terms.count(term)) for term in set(terms))
+        terms = heapq.nlargest(MORE_LIKE_THIS_TERMS, frequencies,
+                               key=lambda term: frequencies[term] /
+                               (1.0 + index.get_document_frequency(field,
+                                                                   term)))
+
+        node, django_cts = additional_query_string or (SearchNode(), ())
+        candidates = self._get_candidates(index, django_cts,
+                                          limit_to_registered_models)
+        candidates.discard(get_identifier(model_instance))
+
+        scores = dict((identifier, score) for identifier, score
+                      in index.match(field, terms, require_all=False)
+                      .iteritems() if identifier in candidates)
+        if len(node) > 0:
+            filtered = self._evaluate(node, index, candidates)
+            if filtered is not None:
+                scores = dict((identifier, score) for identifier, score
+                              in scores.iteritems() if identifier in filtered)
+
+        return self._get_results(index, scores, start_offset, end_offset,
+                                 None, None, result_class)
+
+
+class SearchQuery(BaseSearchQuery):
+    """Passes queries to :class:`SearchBackend` as query trees.
+
+    There's no query language to build, so :meth:`build_query` returns the
+    query's filter and the models to search, which the backend evaluates
+    directly.
+    """
+
+    def __init__(self, site=None, backend=None):
+        super(SearchQuery, self).__init__(site, backend)
+
+        if backend is not None:
+            self.backend = backend
+        else:
+            self.backend = SearchBackend(site=site)
+
+    def build_query(self):
+        return (self.query_filter,
+                tuple(sorted("%s.%s" % (model._meta.app_label,
+                                        model._meta.module_name)
+                             for model in self.models)))
+
+    def build_query_fragment(self, field, filter_type, value):
+        # Only used to describe queries (e.g. in their repr()).
+        return u"%s__%s=%s" % (field, filter_type, force_unicode(value))
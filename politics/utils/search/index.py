@@ -0,0 +1,284 @@
+# coding=utf-8
+import math
+import re
+
+
+# Solr's default English stop words.
+STOP_WORDS = frozenset(("a", "an", "and", "are", "as", "at", "be", "but", "by",
+                        "for", "if", "in", "into", "is", "it", "no", "not",
+                        "of", "on", "or", "such", "that", "the", "their",
+                        "then", "there", "these", "they", "this", "to", "was",
+                        "will", "with"))
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    """Splits text into lowercase words.
+
+    :param text: The text.
+    :type  text: ``unicode``
+    :rtype: ``list`` of ``unicode``
+    """
+    return [word.lower() for word in _WORD_RE.findall(text)]
+
+
+def stem(word):
+    """Strips common English suffixes so that inflections of a word match.
+
+    This is much cruder than the Porter stemmer that Solr uses, but it handles
+    plurals and the most common verb endings (e.g. "taxes" and "tax" or
+    "immigrants" and "immigrant" match).
+
+    :param word: A lowercase word.
+    :type  word: ``unicode``
+    :rtype: ``unicode``
+    """
+    if word.endswith("sses"):
+        word = word[:-2]
+    elif word.endswith("ies") and len(word) > 4:
+        word = word[:-3] + "y"
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")) and \
+            len(word) > 3:
+        word = word[:-1]
+
+    for suffix, replacement in (("ing", ""), ("ed", ""), ("ation", "ate")):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)] + replacement
+            break
+
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+
+    return word
+
+
+def analyze_text(text):
+    """Returns the terms under which text is indexed and searched for.
+
+    :param text: The text.
+    :type  text: ``unicode``
+    :rtype: ``list`` of ``unicode``
+    """
+    return [stem(word) for word in tokenize(text) if word not in STOP_WORDS]
+
+
+def analyze_edge_ngrams(text, min_size=2, max_size=15):
+    """Returns the prefixes of each word in text, for autocompletion.
+
+    :param     text: The text.
+    :type      text: ``unicode``
+    :param min_size: The length of the shortest prefix.
+    :type  min_size: ``int``
+    :param max_size: The length of the longest prefix.
+    :type  max_size: ``int``
+    :rtype: ``list`` of ``unicode``
+    """
+    return [word[:size] for word in tokenize(text)
+            for size in xrange(min_size, min(len(word), max_size) + 1)]
+
+
+# How each kind of field is analyzed when a document is indexed and when it's
+# searched for. Like Solr, autocompletion fields are searched for by words
+# (which match the prefixes that were indexed).
+ANALYZERS = {
+    "edge_ngram": (analyze_edge_ngrams, tokenize),
+    "text": (analyze_text, analyze_text),
+}
+
+
+class InvertedIndex(object):
+    """An in-memory inverted index of documents, scored with BM25.
+
+    Each analyzed field maps terms to the documents that contain them and how
+    often, so finding the documents that match a query only touches the
+    postings of the query's terms. Documents are also stored (without their
+    analyzed text) so that they can be filtered, faceted and sorted.
+
+    Instances can be pickled to persist the index.
+
+    .. code-block:: python
+
+        >>> index = InvertedIndex()
+        >>> index.add("core.issue.1", {"django_ct": "core.issue"},
+        ...           {"text": ("text", u"Carbon tax")})
+        >>> index.match("text", index.analyze_query("text", u"carbon")).keys()
+        ['core.issue.1']
+
+    :ivar         b: How much a field's length affects its documents' scores.
+    :type         b: ``float``
+    :ivar documents: The stored fields of each document, by identifier.
+    :type documents: ``dict``
+    :ivar    fields: The kind of each analyzed field (a key of ``ANALYZERS``).
+    :type    fields: ``dict``
+    :ivar        k1: How quickly repeated terms stop increasing a score.
+    :type        k1: ``float``
+    :ivar   lengths: The number of terms in each document's analyzed fields,
+                     by field and identifier.
+    :type   lengths: ``dict``
+    :ivar  postings: The frequency of each term in each document, by field,
+                     term and identifier.
+    :type  postings: ``dict``
+    :ivar     terms: The distinct terms in each document's analyzed fields, by
+                     identifier and field (so documents can be removed without
+                     scanning every term).
+    :type     terms: ``dict``
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.b = b
+        self.documents = {}
+        self.fields = {}
+        self.k1 = k1
+        self.lengths = {}
+        self.postings = {}
+        self.terms = {}
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, identifier, stored, analyzed):
+        """Add a document, replacing any document with the same identifier.
+
+        :param identifier: The document's identifier.
+        :type  identifier: ``unicode``
+        :param     stored: The document's stored fields.
+        :type      stored: ``dict``
+        :param   analyzed: The kind and text of the document's analyzed fields
+                           by name. Multiple values may be given as a list.
+        :type    analyzed: ``dict``
+        """
+        self.remove(identifier)
+        self.documents[identifier] = stored
+        self.terms[identifier] = {}
+
+        for field, (kind, value) in analyzed.iteritems():
+            self.fields[field] = kind
+
+            terms = []
+            for text in value if isinstance(value, list) else [value]:
+                terms.extend(ANALYZERS[kind][0](unicode(text)))
+
+            self.lengths.setdefault(field, {})[identifier] = len(terms)
+            self.terms[identifier][field] = list(set(terms))
+
+            postings = self.postings.setdefault(field, {})
+            for term in terms:
+                documents = postings.setdefault(term, {})
+                documents[identifier] = documents.get(identifier, 0) + 1
+
+    def analyze_query(self, field, text):
+        """Returns the terms that a field is searched for with.
+
+        :param field: The field's name.
+        :type  field: ``str``
+        :param  text: The text to search for.
+        :type   text: ``unicode``
+        :rtype: ``list`` of ``unicode``
+        """
+        return ANALYZERS[self.fields.get(field, "text")][1](text)
+
+    def clear(self, django_cts=None):
+        """Remove documents.
+
+        :param django_cts: Only remove documents of these models (as
+                           ``app_label.module_name``), or all documents if
+                           ``None``.
+        :type  django_cts: *Iterable* of ``str`` or ``None``
+        """
+        if django_cts is None:
+            self.__init__(self.k1, self.b)
+            return
+
+        django_cts = set(django_cts)
+        for identifier, stored in self.documents.items():
+            if stored.get("django_ct") in django_cts:
+                self.remove(identifier)
+
+    def get_document_frequency(self, field, term):
+        """Returns the number of documents whose field contains a term.
+
+        :rtype: ``int``
+        """
+        return len(self.postings.get(field, {}).get(term, ()))
+
+    def match(self, field, terms, require_all=True):
+        """Returns the documents whose field contains terms, with BM25 scores.
+
+        :param       field: The field's name.
+        :type        field: ``str``
+        :param       terms: Analyzed terms (see :meth:`analyze_query`).
+        :type        terms: ``list`` of ``unicode``
+        :param require_all: Whether documents must contain every term (rather
+                            than any of them).
+        :type  require_all: ``bool``
+        :returns: The identifiers of matching documents mapped to their
+                  scores.
+        :rtype: ``dict``
+        """
+        postings = self.postings.get(field, {})
+        lengths = self.lengths.get(field, {})
+        if len(lengths) == 0:
+            return {}
+
+        average_length = sum(lengths.itervalues()) / float(len(lengths))
+        scores = None
+
+        for term in set(terms):
+            documents = postings.get(term, {})
+            idf = math.log(1 + (len(lengths) - len(documents) + 0.5) /
+                           (len(documents) + 0.5))
+
+            term_scores = {}
+            for identifier, frequency in documents.iteritems():
+                norm = 1 - self.b + self.b * lengths[identifier] / \
+                       max(average_length, 1)
+                term_scores[identifier] = idf * frequency * (self.k1 + 1) / \
+                                          (frequency + self.k1 * norm)
+
+            if scores is None:
+                scores = term_scores
+            elif require_all:
+                scores = dict((identifier, score + term_scores[identifier])
+                              for identifier, score in scores.iteritems()
+                              if identifier in term_scores)
+            else:
+                for identifier, score in term_scores.iteritems():
+                    scores[identifier] = scores.get(identifier, 0) + score
+
+        return scores or {}
+
+    def match_prefix(self, field, prefix):
+        """Returns the documents whose field contains a term with a prefix.
+
+        :param  field: The field's name.
+        :type   field: ``str``
+        :param prefix: The prefix.
+        :type  prefix: ``unicode``
+        :rtype: ``set`` of ``unicode``
+        """
+        matches = set()
+        for term, documents in self.postings.get(field, {}).iteritems():
+            if term.startswith(prefix):
+                matches.update(documents)
+
+        return matches
+
+    def remove(self, identifier):
+        """Remove a document (if it's in the index).
+
+        :param identifier: The document's identifier.
+        :type  identifier: ``unicode``
+        """
+        if identifier not in self.documents:
+            return
+
+        del self.documents[identifier]
+        for field, terms in self.terms.pop(identifier).iteritems():
+            del self.lengths[field][identifier]
+
+            postings = self.postings[field]
+            for term in terms:
+                del postings[term][identifier]
+                if len(postings[term]) == 0:
+                    del postings[term]
@@ -0,0 +1,83 @@
+# coding=utf-8
+from django.conf import settings
+from django.core.cache import cache
+from functools import wraps
+from politics.utils.cache import increment
+
+
+def _get_pending_key(task_name, args):
+    return "coalesce:pending:%s:%s" % (task_name, ",".join(map(str, args)))
+
+
+def _get_stats_key(task_name, stat):
+    return "coalesce:%s:%s" % (stat, task_name)
+
+
+def coalesced(function):
+    """A decorator for tasks that are queued with :func:`delay_coalesced`.
+
+    It marks the task as no longer pending as soon as it starts running so that
+    changes made while it runs cause it to be queued again.
+
+    .. code-block:: python
+
+        @task
+        @coalesced
+        def my_task(pk):
+            # ...
+
+    The task must use its default name (i.e. its module and function name).
+    """
+    task_name = "%s.%s" % (function.__module__, function.__name__)
+
+    @wraps(function)
+    def wrapper(*args):
+        cache.delete(_get_pending_key(task_name, args))
+        return function(*args)
+
+    return wrapper
+
+
+def delay_coalesced(task, *args):
+    """Queues a task unless an identical one is already waiting to run.
+
+    Tasks are run ``settings.COALESCING_WINDOW`` seconds after they're first
+    queued; further calls with the same arguments within that window are
+    dropped, so a burst of changes only causes the task to run once.
+
+    The task must be decorated with :func:`coalesced` and take only positional
+    arguments that can be converted to strings (e.g. primary keys).
+
+    :param task: The task to queue.
+    :type  task: ``celery.task.Task``
+    :param args: The task's arguments.
+    :returns: Whether the task was queued.
+    :rtype: ``bool``
+    """
+    window = settings.COALESCING_WINDOW
+
+    # Expire the pending marker shortly after the task should have run in case
+    # it's lost (e.g. if celeryd is restarted or the transaction is rolled back)
+    # so that we don't stop queueing it.
+    if not cache.add(_get_pending_key(task.name, args), True, window * 2):
+        increment(_get_stats_key(task.name, "deduplicated"))
+        return False
+
+    increment(_get_stats_key(task.name, "enqueued"))
+    task.apply_async(args, countdown=window)
+    return True
+
+
+def get_coalescing_stats(task):
+    """Returns the number of times a task has been queued or dropped.
+
+    The counters are stored in the cache, so they're approximate: they start
+    from zero whenever the cache is flushed.
+
+    :param task: The task.
+    :type  task: ``celery.task.Task``
+    :returns: A dictionary with ``enqueued`` and ``deduplicated`` keys.
+    :rtype: ``dict``
+    """
+    return dict((stat, cache.get(_get_stats_key(task.name, stat), 0))
+                for stat in ("deduplicated", "enqueued"))